@@ -1,5 +1,7 @@
 import streamlit as st
-from utils.style import load_custom_css
+from utils.profiling import PageStartup, page_startup_report
+page_startup = PageStartup("Home")
+from utils.style import load_custom_css, show_page_startup
 load_custom_css("style.css")
 
 # Chaves do seu código original 
@@ -40,6 +42,7 @@ st.set_page_config(
     layout="centered",
     initial_sidebar_state="expanded"
 )
+show_page_startup(page_startup)
 
 st.title("Sistema de Detecção de Intrusão com Stream Mining")
 
@@ -77,4 +80,27 @@ em Ciência da Computação da **Universidade Estadual de Londrina (UEL)**.
 O código-fonte completo e a documentação deste projeto estão disponíveis publicamente no GitHub.
 
 [https://github.com/iRocktys/reconhecimento-de-padroes](httpsS://github.com/iRocktys/reconhecimento-de-padroes)
-""")
\ No newline at end of file
+""")
+
+# Tempo de inicialização de cada página neste processo do Streamlit
+with st.expander("Tempo de Inicialização das Páginas"):
+    startup_rows = page_startup_report()
+    if not startup_rows:
+        st.info("Nenhuma página medida ainda.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Página": row["page"],
+                    "Primeira Carga (ms)": None if row["first_ms"] is None else round(row["first_ms"], 1),
+                    "Última (ms)": round(row["last_ms"], 1),
+                    "Média das Recargas (ms)": None if row["warm_mean_ms"] is None else round(row["warm_mean_ms"], 1),
+                    "Carregamentos": row["loads"],
+                    "Bibliotecas Pesadas Importadas": ", ".join(row["heavy_imports"]) or "-",
+                }
+                for row in startup_rows
+            ],
+            hide_index=True,
+            width='stretch'
+        )
+        st.caption("A primeira carga de cada página inclui as importações feitas por ela; o capymoa (e a JVM) só é carregado nas páginas que treinam ou avaliam modelos.")
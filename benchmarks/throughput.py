@@ -0,0 +1,264 @@
+"""
+Benchmark de vazão e latência dos classificadores e detectores de drift.
+
+Uso, a partir da raiz do repositório:
+
+    python -m benchmarks.throughput                    # suíte completa
+    python -m benchmarks.throughput --quick            # cenários e tamanhos reduzidos
+    python -m benchmarks.throughput --save-baseline    # grava o resultado como baseline
+    python -m benchmarks.throughput --models HoeffdingTree --lengths 50000
+
+Os cenários são streams RandomRBF com drift abrupto ou gradual no meio do
+stream, de 10 a 80 atributos numéricos e de 2 a 18 classes, materializados
+uma vez em disco (utils.synthetic_cache) para que a geração fique fora da
+medição. Cada caso (cenário × tamanho × modelo) roda em um processo novo:
+get_models + run_evaluation_stream, após um aquecimento curto da JVM com
+modelos descartáveis. Por componente (predict, train, ddm, adwin, ABCD) são
+reportados vazão e percentis de latência; por caso, a vazão ponta a ponta e o
+pico de memória residente do processo (inclui a JVM). Os processos iniciam
+a JVM com a configuração gravada pela página de Modelos (utils.jvm) ou, sem
+ela, com os argumentos padrão do capymoa; os argumentos usados ficam no
+resultado, e a comparação avisa quando diferem dos do baseline.
+
+O resultado vai para results/benchmarks/<data>.json e é comparado com o
+baseline (benchmarks/baseline.json, específico da máquina onde foi gravado):
+componentes com vazão abaixo de (1 - tolerância) × baseline são regressões.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+DEFAULT_OUTPUT_ROOT = os.path.join("results", "benchmarks")
+DEFAULT_TOLERANCE = 0.10
+
+MODELS = ("HoeffdingTree", "HoeffdingAdaptiveTree", "AdaptiveRandomForest", "LeveragingBagging")
+COMPONENTS = ("predict", "train", "ddm", "adwin", "ABCD")
+
+# Ensembles menores que o padrão da interface (100) para a suíte caber em minutos
+BENCHMARK_MODEL_PARAMS = {
+    "AdaptiveRandomForest": {"ensemble_size": 10},
+    "LeveragingBagging": {"ensemble_size": 10},
+}
+
+SCENARIOS = {
+    "abrupt-f10-c2": {"num_attributes": 10, "num_classes": 2, "drift": "Abrupto"},
+    "gradual-f10-c2": {"num_attributes": 10, "num_classes": 2, "drift": "Gradual"},
+    "abrupt-f40-c8": {"num_attributes": 40, "num_classes": 8, "drift": "Abrupto"},
+    "gradual-f40-c8": {"num_attributes": 40, "num_classes": 8, "drift": "Gradual"},
+    "abrupt-f80-c18": {"num_attributes": 80, "num_classes": 18, "drift": "Abrupto"},
+    "gradual-f80-c18": {"num_attributes": 80, "num_classes": 18, "drift": "Gradual"},
+}
+QUICK_SCENARIOS = ("abrupt-f10-c2", "gradual-f80-c18")
+
+STREAM_LENGTHS = (10_000, 50_000, 200_000)
+QUICK_STREAM_LENGTHS = (10_000,)
+
+WINDOW_SIZE = 1000
+WARMUP_INSTANCES = 2000
+
+
+# --- Cenários ---
+def materialize_scenario(name, length):
+    """Pasta do artefato do cenário (gerado só na primeira vez)."""
+    from utils.synthetic_cache import materialize_synthetic_stream, FAMILY_RANDOM_RBF
+
+    scenario = SCENARIOS[name]
+    base_params = {
+        "num_classes": scenario["num_classes"],
+        "num_attributes": scenario["num_attributes"],
+        "num_centroids": 50,
+        "model_seed_start": 1,
+    }
+    drift = {"position": length // 2, "type": scenario["drift"], "width": 1 if scenario["drift"] == "Abrupto" else length // 10}
+    return materialize_synthetic_stream(FAMILY_RANDOM_RBF, base_params, [drift], length)
+
+
+# --- Execução de um Caso ---
+def _evaluate(stream, model_name, eval_params):
+    from utils.training import get_models
+    from utils.evaluation import run_evaluation_stream
+
+    models, _ = get_models(stream.get_schema(), eval_params, [model_name], {model_name: BENCHMARK_MODEL_PARAMS.get(model_name, {})})
+    final = None
+    for result in run_evaluation_stream(stream, models, eval_params):
+        if isinstance(result, dict):
+            final = result
+    return final
+
+
+def run_case(artifact_dir, model_name, length):
+    # Executado em um processo novo: a memória de pico e a JVM são só deste caso
+    from utils.file_stream import FileBackedStream
+    from utils.profiling import get_peak_rss_mb
+
+    stream = FileBackedStream(artifact_dir)
+    _evaluate(stream, model_name, {"MAX_INSTANCES": min(WARMUP_INSTANCES, length), "WINDOW_SIZE": WINDOW_SIZE})
+
+    start = time.perf_counter()
+    final = _evaluate(stream, model_name, {"MAX_INSTANCES": length, "WINDOW_SIZE": WINDOW_SIZE})
+    elapsed_s = time.perf_counter() - start
+
+    report = final["final_report"][model_name]
+    components = {}
+    for op in COMPONENTS:
+        summary = report["Latência"][op]
+        components[op] = {
+            "instances_per_s": 1e6 / summary["mean_us"] if summary["mean_us"] > 0 else None,
+            "p50_us": summary["p50_us"],
+            "p95_us": summary["p95_us"],
+            "p99_us": summary["p99_us"],
+            "count": summary["count"],
+        }
+    return {
+        "instances_per_s": length / elapsed_s,
+        "model_instances_per_s": report["Instâncias/s"],
+        "accuracy": report["Acurácia"],
+        "elapsed_s": elapsed_s,
+        "peak_rss_mb": get_peak_rss_mb(),
+        "components": components,
+    }
+
+
+def case_id(scenario, length, model_name):
+    return f"{scenario}/{length}/{model_name}"
+
+
+# --- Comparação com o Baseline ---
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Linhas (caso, componente, vazão atual, baseline, variação) e se cada uma é regressão."""
+    rows = []
+    for cid, case in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(cid)
+        if base_case is None:
+            continue
+        pairs = [("end-to-end", case["instances_per_s"], base_case["instances_per_s"])]
+        pairs += [
+            (op, case["components"][op]["instances_per_s"], base_case["components"].get(op, {}).get("instances_per_s"))
+            for op in COMPONENTS
+        ]
+        for component, current, base in pairs:
+            if not current or not base:
+                continue
+            change = current / base - 1.0
+            rows.append({
+                "case": cid,
+                "component": component,
+                "instances_per_s": current,
+                "baseline_instances_per_s": base,
+                "change": change,
+                "regression": change < -tolerance,
+            })
+    return rows
+
+
+def _print_results(results):
+    print(f"\n{'caso':<45} {'inst/s':>12} {'pico MB':>9}  " + "  ".join(f"{op + ' p99 µs':>13}" for op in COMPONENTS))
+    for cid, case in results["cases"].items():
+        peak = f"{case['peak_rss_mb']:.0f}" if case["peak_rss_mb"] is not None else "-"
+        p99 = "  ".join(f"{case['components'][op]['p99_us']:>13.1f}" for op in COMPONENTS)
+        print(f"{cid:<45} {case['instances_per_s']:>12,.0f} {peak:>9}  {p99}")
+
+
+def _print_comparison(rows, tolerance):
+    print(f"\nComparação com o baseline (tolerância {tolerance:.0%}):")
+    for row in rows:
+        flag = "REGRESSÃO" if row["regression"] else ""
+        print(f"{row['case']:<45} {row['component']:<11} {row['instances_per_s']:>12,.0f} vs {row['baseline_instances_per_s']:>12,.0f} ({row['change']:+.1%}) {flag}")
+
+
+# --- Suíte ---
+def _run_in_new_process(jvm_config, func, *args):
+    """Executa func em um processo novo (spawn), com JVM própria e configurada; devolve o resultado."""
+    from utils.jvm import configure_jvm
+
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=mp.get_context("spawn"),
+        initializer=configure_jvm,
+        initargs=(jvm_config,)
+    ) as pool:
+        return pool.submit(func, *args).result()
+
+
+def run_suite(scenarios, lengths, models):
+    from utils.jvm import load_jvm_config, jvm_args
+
+    jvm_config = load_jvm_config()
+    cases = {}
+    total = len(scenarios) * len(lengths) * len(models)
+    done = 0
+    # Um processo por caso, um caso por vez: a vazão medida não sofre com concorrência
+    for scenario in scenarios:
+        for length in lengths:
+            artifact_dir = _run_in_new_process(jvm_config, materialize_scenario, scenario, length)
+            for model_name in models:
+                done += 1
+                cid = case_id(scenario, length, model_name)
+                print(f"[{done}/{total}] {cid}...", flush=True)
+                cases[cid] = _run_in_new_process(jvm_config, run_case, artifact_dir, model_name, length)
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "machine": {"platform": sys.platform, "cpu_count": os.cpu_count()},
+        "window_size": WINDOW_SIZE,
+        # None = argumentos padrão do capymoa
+        "jvm_args": jvm_args(jvm_config) if jvm_config is not None else None,
+        "model_params": BENCHMARK_MODEL_PARAMS,
+        "cases": cases,
+    }
+
+
+def _write_json(path, payload):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de vazão dos classificadores e detectores de drift.")
+    parser.add_argument("--quick", action="store_true", help="Apenas os cenários e o tamanho reduzidos.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=None)
+    parser.add_argument("--lengths", nargs="+", type=int, default=None)
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=None)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Arquivo do baseline para comparação.")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava este resultado como o novo baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Queda de vazão tolerada (fração).")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: results/benchmarks/<data>.json).")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenarios or (QUICK_SCENARIOS if args.quick else list(SCENARIOS))
+    lengths = args.lengths or (QUICK_STREAM_LENGTHS if args.quick else STREAM_LENGTHS)
+    models = args.models or MODELS
+
+    results = run_suite(scenarios, lengths, models)
+    output = args.output or os.path.join(DEFAULT_OUTPUT_ROOT, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    _write_json(output, results)
+    _print_results(results)
+    print(f"\nResultado gravado em '{output}'.")
+
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Baseline gravado em '{args.baseline}'.")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"Nenhum baseline em '{args.baseline}'; rode com --save-baseline para criar um.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("jvm_args") != results["jvm_args"]:
+        print(f"Aviso: argumentos da JVM diferentes dos do baseline ({baseline.get('jvm_args')} vs {results['jvm_args']}).")
+    rows = compare_with_baseline(results, baseline, args.tolerance)
+    _print_comparison(rows, args.tolerance)
+    regressions = [r for r in rows if r["regression"]]
+    if regressions:
+        raise SystemExit(f"{len(regressions)} componente(s) com vazão abaixo do baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import streamlit as st
+from utils.profiling import PageStartup
+page_startup = PageStartup("Base de Dados")
 import os
 import pandas as pd
 import altair as alt 
@@ -11,7 +13,7 @@ from utils.data_loader import (
     BENIGN_LABEL,
     DATA_DIR 
 )
-from utils.style import load_custom_css
+from utils.style import load_custom_css, show_page_startup
 load_custom_css("style.css")
 
 st.set_page_config(
@@ -19,6 +21,7 @@ st.set_page_config(
     page_icon="🛡️",
     layout="centered" 
 )
+show_page_startup(page_startup)
 
 # Gerenciamento de Estado
 if 'processing' not in st.session_state:
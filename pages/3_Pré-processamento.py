@@ -1,9 +1,18 @@
 import streamlit as st
+from utils.profiling import PageStartup
+page_startup = PageStartup("Pré-processamento")
 import pandas as pd
 import os
 import altair as alt 
-from utils.style import load_custom_css
-from utils.preprocessing import create_stream_pipeline
+from utils.style import load_custom_css, show_page_startup
+from utils.jvm import configure_jvm
+from utils.aggregates import TIME_RESOLUTIONS
+from utils.preprocessing import (
+    create_stream_pipeline,
+    ONLINE_IMPUTATION,
+    STREAM_STORAGE_MEMORY,
+    STREAM_STORAGE_DISK
+)
 load_custom_css("style.css")
 
 st.set_page_config(
@@ -11,6 +20,9 @@ st.set_page_config(
     page_icon="🛡️",
     layout="centered" 
 )
+show_page_startup(page_startup)
+# Antes da primeira importação do capymoa nesta sessão do app
+configure_jvm()
 
 @st.cache_data
 def load_sample_df(filepath):
@@ -96,9 +108,9 @@ with st.container(border=True):
     
     imputation_method = st.selectbox(
         "Método de Imputação (para Nulos/Infinitos)",
-        options=['Mediana', 'Média', 'Preencher com 0', 'Remover Linhas'],
+        options=['Mediana', 'Média', 'Preencher com 0', 'Remover Linhas', ONLINE_IMPUTATION],
         index=0,
-        help="Como o pipeline deve tratar células vazias (NaN) ou infinitas (inf) nos dados numéricos.",
+        help="Como o pipeline deve tratar células vazias (NaN) ou infinitas (inf) nos dados numéricos. A opção 'Online' mantém os valores brutos no stream e os trata durante a avaliação, sem usar estatísticas do arquivo inteiro (configure em 'Modelos').",
         disabled=not file_selected
     )
 
@@ -215,6 +227,17 @@ with st.container(border=True):
             disabled=not file_selected
         )
 
+with st.container(border=True):
+    st.subheader("Armazenamento do Stream")
+    stream_storage = st.radio(
+        "Onde o stream final deve ficar durante a avaliação:",
+        [STREAM_STORAGE_MEMORY, STREAM_STORAGE_DISK],
+        index=0,
+        horizontal=True,
+        help="'Disco' grava o dataset processado na pasta `data/` e o lê em lotes durante a avaliação, mantendo apenas o lote atual em memória; a sessão guarda só o caminho do artefato e resumos. O pré-processamento em si ainda carrega o CSV inteiro. Indicado para streams muito grandes.",
+        disabled=not file_selected
+    )
+
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     start_button_clicked = st.button(
@@ -243,11 +266,12 @@ if start_button_clicked:
     st.session_state.skb_score_func_name = skb_score_func_name
     st.session_state.pca_svd_solver = pca_svd_solver
     st.session_state.pca_whiten = pca_whiten
+    st.session_state.stream_storage = stream_storage
     
     log_placeholder = st.empty() 
     
     with st.spinner("Executando pipeline de pré-processamento... Isso pode levar alguns minutos."):
-        stream, le, X_data_df_cleaned, df_processed, log_messages, feature_report = create_stream_pipeline(
+        stream, le, X_data_df_cleaned, df_processed, log_messages, feature_report, pipeline_artifacts = create_stream_pipeline(
             file_path=filepath,
             target_label_col=target_col,
             timestamp_col=timestamp_col,
@@ -262,19 +286,48 @@ if start_button_clicked:
             rf_iterations=rf_iterations,
             skb_score_func_name=skb_score_func_name,
             pca_svd_solver=pca_svd_solver,
-            pca_whiten=pca_whiten
+            pca_whiten=pca_whiten,
+            stream_storage=stream_storage
         )
     
     log_placeholder.text_area("Logs do Processamento", "\n".join(log_messages), height=300)
     
+    stage_report = pipeline_artifacts.get("stage_report", [])
+    st.session_state.pipeline_stage_report = stage_report
+    if stage_report:
+        with st.expander("Desempenho por Etapa do Pipeline", expanded=False):
+            df_stages = pd.DataFrame(stage_report).rename(columns={
+                "step": "Passo",
+                "stage": "Etapa",
+                "wall_time_s": "Tempo Real (s)",
+                "cpu_time_s": "Tempo de CPU (s)",
+                "peak_rss_delta_mb": "Δ Pico RSS (MB)",
+                "peak_rss_mb": "Pico RSS (MB)",
+                "rows": "Linhas",
+                "cols": "Colunas"
+            })
+            st.dataframe(df_stages, width='stretch', hide_index=True)
+            if pipeline_artifacts.get("stage_report_path"):
+                st.caption(f"Relatório salvo em `{pipeline_artifacts['stage_report_path']}`")
+    
     if stream:
         st.success("Pipeline executado com sucesso! O Stream está pronto.")
         
         st.session_state.stream_data = stream
+        st.session_state.stream_path = pipeline_artifacts.get("stream_path")
         st.session_state.label_encoder = le
-        st.session_state.df_processed = df_processed 
-        st.session_state.X_final_df = X_data_df_cleaned 
+        # Resumo leve do dataset final, usado pelas páginas seguintes
+        st.session_state.final_features = X_data_df_cleaned.columns.tolist()
+        st.session_state.n_stream_instances = len(X_data_df_cleaned)
+        st.session_state.n_processed_rows = len(df_processed)
+        # No armazenamento em disco os DataFrames completos não ficam na sessão:
+        # o stream é lido do artefato
+        keep_frames = stream_storage != STREAM_STORAGE_DISK
+        st.session_state.df_processed = df_processed if keep_frames else None
+        st.session_state.X_final_df = X_data_df_cleaned if keep_frames else None
         st.session_state.feature_importance_report = feature_report
+        st.session_state.viz_cubes = pipeline_artifacts.get("viz_cubes")
+        st.session_state.attack_segments = pipeline_artifacts.get("attack_segments")
         
         st.header("Resultado do Pipeline", divider="rainbow")
         st.subheader("Análise Pós-Processamento")
@@ -308,9 +361,10 @@ if start_button_clicked:
         with st.expander(f"Lista Final de Features ({len(final_features)})", expanded=False):
             st.code(f"{final_features}")
             
+        viz_cubes = st.session_state.viz_cubes or {"class_counts": pd.DataFrame(columns=['Label', 'Contagem']), "time_counts": {}}
+        
         st.markdown("##### Distribuição de Classes")
-        report_df = df_processed.loc[X_data_df_cleaned.index][target_col].value_counts().reset_index()
-        report_df.columns = [target_col, 'Contagem']
+        report_df = viz_cubes["class_counts"].rename(columns={'Label': target_col})
         
         bar_chart = alt.Chart(report_df).mark_bar().encode(
             x=alt.X(target_col, sort=None),
@@ -320,22 +374,23 @@ if start_button_clicked:
         ).interactive()
         st.altair_chart(bar_chart, width='stretch')
         
-        if timestamp_col:
+        if timestamp_col and viz_cubes["time_counts"]:
             st.markdown("##### Distribuição de Ataques ao Longo do Tempo")
             
             try:
-                df_plot = df_processed.copy()
-                df_plot['time_bin'] = df_plot[timestamp_col].dt.floor('T')
-                df_agg = df_plot.groupby(['time_bin', target_col]).size().reset_index(name='Contagem')
-                
-                area_chart = alt.Chart(df_agg).mark_area().encode(
-                    x=alt.X('time_bin', title="Timestamp", axis=alt.Axis(format="%H:%M")),
-                    y=alt.Y('Contagem', stack='zero'), 
-                    color=alt.Color(target_col, legend=alt.Legend(title="Legenda", orient='right')),
-                    tooltip=[alt.Tooltip('time_bin', format="%H:%M"), target_col, 'Contagem']
-                ).interactive()
-                
-                st.altair_chart(area_chart, width='stretch')
+                resolutions = [r for r in TIME_RESOLUTIONS if r in viz_cubes["time_counts"]]
+                for resolution, tab in zip(resolutions, st.tabs(resolutions)):
+                    with tab:
+                        df_agg = viz_cubes["time_counts"][resolution].rename(columns={'Label': target_col})
+                        
+                        area_chart = alt.Chart(df_agg).mark_area().encode(
+                            x=alt.X('time_bin', title="Timestamp", axis=alt.Axis(format="%H:%M")),
+                            y=alt.Y('Contagem', stack='zero'), 
+                            color=alt.Color(target_col, legend=alt.Legend(title="Legenda", orient='right')),
+                            tooltip=[alt.Tooltip('time_bin', format="%H:%M"), target_col, 'Contagem']
+                        ).interactive()
+                        
+                        st.altair_chart(area_chart, width='stretch')
             except Exception as e:
                 st.warning(f"Não foi possível gerar o gráfico de distribuição ao longo do tempo: {e}")
             
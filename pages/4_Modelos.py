@@ -1,10 +1,36 @@
 import streamlit as st
+from utils.profiling import PageStartup
+page_startup = PageStartup("Modelos")
 import pandas as pd
 import os
-from utils.style import load_custom_css
+from utils.style import load_custom_css, show_page_startup
 from utils.training import get_models 
-from capymoa.stream.generator import RandomTreeGenerator, RandomRBFGenerator
-from capymoa.stream.drift import DriftStream, AbruptDrift, GradualDrift
+from utils.racing import DEFAULT_RACING
+from utils.sizing import calibrate_ensemble
+from utils.online_transform import DEFAULT_ONLINE_TRANSFORM
+from utils.preprocessing import ONLINE_IMPUTATION
+from utils.instance_cache import DEFAULT_INSTANCE_CACHE_MB
+from utils.jvm import (
+    GC_OPTIONS,
+    DEFAULT_JVM_CONFIG,
+    DEFAULT_WARMUP_INSTANCES,
+    configure_jvm,
+    jvm_args,
+    jvm_runtime_info,
+    load_jvm_config,
+    save_jvm_config
+)
+from utils.synthetic_cache import (
+    GENERATOR_FAMILIES,
+    FAMILY_RANDOM_TREE,
+    build_drift_stream,
+    can_materialize,
+    scenario_key,
+    get_scenario_dir,
+    is_materialized,
+    load_synthetic_stream,
+    start_background_materialization
+)
 
 # --- Configuração da Página ---
 load_custom_css("style.css")
@@ -13,6 +39,58 @@ st.set_page_config(
     page_icon="🛡️",
     layout="centered" 
 )
+show_page_startup(page_startup)
+# Antes da primeira importação do capymoa nesta sessão do app
+configure_jvm()
+
+def render_ensemble_sizing(model_name):
+    """Calibração do tamanho do ensemble pela vazão alvo; devolve (resultado, versão)."""
+    sizing_key = f"{model_name}_sizing"
+    version_key = f"{model_name}_sizing_version"
+    with st.expander("Dimensionar pela Vazão Alvo"):
+        st.caption("Uma execução curta mede o custo de cada membro do ensemble e sugere o maior tamanho que atende à vazão desejada.")
+        target = st.number_input("Vazão Alvo (instâncias/s)", 1, 10_000_000, 1000, 100, key=f"{model_name}_target_ips")
+        if st.button("Calibrar", key=f"{model_name}_calibrate", disabled=not stream_ready):
+            with st.spinner("Calibrando..."):
+                st.session_state[sizing_key] = calibrate_ensemble(model_name, st.session_state.stream_data, target)
+            # Nova versão = widgets recriados com os valores sugeridos como padrão
+            st.session_state[version_key] = st.session_state.get(version_key, 0) + 1
+        sizing = st.session_state.get(sizing_key)
+        if sizing:
+            message = (
+                f"Sugestão: ensemble de **{sizing['ensemble_size']}** membros"
+                + (f", max_features **{sizing['max_features']}**" if sizing["max_features"] is not None else "")
+                + f" (≈ {sizing['predicted_instances_per_s']:,.0f} instâncias/s previstas para o alvo de {sizing['target_instances_per_s']:,.0f})."
+            )
+            if sizing["fits_target"]:
+                st.success(message)
+            else:
+                st.warning(message + " Nem o menor ensemble atinge o alvo neste hardware.")
+            st.dataframe(pd.DataFrame(sizing["candidates"]), width='stretch', hide_index=True)
+    return sizing, st.session_state.get(version_key, 0)
+
+def activate_synthetic_stream(artifact_dir, key, total_size):
+    """Coloca na sessão o stream sintético materializado em disco."""
+    st.session_state.stream_data = load_synthetic_stream(artifact_dir)
+    st.session_state.stream_path = artifact_dir
+    st.session_state.synthetic_scenario_key = key
+    # Define metadados para o stream sintético usando o valor do input
+    st.session_state.synthetic_max_instances = total_size
+    # Sem features da base real = stream sintético
+    st.session_state.final_features = None
+    st.session_state.X_final_df = None
+    # Os segmentos de ataque da base real não valem para o stream sintético
+    st.session_state.attack_segments = None
+
+def activate_live_synthetic_stream(gen_family, base_params, drifts, key, total_size):
+    """Coloca na sessão o DriftStream do cenário, lido direto do gerador (sem cache em disco)."""
+    st.session_state.stream_data = build_drift_stream(gen_family, base_params, drifts)
+    st.session_state.stream_path = None
+    st.session_state.synthetic_scenario_key = key
+    st.session_state.synthetic_max_instances = total_size
+    st.session_state.final_features = None
+    st.session_state.X_final_df = None
+    st.session_state.attack_segments = None
 
 # Renderização da Página 
 st.title("Configuração de Modelos e Dados")
@@ -32,10 +110,10 @@ total_instances = 0
 if data_source == "Usar Dados do Pré-processamento (Real)":
     if ('stream_data' in st.session_state and 
         st.session_state.stream_data is not None and 
-        st.session_state.get('X_final_df') is not None): 
+        st.session_state.get('final_features') is not None): 
         
         try:
-            total_instances = st.session_state.X_final_df.shape[0]
+            total_instances = st.session_state.n_stream_instances
             st.success(f"✅ Stream Real carregado do passo anterior! ({total_instances:,} instâncias)")
             stream_ready = True
         except Exception as e:
@@ -53,149 +131,108 @@ if data_source == "Usar Dados do Pré-processamento (Real)":
 
 #  Dados Sintéticos
 elif data_source == "Gerar Stream Sintético com Drift (DriftStream)":
-    if RandomTreeGenerator is None:
-        st.error("A biblioteca `capymoa` não foi importada corretamente.")
-    else:
-        st.markdown("Construa um cenário complexo de *concept drift* definindo uma sequência de mudanças.")
+    st.markdown("Construa um cenário complexo de *concept drift* definindo uma sequência de mudanças.")
         
-        with st.container(border=True):
-            st.subheader("Escolha a Família do Gerador")
-            gen_family = st.selectbox("Família de Dados", ["RandomTreeGenerator (Árvores)", "RandomRBF (Centróides)"]) 
-            base_params = {}
+    with st.container(border=True):
+        st.subheader("Escolha a Família do Gerador")
+        gen_family = st.selectbox("Família de Dados", GENERATOR_FAMILIES)
+        base_params = {}
             
-            if gen_family == "RandomTreeGenerator (Árvores)":
-                st.info("Gera dados baseados em árvores de decisão aleatórias. O conceito mudará alterando a 'seed' da árvore.")
-                c1, c2 = st.columns(2)
-                base_params['num_classes'] = c1.number_input("Num. Classes", 2, 10, 2)
-                base_params['num_nominals'] = c2.number_input("Num. Atributos Nominais", 0, 20, 5)
-                base_params['num_numerics'] = c1.number_input("Num. Atributos Numéricos", 0, 20, 5)
-                base_params['tree_seed_start'] = c2.number_input("Seed Inicial da Árvore", 1, 100, 1)
+        if gen_family == FAMILY_RANDOM_TREE:
+            st.info("Gera dados baseados em árvores de decisão aleatórias. O conceito mudará alterando a 'seed' da árvore.")
+            c1, c2 = st.columns(2)
+            base_params['num_classes'] = c1.number_input("Num. Classes", 2, 10, 2)
+            base_params['num_nominals'] = c2.number_input("Num. Atributos Nominais", 0, 20, 5, help="Com atributos nominais o cenário é lido direto do gerador: não é guardado em cache em disco nem pode usar o modo paralelo.")
+            base_params['num_numerics'] = c1.number_input("Num. Atributos Numéricos", 0, 20, 5)
+            base_params['tree_seed_start'] = c2.number_input("Seed Inicial da Árvore", 1, 100, 1)
 
-            elif gen_family == "RandomRBF (Centróides)":
-                st.info("Gera dados baseados em centróides radiais (RBF). O conceito mudará alterando a 'seed' do modelo.")
-                c1, c2 = st.columns(2)
-                base_params['num_classes'] = c1.number_input("Num. Classes", 2, 10, 2)
-                base_params['num_attributes'] = c2.number_input("Num. Atributos", 2, 50, 10)
-                base_params['num_centroids'] = c1.number_input("Num. Centróides", 10, 100, 50)
-                base_params['model_seed_start'] = c2.number_input("Seed Inicial do Modelo", 1, 100, 1)
-
-            st.subheader("Defina a Linha do Tempo (Drifts)")
-            if 'drift_data_editor' not in st.session_state:
-                 st.session_state.drift_data_editor = pd.DataFrame([
-                    {"Posição (Instância)": 5000, "Tipo": "Abrupto", "Largura (Width)": 1},
-                    {"Posição (Instância)": 10000, "Tipo": "Gradual", "Largura (Width)": 1000},
-                ])
-
-            edited_drifts = st.data_editor(
-                st.session_state.drift_data_editor, 
-                num_rows="dynamic", 
-                column_config={
-                    "Posição (Instância)": st.column_config.NumberColumn(min_value=100, step=100, help="Em qual instância o drift começa."),
-                    "Tipo": st.column_config.SelectboxColumn(options=["Abrupto", "Gradual"], required=True),
-                    "Largura (Width)": st.column_config.NumberColumn(min_value=1, help="1 para Abrupto. Valores maiores (ex: 1000) para Gradual.")
-                },
-                width='stretch'
-            )
+        else:
+            st.info("Gera dados baseados em centróides radiais (RBF). O conceito mudará alterando a 'seed' do modelo.")
+            c1, c2 = st.columns(2)
+            base_params['num_classes'] = c1.number_input("Num. Classes", 2, 10, 2)
+            base_params['num_attributes'] = c2.number_input("Num. Atributos", 2, 50, 10)
+            base_params['num_centroids'] = c1.number_input("Num. Centróides", 10, 100, 50)
+            base_params['model_seed_start'] = c2.number_input("Seed Inicial do Modelo", 1, 100, 1)
 
-            st.subheader("Tamanho Final do Stream")
-            total_stream_size = st.number_input(
-                "Quantidade Total de Amostras (Instâncias)",
-                min_value=1000,
-                value=20000,
-                step=1000,
-                help="Define o tamanho total do stream sintético gerado. Certifique-se de que seja maior que a posição do último drift."
-            )
+        st.subheader("Defina a Linha do Tempo (Drifts)")
+        if 'drift_data_editor' not in st.session_state:
+             st.session_state.drift_data_editor = pd.DataFrame([
+                {"Posição (Instância)": 5000, "Tipo": "Abrupto", "Largura (Width)": 1},
+                {"Posição (Instância)": 10000, "Tipo": "Gradual", "Largura (Width)": 1000},
+            ])
+
+        edited_drifts = st.data_editor(
+            st.session_state.drift_data_editor, 
+            num_rows="dynamic", 
+            column_config={
+                "Posição (Instância)": st.column_config.NumberColumn(min_value=100, step=100, help="Em qual instância o drift começa."),
+                "Tipo": st.column_config.SelectboxColumn(options=["Abrupto", "Gradual"], required=True),
+                "Largura (Width)": st.column_config.NumberColumn(min_value=1, help="1 para Abrupto. Valores maiores (ex: 1000) para Gradual.")
+            },
+            width='stretch'
+        )
+
+        st.subheader("Tamanho Final do Stream")
+        total_stream_size = st.number_input(
+            "Quantidade Total de Amostras (Instâncias)",
+            min_value=1000,
+            value=20000,
+            step=1000,
+            help="Define o tamanho total do stream sintético gerado. Certifique-se de que seja maior que a posição do último drift."
+        )
             
-            if st.button("🛠️ Gerar Stream Sintético", type="primary", width='stretch'):
+        if st.button("🛠️ Gerar Stream Sintético", type="primary", width='stretch'):
+            sorted_drifts = edited_drifts.sort_values(by="Posição (Instância)")
+            drifts = [
+                {"position": row["Posição (Instância)"], "type": row["Tipo"], "width": row["Largura (Width)"]}
+                for _, row in sorted_drifts.iterrows()
+            ]
+            if drifts and total_stream_size <= drifts[-1]["position"]:
+                st.error(f"Erro: O tamanho total ({total_stream_size}) deve ser maior que a posição do último drift ({drifts[-1]['position']}). Aumente o tamanho total.")
+                st.stop()
+
+            key = scenario_key(gen_family, base_params, drifts, total_stream_size)
+            if not can_materialize(gen_family, base_params):
+                # Atributos nominais: o artefato em disco os leria como numéricos
                 try:
-                    sorted_drifts = edited_drifts.sort_values(by="Posição (Instância)")
-                    
-                    if not sorted_drifts.empty:
-                        last_drift_pos = sorted_drifts["Posição (Instância)"].max()
-                        if total_stream_size <= last_drift_pos:
-                            st.error(f"Erro: O tamanho total ({total_stream_size}) deve ser maior que a posição do último drift ({last_drift_pos}). Aumente o tamanho total.")
-                            st.stop()
-
-                    stream_components = []
-                    
-                    # Cria o Gerador Inicial
-                    if gen_family.startswith("RandomTree"):
-                        current_seed = base_params['tree_seed_start']
-                        stream_components.append(RandomTreeGenerator(
-                            tree_random_seed=current_seed,
-                            num_classes=base_params['num_classes'],
-                            num_nominals=base_params['num_nominals'],
-                            num_numerics=base_params['num_numerics']
-                        ))
-                    elif gen_family.startswith("RandomRBF"):
-                        current_seed = base_params['model_seed_start']
-                        stream_components.append(RandomRBFGenerator(
-                            model_random_seed=current_seed,
-                            number_of_classes=base_params['num_classes'],
-                            number_of_attributes=base_params['num_attributes'],
-                            number_of_centroids=base_params['num_centroids']
-                        ))
-
-                    # Itera sobre os drifts
-                    last_pos = 0
-                    for index, row in sorted_drifts.iterrows():
-                        pos = int(row["Posição (Instância)"])
-                        drift_type = row["Tipo"]
-                        width = int(row["Largura (Width)"])
-                        
-                        if pos <= last_pos:
-                            st.error(f"Erro: A posição {pos} deve ser maior que a anterior {last_pos}.")
-                            raise ValueError("Ordem de drift inválida.")
-                        
-                        if drift_type == "Abrupto":
-                            stream_components.append(AbruptDrift(position=pos))
-                        else:
-                            stream_components.append(GradualDrift(position=pos, width=width))
-                        
-                        # Adiciona novo conceito 
-                        if gen_family.startswith("RandomTree"):
-                            current_seed += 1
-                            stream_components.append(RandomTreeGenerator(
-                                tree_random_seed=current_seed,
-                                num_classes=base_params['num_classes'],
-                                num_nominals=base_params['num_nominals'],
-                                num_numerics=base_params['num_numerics']
-                            ))
-                        elif gen_family.startswith("RandomRBF"):
-                            current_seed += 1
-                            stream_components.append(RandomRBFGenerator(
-                                model_random_seed=current_seed,
-                                number_of_classes=base_params['num_classes'],
-                                number_of_attributes=base_params['num_attributes'],
-                                number_of_centroids=base_params['num_centroids']
-                            ))
-                        
-                        last_pos = pos
-
-                    # Cria o DriftStream final
-                    synthetic_stream = DriftStream(stream=stream_components)
-                    
-                    # Salva na sessão
-                    st.session_state.stream_data = synthetic_stream
-                    
-                    # Define metadados para o stream sintético usando o valor do input
-                    st.session_state.synthetic_max_instances = total_stream_size
-                    
-                    # Define X_final_df como None para indicar que é sintético
-                    st.session_state.X_final_df = None 
-                    
+                    activate_live_synthetic_stream(gen_family, base_params, drifts, key, total_stream_size)
                     st.success(f"✅ Stream '{gen_family}' criado com sucesso! Tamanho: {total_stream_size}")
                     st.rerun()
+                except ValueError as e:
+                    st.error(f"Erro ao construir stream: {e}")
+            elif is_materialized(key):
+                activate_synthetic_stream(get_scenario_dir(key), key, total_stream_size)
+                st.success(f"✅ Cenário já gerado anteriormente, carregado do cache. Tamanho: {total_stream_size}")
+                st.rerun()
+            else:
+                # Gera em outro processo: os modelos podem ser configurados enquanto isso
+                st.session_state.synthetic_job = {
+                    "future": start_background_materialization(gen_family, base_params, drifts, total_stream_size),
+                    "key": key,
+                    "total_size": total_stream_size,
+                    "family": gen_family,
+                }
+                st.rerun()
 
+        job = st.session_state.get('synthetic_job')
+        if job is not None:
+            if not job["future"].done():
+                st.info(f"⏳ Gerando o cenário '{job['family']}' ({job['total_size']:,} instâncias) em segundo plano. Você pode configurar os modelos enquanto isso.")
+                st.button("Verificar Geração")
+            else:
+                del st.session_state.synthetic_job
+                try:
+                    activate_synthetic_stream(job["future"].result(), job["key"], job["total_size"])
+                    st.success(f"✅ Stream '{job['family']}' criado com sucesso! Tamanho: {job['total_size']}")
                 except Exception as e:
                     st.error(f"Erro ao construir stream: {e}")
 
-        # Verifica status do stream sintético
-        if 'stream_data' in st.session_state and st.session_state.stream_data is not None:
-             if st.session_state.get('X_final_df') is None:
-                 total_instances = st.session_state.get('synthetic_max_instances', 15000)
-                 st.success(f"✅ Stream Sintético Ativo (Tamanho definido: {total_instances})")
-                 stream_ready = True
+    # Verifica status do stream sintético
+    if 'stream_data' in st.session_state and st.session_state.stream_data is not None:
+         if st.session_state.get('final_features') is None:
+             total_instances = st.session_state.get('synthetic_max_instances', 15000)
+             st.success(f"✅ Stream Sintético Ativo (Tamanho definido: {total_instances})")
+             stream_ready = True
 
 
 
@@ -247,6 +284,105 @@ with st.container(border=True):
             help="Simula perda de rótulos.",
             disabled=not stream_ready
         )
+        global_params["LABEL_SEED"] = st.number_input(
+            "Semente da Perda de Rótulos (LABEL_SEED)",
+            min_value=0,
+            value=1,
+            step=1,
+            help="Sorteia uma única vez quais rótulos ficam disponíveis; todos os modelos usam a mesma máscara, então a comparação entre eles é justa e reproduzível.",
+            disabled=not stream_ready or global_params["LABEL_PROBABILITY"] >= 1.0
+        )
+
+    c5, c6 = st.columns(2)
+    with c5:
+        global_params["BATCH_SIZE"] = st.number_input(
+            "Tamanho do Mini-batch (BATCH_SIZE)",
+            min_value=1,
+            max_value=10000,
+            value=1,
+            step=10,
+            help="Quantas instâncias são lidas e previstas por bloco. 1 = avaliação prequencial clássica, instância a instância. Valores maiores aumentam o throughput; as métricas finais continuam vindo do avaliador do MOA.",
+            disabled=not stream_ready
+        )
+    with c6:
+        global_params["BATCH_STRICT"] = st.checkbox(
+            "Teste-e-treino estrito por instância",
+            value=False,
+            help="Se marcado, cada instância do bloco é prevista e usada no treino antes da próxima (semântica prequencial exata). Se desmarcado, o bloco inteiro é previsto antes do treino: o modelo fica até BATCH_SIZE-1 instâncias defasado.",
+            disabled=not stream_ready or global_params["BATCH_SIZE"] == 1
+        )
+
+with st.container(border=True):
+    st.subheader("Corrida entre Modelos (Racing)")
+    st.markdown("Compara os modelos a cada janela com um teste sequencial de Bernstein empírico sobre os acertos pareados de cada instância e para de avaliar os que forem significativamente piores que o líder. Só se aplica à execução sequencial com mais de um modelo.")
+    racing_config = dict(DEFAULT_RACING)
+    racing_config["enabled"] = st.checkbox("Ativar corrida", value=False, disabled=not stream_ready)
+    if racing_config["enabled"]:
+        c1, c2 = st.columns(2)
+        racing_config["delta"] = c1.number_input("Confiança do Teste (δ)", 0.001, 0.5, 0.05, 0.01, format="%.3f", help="Probabilidade máxima de descartar por engano um modelo que não é pior.")
+        racing_config["min_windows"] = c2.number_input("Mínimo de Janelas", 1, 10000, 10, 1, help="Nenhum modelo é descartado antes deste número de janelas.")
+    global_params["RACING"] = racing_config if racing_config["enabled"] else None
+
+with st.container(border=True):
+    st.subheader("Transformações Online")
+    st.markdown("Tratamento de nulos/infinitos e padronização feitos instância a instância durante a avaliação, usando apenas estatísticas do passado do stream.")
+    online_enabled = st.checkbox(
+        "Aplicar transformações online",
+        value=st.session_state.get('imputation_method') == ONLINE_IMPUTATION,
+        help="Recomendado quando o Pré-processamento usou a imputação 'Online'. Atributos nominais não são transformados.",
+        disabled=not stream_ready
+    )
+    online_config = dict(DEFAULT_ONLINE_TRANSFORM)
+    if online_enabled:
+        c1, c2, c3 = st.columns(3)
+        online_config["clamp_inf"] = c1.checkbox("Limitar infinitos", value=True, help="Troca +inf/-inf pelo maior/menor valor finito já visto.")
+        online_config["impute"] = c2.checkbox("Imputar nulos", value=True)
+        online_config["scale"] = c3.checkbox("Padronizar (z-score)", value=False)
+        online_config["impute_quantile"] = c1.number_input("Quantil da Imputação", 0.0, 1.0, 0.5, 0.05, help="0.5 = mediana.")
+        online_config["impute_window"] = c2.number_input("Janela da Imputação", 50, 100000, 1000, 50, help="Quantas instâncias recentes entram no cálculo do quantil.")
+        online_config["impute_refresh_every"] = c3.number_input("Recalcular a cada", 1, 10000, 100, 10, help="Intervalo (em instâncias) para recalcular os valores de preenchimento.")
+    global_params["ONLINE_TRANSFORM"] = online_config if online_enabled else None
+
+with st.container(border=True):
+    st.subheader("JVM do capymoa")
+    st.markdown("Os modelos e detectores do capymoa rodam em uma JVM embutida. Heap e coletor de lixo (GC) só valem para JVMs ainda não iniciadas: as dos processos da execução paralela e da geração em segundo plano, e a do app após reiniciá-lo.")
+    jvm_config = load_jvm_config() or dict(DEFAULT_JVM_CONFIG)
+    c1, c2, c3 = st.columns(3)
+    jvm_heap_max = c1.number_input("Heap Máximo (MB)", 256, 262144, int(jvm_config["heap_max_mb"] or 8192), 256, help="-Xmx. Ensembles grandes (ARF/LeveragingBagging) precisam de mais heap; com pouco heap o GC roda sem parar.")
+    jvm_heap_initial = c2.number_input("Heap Inicial (MB, 0 = padrão)", 0, 262144, int(jvm_config["heap_initial_mb"] or 0), 256, help="-Xms. Igual ao máximo evita pausas para crescer o heap durante a avaliação.")
+    jvm_gc = c3.selectbox("Coletor de Lixo", list(GC_OPTIONS), index=list(GC_OPTIONS).index(jvm_config["gc"]) if jvm_config["gc"] in GC_OPTIONS else 0)
+    jvm_pause = c1.number_input("Pausa Alvo do GC (ms, 0 = padrão)", 0, 10000, int(jvm_config["max_gc_pause_ms"] or 0), 10, help="-XX:MaxGCPauseMillis (G1 e Parallel).")
+    jvm_extra = c2.text_input("Argumentos Extras", value=jvm_config["extra_args"] or "")
+    global_params["JVM_WARMUP_INSTANCES"] = c3.number_input(
+        "Instâncias de Aquecimento",
+        0, 100000, DEFAULT_WARMUP_INSTANCES, 500,
+        help="Cópias descartáveis dos modelos percorrem estas instâncias antes da medição, para o JIT compilar o código do MOA. 0 desativa.",
+        disabled=not stream_ready
+    )
+    new_jvm_config = {
+        "heap_max_mb": int(jvm_heap_max),
+        "heap_initial_mb": int(jvm_heap_initial) or None,
+        "gc": jvm_gc,
+        "max_gc_pause_ms": int(jvm_pause) or None,
+        "extra_args": jvm_extra.strip(),
+    }
+    st.caption(f"Argumentos: `{' '.join(jvm_args(new_jvm_config))}`")
+    global_params["INSTANCE_CACHE_MB"] = st.number_input(
+        "Cache de Instâncias (MB, 0 = desativado)",
+        0, 65536, DEFAULT_INSTANCE_CACHE_MB, 128,
+        help="Guarda as instâncias já convertidas para o formato do capymoa (até MAX_INSTANCES) e as reaproveita em novas avaliações do mesmo dataset neste processo, sem convertê-las de novo. As instâncias ocupam o heap da JVM: mantenha o orçamento bem abaixo do Heap Máximo. Os caches usados há mais tempo são descartados quando o orçamento acaba.",
+        disabled=not stream_ready
+    )
+    if st.button("Salvar Configuração da JVM"):
+        save_jvm_config(new_jvm_config)
+        if configure_jvm(new_jvm_config):
+            st.success("Configuração salva; será usada quando o capymoa for carregado.")
+        else:
+            st.success("Configuração salva para os novos processos. Reinicie o app para aplicá-la também à JVM atual.")
+    jvm_info = jvm_runtime_info()
+    if jvm_info is not None:
+        heap_max_text = f"{jvm_info['heap_max_mb']:,.0f} MB" if jvm_info["heap_max_mb"] else "sem limite"
+        st.caption(f"JVM em execução: heap máximo {heap_max_text}, coletores {', '.join(jvm_info['collectors'])}.")
 
 st.header("Seleção e Configuração dos Modelos", divider="rainbow")
 st.markdown("Configure os algoritmos de aprendizado e detecção.")
@@ -276,8 +412,9 @@ else:
             hyperparams[model_name] = {}
             
             if model_name == "LeveragingBagging":
+                sizing, sizing_version = render_ensemble_sizing(model_name)
                 c1, c2 = st.columns(2)
-                hyperparams[model_name]["ensemble_size"] = c1.number_input("Tamanho do Ensemble", 1, 500, 100, 10, key=f"{model_name}_ens")
+                hyperparams[model_name]["ensemble_size"] = c1.number_input("Tamanho do Ensemble", 1, 500, sizing["ensemble_size"] if sizing else 100, 10, key=f"{model_name}_ens_{sizing_version}")
                 hyperparams[model_name]["random_seed"] = c2.number_input("Random Seed", 1, 100, 1, key=f"{model_name}_rs")
             
             elif model_name == "HoeffdingAdaptiveTree":
@@ -289,9 +426,10 @@ else:
                 hyperparams[model_name]["nb_threshold"] = st.number_input("Limiar NaiveBayes", 0, 100, 0, key=f"{model_name}_nb")
 
             elif model_name == "AdaptiveRandomForest":
+                sizing, sizing_version = render_ensemble_sizing(model_name)
                 c1, c2, c3 = st.columns(3)
-                hyperparams[model_name]["ensemble_size"] = c1.number_input("Tamanho do Ensemble", 1, 500, 100, 10, key=f"{model_name}_ens")
-                hyperparams[model_name]["max_features"] = c2.number_input("Max Features", 0.1, 1.0, 0.6, 0.1, key=f"{model_name}_maxf")
+                hyperparams[model_name]["ensemble_size"] = c1.number_input("Tamanho do Ensemble", 1, 500, sizing["ensemble_size"] if sizing else 100, 10, key=f"{model_name}_ens_{sizing_version}")
+                hyperparams[model_name]["max_features"] = c2.number_input("Max Features", 0.1, 1.0, sizing["max_features"] if sizing else 0.6, 0.1, key=f"{model_name}_maxf_{sizing_version}")
                 hyperparams[model_name]["lambda_param"] = c3.number_input("Lambda", 1.0, 20.0, 6.0, 0.5, key=f"{model_name}_lambda")
                 hyperparams[model_name]["disable_drift_detection"] = st.checkbox("Desabilitar Drift Interno", False, key=f"{model_name}_drift")
 
@@ -303,6 +441,11 @@ else:
                 hyperparams[model_name]["leaf_prediction"] = st.selectbox("Preditor Folha", ['NaiveBayes', 'MC'], 0, key=f"{model_name}_leaf")
                 hyperparams[model_name]["nb_threshold"] = st.number_input("Limiar NaiveBayes", 0, 100, 0, key=f"{model_name}_nb")
 
+            # Registra a calibração nos metadados só se o tamanho sugerido foi mantido
+            if model_name in ("LeveragingBagging", "AdaptiveRandomForest") and sizing \
+                    and hyperparams[model_name]["ensemble_size"] == sizing["ensemble_size"]:
+                hyperparams[model_name]["sizing"] = sizing
+
             with st.expander("Configurar Detectores de Drift Externos"):
                 st.caption("Estes detectores rodarão em paralelo.")
                 c1, c2, c3 = st.columns(3)
@@ -324,6 +467,7 @@ with col2_btn:
             try:
                 st.session_state.evaluation_params = global_params
                 st.session_state.models_to_run = selected_models
+                st.session_state.model_hyperparams = hyperparams
                 
                 stream_schema = st.session_state.stream_data.schema
                 
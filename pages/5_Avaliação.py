@@ -1,12 +1,23 @@
 import streamlit as st
+from utils.profiling import PageStartup
+page_startup = PageStartup("Avaliação")
 import pandas as pd
 import altair as alt 
 import os
 import warnings 
 warnings.filterwarnings("ignore") 
-from utils.style import load_custom_css
-from utils.evaluation import run_evaluation_stream, get_attack_summary_table 
+from utils.style import load_custom_css, show_page_startup
+from utils.jvm import configure_jvm
+from utils.evaluation import run_evaluation_stream, get_attack_summary_table, CLASS_METRICS
+from utils.parallel_evaluation import run_evaluation_parallel
+from utils.live_charts import LiveChart
+from utils.checkpoint import checkpoint_key, has_checkpoint, checkpoint_count
+from utils.data_loader import DATA_DIR, BENIGN_LABEL
+from utils.aggregates import segments_between
+from utils.results_store import ResultsStore
+from utils.serving import ScoringService, start_server, stop_server, DEFAULT_PORT, DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT_MS
 import math 
+import time
 
 # Configuração da Página 
 load_custom_css("style.css")
@@ -15,11 +26,68 @@ st.set_page_config(
     page_icon="🛡️",
     layout="wide" 
 )
+show_page_startup(page_startup)
+# Antes da primeira importação do capymoa nesta sessão do app
+configure_jvm()
+# Importa o capymoa: só depois de configurar a JVM
+from utils.file_stream import FileBackedStream
+
+# Entradas do relatório final que são dicionários, exibidas em tabelas próprias
+NESTED_REPORT_KEYS = ("Latência", "JVM")
+
+# Gráficos ao vivo: máximo de pontos por gráfico e intervalo mínimo entre atualizações
+LIVE_POINT_BUDGET = 1000
+LIVE_REFRESH_SECONDS = 0.5
+CHECKPOINT_ROOT = os.path.join(DATA_DIR, "checkpoints")
+
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
 
 def chunk_list(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i + n]
 
+def build_latency_table(report_by_model):
+    """Uma linha por modelo e operação, com percentis de latência em µs."""
+    rows = []
+    for model_name, report in report_by_model.items():
+        for op, summary in report.get("Latência", {}).items():
+            rows.append({
+                "Modelo": model_name,
+                "Operação": op,
+                "p50 (µs)": summary["p50_us"],
+                "p95 (µs)": summary["p95_us"],
+                "p99 (µs)": summary["p99_us"],
+                "Chamadas": summary["count"]
+            })
+    return pd.DataFrame(rows)
+
+def build_jvm_table(report_by_model):
+    """Uma linha por modelo com heap e GC da JVM em que ele foi avaliado."""
+    rows = []
+    for model_name, report in report_by_model.items():
+        jvm = report.get("JVM")
+        if jvm is None:
+            continue
+        rows.append({
+            "Modelo": model_name,
+            "Pico do Heap (MB)": jvm["heap_peak_mb"],
+            "Heap Máximo (MB)": jvm["heap_max_mb"],
+            "Coletas de GC": jvm["gc_count"],
+            "Tempo em GC (ms)": jvm["gc_time_ms"],
+            "Maior GC em uma Janela (ms)": jvm["gc_max_window_ms"],
+            "Aquecimento (s)": jvm["warmup_s"],
+        })
+    return pd.DataFrame(rows)
+
+def make_live_accuracy_chart(df):
+    return alt.Chart(df).mark_line(interpolate='step').encode(
+        x=alt.X('Instância', axis=alt.Axis(format=',d')),
+        y=alt.Y('Acurácia', scale=alt.Scale(domain=[0.0, 1.0])),
+        tooltip=['Instância', 'Acurácia']
+    ).interactive()
+
 # Renderização da Página 
 st.title("Avaliação dos Modelos")
 
@@ -38,28 +106,100 @@ stream = st.session_state.stream_data
 models_to_evaluate = st.session_state.models_to_evaluate
 eval_params = st.session_state.evaluation_params
 models_to_run = st.session_state.models_to_run
-df_processed = st.session_state.df_processed
 target_col = st.session_state.target_col
 
 if 'evaluation_results' not in st.session_state:
     st.session_state.evaluation_results = None
 
 # --- Tabela de Ataques ---
-# with st.expander("Ver Resumo dos Ataques no Stream"):
-#     st.markdown("Esta tabela mostra onde cada ataque (não-BENIGN) começa e termina no *stream* de dados processado.")
-#     summary_table = get_attack_summary_table(df_processed, target_col)
-#     if summary_table.empty:
-#         st.info("Nenhum ataque (não-BENIGN) foi encontrado no stream processado.")
-#     else:
-#         st.dataframe(summary_table, width='stretch', hide_index=True)
+attack_segments = st.session_state.get('attack_segments')
+with st.expander("Ver Resumo dos Ataques no Stream"):
+    st.markdown("Esta tabela mostra onde cada ataque (não-BENIGN) começa e termina no *stream* de dados processado.")
+    summary_table = get_attack_summary_table(attack_segments, BENIGN_LABEL)
+    if attack_segments is None:
+        st.info("Resumo disponível apenas para bases reais pré-processadas (não sintéticas).")
+    elif summary_table.empty:
+        st.info("Nenhum ataque (não-BENIGN) foi encontrado no stream processado.")
+    else:
+        st.dataframe(summary_table, width='stretch', hide_index=True)
 
 # Botão de Execução
 st.header("Executar Avaliação Prequencial", divider="rainbow")
 st.markdown(f"Clique no botão abaixo para iniciar a avaliação de **{len(models_to_run)}** modelo(s) em **{eval_params.get('MAX_INSTANCES'):,}** instâncias.")
 
+MODE_SEQUENTIAL = "Sequencial"
+MODE_PARALLEL = "Paralelo (um processo por modelo)"
+can_run_parallel = (
+    isinstance(stream, FileBackedStream)
+    and len(models_to_run) > 1
+    and 'model_hyperparams' in st.session_state
+)
+execution_mode = st.radio(
+    "Modo de Execução",
+    [MODE_SEQUENTIAL, MODE_PARALLEL],
+    index=0,
+    horizontal=True,
+    disabled=not can_run_parallel,
+    help="No modo paralelo cada modelo roda em um processo próprio, lendo o mesmo stream em disco; o tempo total fica próximo ao do modelo mais lento. Requer o armazenamento 'Disco' no Pré-processamento e mais de um modelo. Os modelos treinados não voltam para a sessão."
+)
+
+with st.expander("Checkpoints (avaliações longas)"):
+    checkpoint_enabled = st.checkbox(
+        "Salvar checkpoints durante a avaliação",
+        value=False,
+        help="Salva periodicamente em disco o estado dos modelos, detectores, avaliadores, janelas e a posição no stream. Se a sessão cair, a avaliação pode ser retomada do último checkpoint."
+    )
+    checkpoint_every = st.number_input(
+        "Intervalo entre checkpoints (instâncias)",
+        min_value=eval_params.get("WINDOW_SIZE", 500),
+        max_value=10_000_000,
+        value=100_000,
+        step=10_000,
+        disabled=not checkpoint_enabled
+    )
+    final_features = st.session_state.get('final_features')
+    dataset_id = {
+        "file": st.session_state.get('file_to_analyze') if final_features is not None else f"synthetic:{st.session_state.get('synthetic_scenario_key')}",
+        "features": final_features,
+        "rows": st.session_state.get('n_processed_rows') if final_features is not None else None
+    }
+    checkpoint_dir = os.path.join(CHECKPOINT_ROOT, checkpoint_key(
+        dataset_id, models_to_run, st.session_state.get('model_hyperparams', {}), eval_params
+    ))
+    if execution_mode == MODE_PARALLEL and can_run_parallel:
+        resume_available = any(has_checkpoint(os.path.join(checkpoint_dir, m)) for m in models_to_run)
+        stored_counts = [checkpoint_count(os.path.join(checkpoint_dir, m)) for m in models_to_run]
+    else:
+        resume_available = has_checkpoint(checkpoint_dir)
+        stored_counts = [checkpoint_count(checkpoint_dir)]
+    # Uma avaliação concluída também deixa checkpoint: retomá-la só faz sentido
+    # para estendê-la com um MAX_INSTANCES maior
+    stored_counts = [c for c in stored_counts if c is not None]
+    checkpoint_complete = bool(stored_counts) and min(stored_counts) >= eval_params.get("MAX_INSTANCES", 10000)
+    if resume_available and checkpoint_complete:
+        st.caption(f"O checkpoint desta configuração já cobre {min(stored_counts):,} instâncias (a avaliação foi concluída). Retomá-lo só estende a avaliação se MAX_INSTANCES for maior; sem retomar, a avaliação recomeça do início.")
+    resume = st.checkbox(
+        "Retomar do último checkpoint",
+        value=resume_available and not checkpoint_complete,
+        disabled=not (checkpoint_enabled and resume_available),
+        help="Disponível quando existe um checkpoint desta mesma configuração (dados, modelos e parâmetros)."
+    )
+
+run_params = {
+    **eval_params,
+    "CHECKPOINT_DIR": checkpoint_dir if checkpoint_enabled else None,
+    "CHECKPOINT_EVERY": checkpoint_every,
+    "RESUME": checkpoint_enabled and resume and resume_available
+}
+
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     start_button_clicked = st.button("🚀 Iniciar Avaliação do Stream", type="primary")
+    save_to_store = st.checkbox(
+        "Salvar no histórico de execuções",
+        value=True,
+        help="Grava séries por janela, métricas finais, drifts e tempos no banco local de resultados, para comparar com avaliações futuras sem reexecutá-las."
+    )
 
 if start_button_clicked:
     st.session_state.evaluation_results = None
@@ -67,8 +207,11 @@ if start_button_clicked:
     
     progress_text = st.empty()
     progress_bar = st.progress(0, text="Iniciando...")
+    throughput_placeholder = st.empty()
+    racing_placeholder = st.empty()
+    racing_dropped = {}
     
-    live_placeholders = {}
+    live_charts = {}
     model_chunks = list(chunk_list(models_to_run, 4))
     
     for chunk in model_chunks:
@@ -76,15 +219,27 @@ if start_button_clicked:
         for i, model_name in enumerate(chunk):
             with live_chart_cols[i]:
                 st.markdown(f"##### {model_name}")
-                live_placeholders[model_name] = st.empty()
-
-    accuracy_history = []
-    drift_history = []
+                live_charts[model_name] = LiveChart(
+                    st.empty(), make_live_accuracy_chart, "Instância", "Acurácia",
+                    point_budget=LIVE_POINT_BUDGET
+                )
     
     stream.restart() 
     total_instances = eval_params.get("MAX_INSTANCES")
     
-    for result in run_evaluation_stream(stream, models_to_evaluate, eval_params):
+    if execution_mode == MODE_PARALLEL and can_run_parallel:
+        evaluation = run_evaluation_parallel(
+            stream.artifact_dir,
+            models_to_run,
+            st.session_state.model_hyperparams,
+            run_params
+        )
+    else:
+        evaluation = run_evaluation_stream(stream, models_to_evaluate, run_params)
+    
+    # A interface é atualizada por intervalo de tempo, não a cada janela
+    last_refresh = 0.0
+    for result in evaluation:
         
         if isinstance(result, dict):
             if result.get("status") == "completed":
@@ -97,64 +252,57 @@ if start_button_clicked:
         metrics_update, instance_count_history = result
         instance_idx = metrics_update.get("instance", 0)
         
+        for model_name, live_chart in live_charts.items():
+            if model_name in metrics_update:
+                live_chart.append(instance_idx, metrics_update[model_name].get("Acurácia", 0))
+
+        if metrics_update.get("racing_dropped"):
+            racing_dropped.update(metrics_update["racing_dropped"])
+            racing_placeholder.warning("\n\n".join(
+                f"**{m}** descartado na instância {info['instance']:,}: {info['reason']}"
+                for m, info in racing_dropped.items()
+            ))
+
+        now = time.monotonic()
+        if now - last_refresh < LIVE_REFRESH_SECONDS:
+            continue
+        last_refresh = now
+
         progress_percentage = instance_idx / total_instances
         progress_text.text(f"Processando instância {instance_idx:,} de {total_instances:,} ({progress_percentage:.1%})")
         progress_bar.progress(progress_percentage)
         
-        for model_name in models_to_run:
-            if model_name in metrics_update:
-                metrics = metrics_update[model_name]
-                accuracy_history.append({
-                    "Instância": instance_idx,
-                    "Modelo": model_name,
-                    "Acurácia": metrics.get("Acurácia", 0)
-                })
-                
-                # for detector in ["DDM", "ADWIN", "ABCD"]:
-                #     drift_key = f"Drift ({detector})"
-                #     if metrics.get(drift_key, 0) == 1:
-                #         drift_history.append({
-                #             "Instância": instance_idx,
-                #             "Modelo/Detector": f"{model_name} ({detector})",
-                #             "Detector": detector
-                #         })
-
-        if accuracy_history:
-            df_acc = pd.DataFrame(accuracy_history)
-            df_drift = pd.DataFrame(drift_history)
-            
-            for model_name, placeholder in live_placeholders.items():
-                
-                df_acc_model = df_acc[df_acc['Modelo'] == model_name]
-                
-                if not df_drift.empty:
-                    df_drift_model = df_drift[df_drift['Modelo/Detector'].str.startswith(model_name)]
-                else:
-                    df_drift_model = pd.DataFrame(columns=['Instância', 'Modelo/Detector', 'Detector'])
-                
-                acc_chart = alt.Chart(df_acc_model).mark_line(interpolate='step').encode(
-                    x=alt.X('Instância', axis=alt.Axis(format=',d')),
-                    y=alt.Y('Acurácia', scale=alt.Scale(domain=[0.0, 1.0])),
-                    tooltip=['Instância', 'Acurácia']
-                ).interactive()
-                
-                if not df_drift_model.empty:
-                    vlines = alt.Chart(df_drift_model).mark_rule(strokeDash=[5,5]).encode(
-                        x='Instância',
-                        color=alt.Color('Detector', title="Drift", legend=alt.Legend(orient='bottom')),
-                        tooltip=['Instância', 'Detector']
-                    )
-                    final_chart = acc_chart + vlines
-                else:
-                    final_chart = acc_chart
-                
-                placeholder.altair_chart(final_chart, width='stretch')
+        for live_chart in live_charts.values():
+            live_chart.render()
+
+        with throughput_placeholder.container():
+            st.metric("Vazão (instâncias/s)", f"{metrics_update.get('throughput', 0.0):,.0f}")
+            jvm_now = next((metrics_update[m]["JVM"] for m in models_to_run if "JVM" in metrics_update.get(m, {})), None)
+            if jvm_now is not None:
+                st.caption(f"JVM: heap em uso {jvm_now['heap_used_mb']:,.0f} MB · GC na última janela {jvm_now['gc_time_ms']:,.0f} ms")
+            latency_now = {m: metrics_update[m] for m in models_to_run if m in metrics_update}
+            st.dataframe(
+                build_latency_table(latency_now)[["Modelo", "Operação", "p50 (µs)", "p95 (µs)", "p99 (µs)"]]
+                if latency_now else pd.DataFrame(),
+                width='stretch', hide_index=True
+            )
+
+    for live_chart in live_charts.values():
+        live_chart.render()
 
     progress_text.text(f"Avaliação concluída! Processado {total_instances:,} instâncias.")
     progress_bar.progress(1.0)
     
     if st.session_state.evaluation_results:
         st.success("Avaliação finalizada!")
+        st.session_state.stored_run_ids = {}
+        if save_to_store:
+            st.session_state.stored_run_ids = get_results_store().record_evaluation(
+                st.session_state.evaluation_results,
+                dataset_id,
+                st.session_state.get('model_hyperparams', {}),
+                run_params
+            )
 
 # Exibição dos Resultados
 if st.session_state.evaluation_results:
@@ -170,11 +318,13 @@ if st.session_state.evaluation_results:
         for i, a in zip(instance_history, state["results_accuracy"])
     ])
     
-    df_metrics_final = pd.DataFrame(final_report).T.reset_index()
+    df_metrics_final = pd.DataFrame({
+        m: {k: v for k, v in report.items() if k not in NESTED_REPORT_KEYS} for m, report in final_report.items()
+    }).T.reset_index()
     df_metrics_final = df_metrics_final.rename(columns={"index": "Modelo"})
     
     # Formata as colunas para 4 casas decimais
-    for col in ["Acurácia", "F1-Score", "Precision", "Recall", "Kappa"]:
+    for col in ["Acurácia", "F1-Score", "Precision", "Recall", "Kappa", "Instâncias/s"]:
         if col in df_metrics_final.columns:
             df_metrics_final[col] = pd.to_numeric(df_metrics_final[col], errors='coerce').fillna(0.0)
             df_metrics_final[col] = df_metrics_final[col].map('{:,.4f}'.format)
@@ -183,24 +333,116 @@ if st.session_state.evaluation_results:
     tabs = st.tabs(tab_list)
     
     with tabs[0]:
-        st.subheader("Gráfico de Acurácia Comparativa")
+        col_acc, col_throughput = st.columns([2, 1])
         
-        acc_chart = alt.Chart(df_acc_final).mark_line(interpolate='step').encode(
-            x=alt.X('Instância', axis=alt.Axis(format=',d')),
-            y=alt.Y('Acurácia', scale=alt.Scale(domain=[0.0, 1.0])),
-            color=alt.Color('Modelo', legend=alt.Legend(orient='bottom')), 
-            tooltip=['Instância', 'Modelo', 'Acurácia']
-        ).interactive()
-        st.altair_chart(acc_chart, width='stretch')
+        with col_acc:
+            st.subheader("Gráfico de Acurácia Comparativa")
+            
+            # Execuções anteriores no mesmo dataset, lidas do banco de resultados
+            current_run_ids = set(st.session_state.get('stored_run_ids', {}).values())
+            past_runs = get_results_store().list_runs(dataset_id=dataset_id)
+            past_runs = past_runs[~past_runs["run_id"].isin(current_run_ids)]
+            df_acc_chart = df_acc_final
+            if not past_runs.empty:
+                past_labels = {
+                    row.run_id: f"{row.model} #{row.run_id} ({row.created_at}, acurácia {row.accuracy or 0:.2f})"
+                    for row in past_runs.itertuples()
+                }
+                selected_runs = st.multiselect(
+                    "Sobrepor execuções anteriores",
+                    list(past_labels),
+                    format_func=past_labels.get,
+                    help="Avaliações salvas no histórico com o mesmo dataset (arquivo, features e linhas)."
+                )
+                if selected_runs:
+                    df_past = get_results_store().load_windows(selected_runs)
+                    run_models = past_runs.set_index("run_id")["model"]
+                    df_acc_chart = pd.concat([df_acc_final, pd.DataFrame({
+                        "Instância": df_past["instance"],
+                        "Modelo": [f"{run_models[r]} #{r}" for r in df_past["run_id"]],
+                        "Acurácia": df_past["accuracy"]
+                    })], ignore_index=True)
+            
+            acc_chart = alt.Chart(df_acc_chart).mark_line(interpolate='step').encode(
+                x=alt.X('Instância', axis=alt.Axis(format=',d')),
+                y=alt.Y('Acurácia', scale=alt.Scale(domain=[0.0, 1.0])),
+                color=alt.Color('Modelo', legend=alt.Legend(orient='bottom')), 
+                tooltip=['Instância', 'Modelo', 'Acurácia']
+            ).interactive()
+            st.altair_chart(acc_chart, width='stretch')
+        
+        with col_throughput:
+            st.subheader("Vazão por Modelo")
+            if "throughput" in results:
+                st.metric("Vazão total (instâncias/s)", f"{results['throughput']:,.0f}")
+            if results.get("instance_cache"):
+                cache_stats = results["instance_cache"]
+                st.caption(f"Cache de instâncias: {cache_stats['hit_rate']:.0%} reaproveitadas · {cache_stats['cached_instances']:,} em cache ({cache_stats['memory_mb']:,.0f} de {cache_stats['budget_mb']:,.0f} MB)")
+            df_throughput = pd.DataFrame([
+                {"Modelo": m, "Instâncias/s": float(report.get("Instâncias/s", 0.0))}
+                for m, report in final_report.items()
+            ])
+            throughput_chart = alt.Chart(df_throughput).mark_bar().encode(
+                x=alt.X('Instâncias/s:Q', title="Instâncias/s (custo do modelo)"),
+                y=alt.Y('Modelo:N', sort='-x', title=None),
+                color=alt.Color('Modelo', legend=None),
+                tooltip=['Modelo', alt.Tooltip('Instâncias/s:Q', format=',.0f')]
+            )
+            st.altair_chart(throughput_chart, width='stretch')
         
         st.subheader("Métricas Cumulativas Finais")
         st.dataframe(df_metrics_final, width='stretch', hide_index=True)
+        
+        if results.get("racing"):
+            st.subheader("Modelos Descartados na Corrida")
+            st.caption("As métricas destes modelos cobrem apenas as instâncias avaliadas até o descarte.")
+            st.dataframe(pd.DataFrame([
+                {"Modelo": m, "Descartado na Instância": info["instance"], "Líder": info["leader"], "Motivo": info["reason"]}
+                for m, info in results["racing"].items()
+            ]), width='stretch', hide_index=True)
+        
+        df_latency = build_latency_table(final_report)
+        if not df_latency.empty:
+            st.subheader("Latência por Operação")
+            st.dataframe(
+                df_latency,
+                width='stretch',
+                hide_index=True,
+                column_config={
+                    col: st.column_config.NumberColumn(format="%.1f")
+                    for col in ["p50 (µs)", "p95 (µs)", "p99 (µs)"]
+                }
+            )
+
+        df_jvm = build_jvm_table(final_report)
+        if not df_jvm.empty:
+            st.subheader("Memória e GC da JVM")
+            st.caption("Na execução sequencial todos os modelos compartilham a mesma JVM; na paralela cada modelo tem a sua.")
+            st.dataframe(
+                df_jvm,
+                width='stretch',
+                hide_index=True,
+                column_config={
+                    col: st.column_config.NumberColumn(format="%.1f")
+                    for col in ["Pico do Heap (MB)", "Heap Máximo (MB)", "Tempo em GC (ms)", "Maior GC em uma Janela (ms)", "Aquecimento (s)"]
+                }
+            )
 
     for i, model_name in enumerate(models_to_run):
         with tabs[i+1]:
             state = models_final_state[model_name]
             
             st.subheader(f"Desempenho: {model_name}")
+            if model_name in results.get("racing", {}):
+                st.warning(f"Descartado na corrida: {results['racing'][model_name]['reason']}")
+            sizing = st.session_state.get('model_hyperparams', {}).get(model_name, {}).get("sizing")
+            if sizing:
+                st.caption(
+                    f"Ensemble dimensionado para {sizing['target_instances_per_s']:,.0f} instâncias/s: "
+                    f"{sizing['ensemble_size']} membros"
+                    + (f", max_features {sizing['max_features']}" if sizing["max_features"] is not None else "")
+                    + f" (previsão da calibração: {sizing['predicted_instances_per_s']:,.0f} instâncias/s)."
+                )
             
             df_acc_model = df_acc_final[df_acc_final['Modelo'] == model_name]
             drift_points_data = []
@@ -216,22 +458,61 @@ if st.session_state.evaluation_results:
                 tooltip=['Instância', 'Acurácia']
             ).interactive()
             
+            layers = [acc_chart_model]
+            if attack_segments is not None and instance_history and st.checkbox(
+                "Destacar trechos de ataque", key=f"{model_name}_attack_segments"
+            ):
+                # Só os trechos dentro do intervalo avaliado, localizados por busca binária no índice
+                df_segments = segments_between(attack_segments, 0, instance_history[-1] - 1)
+                df_segments = df_segments[df_segments["label"] != BENIGN_LABEL].rename(
+                    columns={"label": "Ataque", "start": "Início", "end": "Fim"}
+                )
+                if not df_segments.empty:
+                    layers.insert(0, alt.Chart(df_segments).mark_rect(opacity=0.15).encode(
+                        x='Início:Q',
+                        x2='Fim:Q',
+                        color=alt.Color('Ataque:N', legend=alt.Legend(orient='bottom')),
+                        tooltip=['Ataque', 'Início', 'Fim']
+                    ))
             if not df_drift_points.empty:
-                vlines = alt.Chart(df_drift_points).mark_rule(strokeDash=[5,5]).encode(
+                layers.append(alt.Chart(df_drift_points).mark_rule(strokeDash=[5,5]).encode(
                     x='Instância',
                     color=alt.Color('Detector', title="Drift", legend=alt.Legend(orient='bottom')),
                     tooltip=['Instância', 'Detector']
+                ))
+            st.altair_chart(alt.layer(*layers).resolve_scale(color='independent'), width='stretch')
+
+            if "results_class_recall" in state and len(state["results_class_recall"]):
+                st.subheader("Métricas por Classe (Janeladas)")
+                metric = st.radio(
+                    "Métrica",
+                    list(CLASS_METRICS),
+                    format_func=CLASS_METRICS.get,
+                    horizontal=True,
+                    key=f"{model_name}_class_metric"
                 )
-                st.altair_chart(acc_chart_model + vlines, width='stretch')
-            else:
-                st.altair_chart(acc_chart_model, width='stretch')
+                values = state[f"results_class_{metric}"]
+                n_classes = values.shape[1]
+                class_names = list(st.session_state.label_encoder.classes_) \
+                    if 'label_encoder' in st.session_state and len(st.session_state.label_encoder.classes_) == n_classes \
+                    else [f"Classe {k}" for k in range(n_classes)]
+                df_class = pd.DataFrame(values, columns=class_names)
+                df_class["Instância"] = instance_history[:len(df_class)]
+                df_class = df_class.melt(id_vars="Instância", var_name="Classe", value_name="Valor").dropna()
+                class_chart = alt.Chart(df_class).mark_line(interpolate='step').encode(
+                    x=alt.X('Instância', axis=alt.Axis(format=',d')),
+                    y=alt.Y('Valor', title=CLASS_METRICS[metric], scale=alt.Scale(domain=[0.0, 1.0])),
+                    color=alt.Color('Classe', legend=alt.Legend(orient='bottom')),
+                    tooltip=['Instância', 'Classe', alt.Tooltip('Valor', format='.4f')]
+                ).interactive()
+                st.altair_chart(class_chart, width='stretch')
 
             col_metrics, col_drift_chart = st.columns([1, 1])
 
             with col_metrics:
                 st.subheader("Métricas Cumulativas")
                 model_metrics = final_report[model_name]
-                model_metrics_float = {k: float(v) for k, v in model_metrics.items()}
+                model_metrics_float = {k: float(v) for k, v in model_metrics.items() if k not in NESTED_REPORT_KEYS}
                 
                 st.dataframe(
                     pd.Series(model_metrics_float, name="Score"), 
@@ -263,4 +544,61 @@ if st.session_state.evaluation_results:
                 )
                 
                 chart = bars + text
-                st.altair_chart(chart, width='stretch')
\ No newline at end of file
+                st.altair_chart(chart, width='stretch')
+    # --- Serviço de Pontuação ---
+    st.header("Servir Modelo Treinado", divider="rainbow")
+    servable_models = [m for m in models_to_run if "model_instance" in models_final_state.get(m, {})]
+    final_features = st.session_state.get('final_features')
+    scoring_server = st.session_state.get('scoring_server')
+
+    if scoring_server is not None:
+        host, port = scoring_server.server_address[:2]
+        st.success(
+            f"Servindo **{st.session_state.scoring_model}** em `http://{host}:{port}` — "
+            "`POST /score` e `POST /feedback` com `{\"records\": [...], \"labels\": [...]}`, `GET /stats`."
+        )
+        service_stats = scoring_server.service.stats()
+        s1, s2, s3, s4, s5 = st.columns(5)
+        s1.metric("Vazão (instâncias/s)", f"{service_stats['throughput']:,.0f}")
+        s2.metric("Latência p99 (ms)", f"{service_stats['latency_p99_ms']:.2f}")
+        s3.metric("Instâncias Pontuadas", f"{service_stats['scored']:,}")
+        s4.metric("Atualizações Online", f"{service_stats['trained']:,}")
+        s5.metric("Tamanho Médio do Lote", f"{service_stats['mean_batch_size']:.1f}")
+        b1, b2 = st.columns(2)
+        b1.button("Atualizar Estatísticas")
+        if b2.button("Parar Serviço"):
+            stop_server(scoring_server)
+            del st.session_state.scoring_server
+            st.rerun()
+    elif not servable_models:
+        st.info("No modo paralelo os modelos treinados não voltam para a sessão; execute a avaliação no modo sequencial para servi-los.")
+    elif final_features is None:
+        st.info("Só é possível servir modelos treinados sobre uma base real pré-processada (não sintética).")
+    elif st.session_state.get('feature_selection_method') == 'PCA (Extração de Componentes)':
+        st.info("Modelos treinados sobre componentes do PCA não podem ser servidos: os registros recebidos trazem as features originais.")
+    else:
+        st.markdown("Expõe um modelo treinado em um endpoint HTTP local. As requisições são agrupadas em micro-lotes dentro do orçamento de latência; o feedback rotulado atualiza o modelo online.")
+        c1, c2, c3, c4 = st.columns(4)
+        serve_model = c1.selectbox("Modelo", servable_models)
+        serve_port = c2.number_input("Porta", 1024, 65535, DEFAULT_PORT)
+        serve_max_batch = c3.number_input("Tamanho Máximo do Lote", 1, 10000, DEFAULT_MAX_BATCH)
+        serve_max_wait = c4.number_input("Espera Máxima (ms)", 0.0, 1000.0, DEFAULT_MAX_WAIT_MS, 1.0)
+        serve_updates = st.checkbox("Aceitar feedback rotulado (atualização online)", value=True)
+        if st.button("Iniciar Serviço", type="primary"):
+            service = ScoringService(
+                models_final_state[serve_model]["model_instance"],
+                stream.get_schema(),
+                final_features,
+                st.session_state.label_encoder.classes_,
+                transformer=results.get("transformer"),
+                max_batch=serve_max_batch,
+                max_wait_ms=serve_max_wait,
+                allow_updates=serve_updates
+            )
+            try:
+                st.session_state.scoring_server = start_server(service, port=int(serve_port))
+                st.session_state.scoring_model = serve_model
+                st.rerun()
+            except OSError as e:
+                service.stop()
+                st.error(f"Não foi possível abrir a porta {serve_port}: {e}")
@@ -0,0 +1,70 @@
+from utils.instance_cache import InstanceCacheRegistry, CachedStream
+
+
+class _Schema:
+    def get_num_attributes(self):
+        return 4
+
+
+class CountingStream:
+    """Stream em memória sem seek (como o NumpyStream), que conta as conversões."""
+
+    def __init__(self, n_instances):
+        self.n_instances = n_instances
+        self.pos = 0
+        self.conversions = 0
+
+    def get_schema(self):
+        return _Schema()
+
+    def has_more_instances(self):
+        return self.pos < self.n_instances
+
+    def next_instance(self):
+        self.conversions += 1
+        self.pos += 1
+        return object()
+
+    def restart(self):
+        self.pos = 0
+
+
+def _run(stream, registry, max_instances):
+    """Mesmo laço da avaliação: o limite é testado antes do stream."""
+    cached = CachedStream(stream, registry.get(stream), registry, max_instances)
+    count = 0
+    while count < max_instances and cached.has_more_instances():
+        cached.next_instance()
+        count += 1
+    return cached, count
+
+
+def test_warm_run_does_not_touch_the_source():
+    registry = InstanceCacheRegistry(budget_mb=64)
+    stream = CountingStream(20000)
+
+    _, count = _run(stream, registry, 5000)
+    assert count == 5000
+    assert stream.conversions == 5000
+
+    stream.conversions = 0
+    cached, count = _run(stream, registry, 5000)
+    assert count == 5000
+    assert stream.conversions == 0
+    assert cached.hits == 5000
+    # Mesmo perguntado de novo no limite, o wrapper não reposiciona o stream
+    assert not cached.has_more_instances()
+    assert stream.conversions == 0
+
+
+def test_warm_run_on_a_stream_shorter_than_the_limit():
+    registry = InstanceCacheRegistry(budget_mb=64)
+    stream = CountingStream(3000)
+
+    _, count = _run(stream, registry, 5000)
+    assert count == 3000
+
+    stream.conversions = 0
+    _, count = _run(stream, registry, 5000)
+    assert count == 3000
+    assert stream.conversions == 0
@@ -0,0 +1,38 @@
+import numpy as np
+
+from utils.racing import DEFAULT_RACING, HoeffdingRace
+
+# Padrões da página de Modelos: 20k instâncias em janelas de 500
+MAX_INSTANCES = 20000
+WINDOW_SIZE = 500
+
+
+def _run_race(accuracies, seed=0):
+    """Corrida com acertos independentes por instância; devolve {modelo: janela do descarte}."""
+    rng = np.random.default_rng(seed)
+    race = HoeffdingRace(DEFAULT_RACING["delta"], DEFAULT_RACING["min_windows"])
+    active = dict(accuracies)
+    dropped_at = {}
+    for window in range(1, MAX_INSTANCES // WINDOW_SIZE + 1):
+        window_correct = {m: rng.random(WINDOW_SIZE) < acc for m, acc in active.items()}
+        for model_name in race.update(window_correct, window * WINDOW_SIZE):
+            dropped_at[model_name] = window
+            del active[model_name]
+    return dropped_at
+
+
+def test_clearly_worse_model_is_dropped_within_default_budget():
+    dropped_at = _run_race({"bom": 0.95, "pior": 0.85})
+    assert "bom" not in dropped_at
+    assert dropped_at["pior"] <= MAX_INSTANCES // WINDOW_SIZE
+
+
+def test_much_worse_model_is_dropped_at_min_windows():
+    dropped_at = _run_race({"bom": 0.95, "medio": 0.90, "ruim": 0.65})
+    assert dropped_at["ruim"] == DEFAULT_RACING["min_windows"]
+    assert "bom" not in dropped_at
+
+
+def test_equal_models_are_not_dropped():
+    for seed in range(20):
+        assert _run_race({"a": 0.9, "b": 0.9, "c": 0.9}, seed) == {}
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Resoluções dos cubos temporais (rótulo da UI -> frequência do pandas), da mais fina para a mais grossa
+TIME_RESOLUTIONS = {
+    "1 minuto": "1min",
+    "5 minutos": "5min",
+    "15 minutos": "15min",
+    "1 hora": "1h",
+}
+
+
+def build_class_counts(y_codes, class_names):
+    counts = np.bincount(np.asarray(y_codes, dtype=np.int64), minlength=len(class_names))
+    return pd.DataFrame({"Label": list(class_names), "Contagem": counts})
+
+
+def build_time_cubes(timestamps, y_codes, class_names, resolutions=TIME_RESOLUTIONS):
+    """
+    Contagem de instâncias por rótulo e por intervalo de tempo, em várias
+    resoluções. Os dados são varridos uma única vez na resolução mais fina;
+    as demais são agregadas a partir desse cubo (que já é pequeno).
+    """
+    timestamps = pd.to_datetime(pd.Series(timestamps).reset_index(drop=True))
+    y_codes = np.asarray(y_codes, dtype=np.int64)
+    valid = timestamps.notna().values
+    if not valid.any():
+        return {}
+
+    n_classes = len(class_names)
+    freqs = list(resolutions.items())
+    _, finest_freq = freqs[0]
+
+    bins = timestamps[valid].dt.floor(finest_freq).values
+    unique_bins, bin_idx = np.unique(bins, return_inverse=True)
+    counts = np.bincount(
+        bin_idx * n_classes + y_codes[valid],
+        minlength=len(unique_bins) * n_classes
+    ).reshape(len(unique_bins), n_classes)
+
+    cubes = {}
+    for label, freq in freqs:
+        if freq == finest_freq:
+            cube_bins, cube_counts = unique_bins, counts
+        else:
+            coarse = pd.DatetimeIndex(unique_bins).floor(freq).values
+            cube_bins, coarse_idx = np.unique(coarse, return_inverse=True)
+            cube_counts = np.zeros((len(cube_bins), n_classes), dtype=counts.dtype)
+            np.add.at(cube_counts, coarse_idx, counts)
+
+        rows, cols = np.nonzero(cube_counts)
+        cubes[label] = pd.DataFrame({
+            "time_bin": cube_bins[rows],
+            "Label": np.asarray(class_names, dtype=object)[cols],
+            "Contagem": cube_counts[rows, cols]
+        })
+    return cubes
+
+
+def build_viz_cubes(y_codes, class_names, timestamps=None):
+    """Tabelas compactas usadas pelos gráficos da página de Pré-processamento."""
+    cubes = {"class_counts": build_class_counts(y_codes, class_names), "time_counts": {}}
+    if timestamps is not None:
+        cubes["time_counts"] = build_time_cubes(timestamps, y_codes, class_names)
+    return cubes
+
+
+# --- Índice de Segmentos de Rótulo ---
+def build_label_segments(y_codes, class_names):
+    """
+    Codificação run-length dos rótulos na ordem do stream: uma linha por
+    trecho contíguo com o mesmo rótulo (início e fim inclusivos, em posições
+    do stream). Uma única passada vetorizada; o resultado tem o tamanho do
+    número de trocas de rótulo, não do dataset.
+    """
+    y_codes = np.asarray(y_codes, dtype=np.int64)
+    if len(y_codes) == 0:
+        return pd.DataFrame({"label": pd.Series(dtype=object), "start": pd.Series(dtype=np.int64),
+                             "end": pd.Series(dtype=np.int64), "count": pd.Series(dtype=np.int64)})
+    changes = np.flatnonzero(y_codes[1:] != y_codes[:-1]) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(y_codes)])) - 1
+    return pd.DataFrame({
+        "label": np.asarray(class_names, dtype=object)[y_codes[starts]],
+        "start": starts,
+        "end": ends,
+        "count": ends - starts + 1
+    })
+
+
+def segments_between(segments, start, end):
+    """Segmentos que se sobrepõem às posições [start, end] (busca binária nos fins, que são crescentes)."""
+    first = np.searchsorted(segments["end"].values, start, side="left")
+    last = np.searchsorted(segments["start"].values, end, side="right")
+    return segments.iloc[first:last]
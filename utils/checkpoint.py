@@ -0,0 +1,98 @@
+import io
+import os
+import json
+import hashlib
+
+CHECKPOINT_FILENAME = "checkpoint.pkl"
+# Resumo legível sem desserializar o checkpoint (instâncias já processadas)
+CHECKPOINT_META_FILENAME = "checkpoint.json"
+
+# Parâmetros de execução que não mudam o resultado da avaliação e ficam fora
+# dos hashes de configuração (checkpoint, banco de resultados e varreduras)
+RESULT_IGNORED_PARAMS = ("CHECKPOINT_DIR", "CHECKPOINT_EVERY", "RESUME", "JVM_WARMUP_INSTANCES", "INSTANCE_CACHE_MB")
+# O checkpoint também ignora MAX_INSTANCES: a mesma avaliação pode ser estendida
+CHECKPOINT_IGNORED_PARAMS = ("MAX_INSTANCES",) + RESULT_IGNORED_PARAMS
+
+
+def checkpoint_key(dataset_id, models_to_run, all_model_params, eval_params):
+    """Hash da configuração da avaliação: mesma chave = checkpoint reaproveitável."""
+    config = {
+        "dataset": dataset_id,
+        "models": sorted(models_to_run),
+        "model_params": {m: all_model_params.get(m, {}) for m in sorted(models_to_run)},
+        "eval_params": {k: v for k, v in eval_params.items() if k not in CHECKPOINT_IGNORED_PARAMS},
+    }
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def get_checkpoint_path(checkpoint_dir):
+    return os.path.join(checkpoint_dir, CHECKPOINT_FILENAME)
+
+
+def has_checkpoint(checkpoint_dir):
+    return bool(checkpoint_dir) and os.path.exists(get_checkpoint_path(checkpoint_dir))
+
+
+def save_checkpoint(checkpoint_dir, payload):
+    """
+    Serializa o checkpoint (objetos Python e Java misturados) com o JPickler
+    do JPype. A escrita é atômica: grava em um arquivo temporário e o troca
+    pelo definitivo, para que uma interrupção nunca deixe um checkpoint pela metade.
+    """
+    from jpype.pickle import JPickler
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = get_checkpoint_path(checkpoint_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        JPickler(f).dump(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    meta_path = os.path.join(checkpoint_dir, CHECKPOINT_META_FILENAME)
+    with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"count": payload.get("count")}, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    return path
+
+
+def checkpoint_count(checkpoint_dir):
+    """Instâncias já processadas no checkpoint, ou None se não houver checkpoint ou resumo."""
+    meta_path = os.path.join(checkpoint_dir, CHECKPOINT_META_FILENAME)
+    if not has_checkpoint(checkpoint_dir) or not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f).get("count")
+
+
+def load_checkpoint(checkpoint_dir, models_to_run):
+    """Carrega o último checkpoint, ou None se não existir ou for de outro conjunto de modelos."""
+    if not has_checkpoint(checkpoint_dir):
+        return None
+    from jpype.pickle import JUnpickler
+
+    with open(get_checkpoint_path(checkpoint_dir), "rb") as f:
+        payload = JUnpickler(f).load()
+    if sorted(payload.get("states", {})) != sorted(models_to_run):
+        return None
+    return payload
+
+
+def copy_with_java_objects(obj):
+    """Cópia profunda de objetos com partes Java (ex.: modelos do capymoa), via JPickler em memória."""
+    from jpype.pickle import JPickler, JUnpickler
+
+    buffer = io.BytesIO()
+    JPickler(buffer).dump(obj)
+    buffer.seek(0)
+    return JUnpickler(buffer).load()
+
+
+def clear_checkpoint(checkpoint_dir):
+    if has_checkpoint(checkpoint_dir):
+        os.remove(get_checkpoint_path(checkpoint_dir))
+    meta_path = os.path.join(checkpoint_dir, CHECKPOINT_META_FILENAME)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
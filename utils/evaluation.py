@@ -1,257 +1,322 @@
 import pandas as pd
 import numpy as np
-import random
-from collections import deque
-import streamlit as st 
-
-from capymoa.classifier import (
-    LeveragingBagging,
-    HoeffdingTree,
-    HoeffdingAdaptiveTree,
-    AdaptiveRandomForestClassifier,
+import time
+from utils.online_transform import build_online_transform
+from utils.metrics import (
+    WindowedConfusion,
+    GrowableArray,
+    DriftEventStore
 )
-from capymoa.evaluation import ClassificationEvaluator
-from capymoa.drift.detectors import DDM, ADWIN, ABCD
+from utils.profiling import LatencyHistogram
+from utils.checkpoint import save_checkpoint, load_checkpoint
+from utils.label_delay import build_label_mask, DelayedLabelBuffer
+from utils.racing import HoeffdingRace
+from utils.jvm import JVM_SAMPLE_FIELDS, warm_up_models, create_jvm_sampler, jvm_summary
+from utils.instance_cache import CachedStream, cached_stream
 
-@st.cache_data
-def get_attack_summary_table(df_processed, target_col):
-    if target_col not in df_processed.columns:
-        return pd.DataFrame(columns=["Ataque", "Início (Instância)", "Fim (Instância)", "Total de Amostras"])
+# Sufixos usados nas chaves do estado: "drift_<det>" (detector) e "results_drift_<det>" (detecções)
+DRIFT_DETECTORS = ("ddm", "adwin", "ABCD")
+# Operações cronometradas por modelo (predict, train e cada detector)
+LATENCY_OPS = ("predict", "train") + DRIFT_DETECTORS
+# Métricas por classe calculadas a cada janela: chave no estado ("results_class_<m>") e no yield
+CLASS_METRICS = {"recall": "Recall por Classe", "precision": "Precision por Classe", "fpr": "FPR por Classe"}
 
-    attacks_df = df_processed[df_processed[target_col] != 'BENIGN'].copy()
-    
-    if attacks_df.empty:
-        return pd.DataFrame(columns=["Ataque", "Início (Instância)", "Fim (Instância)", "Total de Amostras"])
+def get_attack_summary_table(attack_segments, benign_label='BENIGN'):
+    """Onde cada ataque começa e termina no stream, lido do índice de segmentos do pré-processamento."""
+    columns = ["Ataque", "Início (Instância)", "Fim (Instância)", "Total de Amostras", "Segmentos"]
+    if attack_segments is None:
+        return pd.DataFrame(columns=columns)
+    attacks = attack_segments[attack_segments["label"] != benign_label]
+    if attacks.empty:
+        return pd.DataFrame(columns=columns)
 
-    attacks_df.reset_index(inplace=True) 
-    
-    summary = attacks_df.groupby(target_col)['index'].agg(
-        Início_Instância='min',
-        Fim_Instância='max',
-        Total_Amostras='count'
+    summary = attacks.groupby("label", sort=False).agg(
+        start=("start", "min"), end=("end", "max"), count=("count", "sum"), segments=("start", "size")
     ).reset_index()
-    
-    summary.rename(columns={target_col: 'Ataque'}, inplace=True)
-    
-    return summary
+    summary.columns = columns
+    return summary.sort_values("Início (Instância)", ignore_index=True)
 
-def get_models(schema, global_params, models_to_run, all_model_params):
-    window_size = global_params.get("WINDOW_SIZE", 500)
-    delay_length = global_params.get("DELAY_LENGTH", None)
-    
-    models_to_test = {}
-    
-    if "LeveragingBagging" in models_to_run:
-        params = all_model_params.get("LeveragingBagging", {})
-        models_to_test["LeveragingBagging"] = {
-            "model_instance": LeveragingBagging(
-                schema=schema, 
-                random_seed=params.get("random_seed", 1),
-                ensemble_size=params.get("ensemble_size", 100)
-            ),
-            "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
-            "drift_ddm": DDM(
-                min_n_instances=params.get("ddm_min_instances", 30),
-                warning_level=params.get("ddm_warning_level", 2.0),
-                out_control_level=params.get("ddm_out_control_level", 3.0)
-            ),
-            "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
-            "results_accuracy": [],
-            "results_drift_ddm": [],
-            "results_drift_adwin": [],
-            "results_drift_ABCD": []
-        }
+def _prediction_index(prediction):
+    try:
+        prediction = prediction[0]
+    except (IndexError, TypeError):
+        pass
+    return -1 if prediction is None else int(prediction)
 
-    if "HoeffdingAdaptiveTree" in models_to_run:
-        params = all_model_params.get("HoeffdingAdaptiveTree", {})
-        models_to_test["HoeffdingAdaptiveTree"] = {
-            "model_instance": HoeffdingAdaptiveTree(
-                schema=schema,
-                random_seed=params.get("random_seed", 0),
-                grace_period=params.get("grace_period", 200),
-                confidence=params.get("confidence", 0.01),
-                tie_threshold=params.get("tie_threshold", 0.05),
-                leaf_prediction=params.get("leaf_prediction", 'NaiveBayesAdaptive'),
-                nb_threshold=params.get("nb_threshold", 0)
-            ),
-            "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
-            "drift_ddm": DDM(
-                min_n_instances=params.get("ddm_min_instances", 30),
-                warning_level=params.get("ddm_warning_level", 2.0),
-                out_control_level=params.get("ddm_out_control_level", 3.0)
-            ),
-            "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
-            "results_accuracy": [],
-            "results_drift_ddm": [],
-            "results_drift_adwin": [],
-            "results_drift_ABCD": []
-        }
+def _next_block(stream, size):
+    block = []
+    while len(block) < size and stream.has_more_instances():
+        block.append(stream.next_instance())
+    return block
 
-    if "AdaptiveRandomForest" in models_to_run:
-        params = all_model_params.get("AdaptiveRandomForest", {})
-        models_to_test["AdaptiveRandomForest"] = {
-            "model_instance": AdaptiveRandomForestClassifier(
-                schema=schema,
-                random_seed=params.get("random_seed", 1),
-                ensemble_size=params.get("ensemble_size", 100),
-                max_features=params.get("max_features", 0.6),
-                lambda_param=params.get("lambda_param", 6.0),
-                disable_drift_detection=params.get("disable_drift_detection", False)
-            ),
-            "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
-            "drift_ddm": DDM(
-                min_n_instances=params.get("ddm_min_instances", 30),
-                warning_level=params.get("ddm_warning_level", 2.0),
-                out_control_level=params.get("ddm_out_control_level", 3.0)
-            ),
-            "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
-            "results_accuracy": [],
-            "results_drift_ddm": [],
-            "results_drift_adwin": [],
-            "results_drift_ABCD": []
-        }
+def _train(model, instance, latency):
+    t0 = time.perf_counter()
+    model.train(instance)
+    latency["train"].add(time.perf_counter() - t0)
 
-    if "HoeffdingTree" in models_to_run:
-        params = all_model_params.get("HoeffdingTree", {})
-        models_to_test["HoeffdingTree"] = {
-            "model_instance": HoeffdingTree(
-                schema=schema, 
-                random_seed=params.get("random_seed", 1),
-                grace_period=params.get("grace_period", 200),
-                confidence=params.get("confidence", 0.01),
-                tie_threshold=params.get("tie_threshold", 0.05),
-                leaf_prediction=params.get("leaf_prediction", 'NaiveBayes'),
-                nb_threshold=params.get("nb_threshold", 0)
-            ),
-            "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
-            "drift_ddm": DDM(
-                min_n_instances=params.get("ddm_min_instances", 30),
-                warning_level=params.get("ddm_warning_level", 2.0),
-                out_control_level=params.get("ddm_out_control_level", 3.0)
-            ),
-            "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
-            "results_accuracy": [],
-            "results_drift_ddm": [],
-            "results_drift_adwin": [],
-            "results_drift_ABCD": []
-        }
-        
-    if delay_length is not None and delay_length > 0:
-        log_msg = f"Aplicando um delay de {delay_length} instâncias."
-        for model_name in models_to_test:
-            models_to_test[model_name]["prediction_queue"] = deque(maxlen=delay_length)
-    else:
-        log_msg = "Nenhum delay aplicado."
+def _latency_report(histograms, n_instances):
+    """Percentis por operação e vazão do modelo (instâncias / tempo gasto só com ele)."""
+    busy_s = sum(h.total_s for h in histograms.values())
+    return {
+        "Latência": {op: h.summary() for op, h in histograms.items()},
+        "Instâncias/s": n_instances / busy_s if busy_s > 0 else 0.0
+    }
 
-    return models_to_test, log_msg
+def _save_evaluation_checkpoint(checkpoint_dir, models_to_evaluate, count, instance_count_history, transformer, label_buffer, race):
+    # A máscara de rótulos é refeita a partir da semente; só o buffer circular (se houver) é salvo
+    save_checkpoint(checkpoint_dir, {
+        "count": count,
+        "instance_count_history": instance_count_history,
+        "states": models_to_evaluate,
+        "transformer": transformer,
+        "label_ring": label_buffer.ring,
+        "race": race
+    })
 
 def run_evaluation_stream(stream, models_to_evaluate, eval_params):
     MAX_INSTANCES = eval_params.get("MAX_INSTANCES", 10000)
     WINDOW_SIZE = eval_params.get("WINDOW_SIZE", 500)
     DELAY_LENGTH = eval_params.get("DELAY_LENGTH", None)
     LABEL_PROBABILITY = eval_params.get("LABEL_PROBABILITY", 1.0)
+    # Semente da máscara de disponibilidade de rótulos, a mesma para todos os modelos
+    LABEL_SEED = eval_params.get("LABEL_SEED", 1)
+    # Mini-batch: BATCH_SIZE instâncias são lidas e previstas de uma vez. Com
+    # BATCH_STRICT=False todas as previsões do bloco são feitas antes de treinar
+    # com ele (aproximação: o modelo fica até BATCH_SIZE-1 instâncias defasado).
+    # Com BATCH_STRICT=True cada instância é prevista e treinada em sequência.
+    BATCH_SIZE = max(1, int(eval_params.get("BATCH_SIZE") or 1))
+    BATCH_STRICT = eval_params.get("BATCH_STRICT", False)
+    # Checkpoint: a cada CHECKPOINT_EVERY instâncias (na fronteira de janela) o
+    # estado completo é salvo em CHECKPOINT_DIR; com RESUME a avaliação
+    # continua do último checkpoint salvo ali.
+    CHECKPOINT_DIR = eval_params.get("CHECKPOINT_DIR")
+    CHECKPOINT_EVERY = max(1, int(eval_params.get("CHECKPOINT_EVERY") or 100000))
+    RESUME = eval_params.get("RESUME", False)
+    # Corrida: modelos significativamente piores que o líder deixam de ser avaliados
+    RACING = eval_params.get("RACING") or {}
+    # Aquecimento da JVM com cópias descartáveis dos modelos, antes da medição
+    JVM_WARMUP_INSTANCES = int(eval_params.get("JVM_WARMUP_INSTANCES") or 0)
+    # Cache das instâncias já construídas do prefixo do stream, reaproveitado
+    # entre avaliações no mesmo processo (orçamento em MB; 0 desativa)
+    INSTANCE_CACHE_MB = float(eval_params.get("INSTANCE_CACHE_MB") or 0)
     
     instance_count_history = []
     
-    if DELAY_LENGTH is not None and DELAY_LENGTH > 0:
-        for model_name in models_to_evaluate:
-            models_to_evaluate[model_name]["prediction_queue"] = deque(maxlen=DELAY_LENGTH)
+    if INSTANCE_CACHE_MB > 0:
+        stream = cached_stream(stream, MAX_INSTANCES, INSTANCE_CACHE_MB)
+    schema = stream.get_schema()
+    n_classes = schema.get_num_classes()
+    n_windows = MAX_INSTANCES // WINDOW_SIZE + 1
+    for model_name, state in models_to_evaluate.items():
+        state["window_confusion"] = WindowedConfusion(WINDOW_SIZE, n_classes)
+        state["window_accuracy"] = GrowableArray(n_windows)
+        state["window_class_metrics"] = {
+            metric: GrowableArray(n_windows, row_shape=(n_classes,)) for metric in CLASS_METRICS
+        }
+        state["drift_events"] = {det: DriftEventStore(n_windows) for det in DRIFT_DETECTORS}
+        # Histograma da janela corrente; é somado ao acumulado ao fechar a janela
+        state["window_latency"] = {op: LatencyHistogram() for op in LATENCY_OPS}
+        state["latency"] = {op: LatencyHistogram() for op in LATENCY_OPS}
+        state["window_jvm"] = {field: GrowableArray(n_windows) for field in JVM_SAMPLE_FIELDS}
+        # Acertos de cada instância da janela corrente, usados pela corrida
+        state["window_correct"] = np.zeros(WINDOW_SIZE, dtype=bool)
 
+    warmup_s = warm_up_models(stream, models_to_evaluate, JVM_WARMUP_INSTANCES) if JVM_WARMUP_INSTANCES > 0 else 0.0
     stream.restart() 
+    transformer = build_online_transform(eval_params.get("ONLINE_TRANSFORM"), schema)
+    # Com transformação online a instância treinada tem de ser a transformada,
+    # então o acesso aleatório ao arquivo só é usado sem ela
+    arrays = stream.get_arrays() if transformer is None and hasattr(stream, "get_arrays") else None
+    label_buffer = DelayedLabelBuffer(
+        DELAY_LENGTH,
+        build_label_mask(MAX_INSTANCES, LABEL_PROBABILITY, LABEL_SEED),
+        schema,
+        arrays
+    )
+    
+    race = None
+    if RACING.get("enabled") and len(models_to_evaluate) > 1:
+        race = HoeffdingRace(RACING.get("delta", 0.05), RACING.get("min_windows", 10))
+    
     count = 0
-    while stream.has_more_instances() and count < MAX_INSTANCES:
-        instance = stream.next_instance()
-        is_window_boundary = (count + 1) % WINDOW_SIZE == 0
+    checkpoint = load_checkpoint(CHECKPOINT_DIR, list(models_to_evaluate)) if RESUME and CHECKPOINT_DIR else None
+    if checkpoint is not None:
+        # O dicionário é atualizado no lugar: quem chamou continua vendo os estados
+        models_to_evaluate.update(checkpoint["states"])
+        instance_count_history = checkpoint["instance_count_history"]
+        transformer = checkpoint["transformer"]
+        label_buffer.ring = checkpoint["label_ring"]
+        race = checkpoint["race"]
+        count = checkpoint["count"]
+        if hasattr(stream, "seek"):
+            stream.seek(count)
+        else:
+            for _ in range(count):
+                stream.next_instance()
+    else:
+        # Os estados podem vir de uma execução anterior (session_state): um
+        # descarte na corrida só vale quando vem do checkpoint retomado
+        for state in models_to_evaluate.values():
+            state.pop("racing_dropped", None)
+    last_checkpoint_count = start_count = count
+    
+    active_models = {m: state for m, state in models_to_evaluate.items() if "racing_dropped" not in state}
+    # Detectores do espaço de entrada distintos (o get_models compartilha o
+    # mesmo ABCD entre modelos com os mesmos parâmetros)
+    input_detectors = {id(state["drift_ABCD"]): state["drift_ABCD"] for state in active_models.values()}
+
+    # Heap e GC da JVM deste processo, amostrados a cada janela (None sem JVM)
+    jvm_sampler = create_jvm_sampler()
+
+    perf_counter = time.perf_counter
+    run_start = window_wall_start = perf_counter()
+    while count < MAX_INSTANCES and stream.has_more_instances():
+        # O bloco nunca atravessa uma fronteira de janela
+        block_size = min(BATCH_SIZE, WINDOW_SIZE - count % WINDOW_SIZE, MAX_INSTANCES - count)
+        block = _next_block(stream, block_size)
+        if transformer is not None:
+            block = transformer.transform_instances(block, schema)
+        n = len(block)
+        y_true = np.fromiter((inst.y_index for inst in block), dtype=np.int64, count=n)
+        
+        last_idx = count + n - 1
+        window_start = last_idx + 1 - WINDOW_SIZE
+        is_window_boundary = (last_idx + 1) % WINDOW_SIZE == 0
+        
+        yielded_metrics = {"instance": last_idx + 1}
         
-        yielded_metrics = {"instance": count + 1}
+        # Instância liberada para treino em cada posição do bloco (None = sem rótulo ainda)
+        to_train = [label_buffer.step(count + i, inst) for i, inst in enumerate(block)]
         
-        for model_name, state in models_to_evaluate.items():
+        # Cada ABCD distinto é atualizado uma vez por instância; as detecções e
+        # as latências medidas são repassadas a todos os modelos que o usam
+        input_results = {}
+        for detector_id, detector in input_detectors.items():
+            positions, durations = [], []
+            for i, inst in enumerate(block):
+                t0 = perf_counter()
+                detector.add_element(inst)
+                detected = detector.detected_change()
+                durations.append(perf_counter() - t0)
+                if detected:
+                    positions.append(count + i)
+                    detector.reset()
+            input_results[detector_id] = (positions, durations)
+        
+        for model_name, state in active_models.items():
             model = state["model_instance"]
+            latency = state["window_latency"]
+            predict_latency = latency["predict"]
             
-            prediction = model.predict(instance)
-            try:
-                prediction_value = prediction[0]
-            except (IndexError, TypeError):
-                prediction_value = prediction 
-            
-            state["evaluator"].update(instance.y_index, prediction_value)
-            error = 0 if prediction_value == instance.y_index else 1
+            preds = np.empty(n, dtype=np.int64)
+            if BATCH_STRICT or n == 1:
+                for i, inst in enumerate(block):
+                    t0 = perf_counter()
+                    preds[i] = _prediction_index(model.predict(inst))
+                    predict_latency.add(perf_counter() - t0)
+                    if to_train[i] is not None:
+                        _train(model, to_train[i], latency)
+            else:
+                for i, inst in enumerate(block):
+                    t0 = perf_counter()
+                    preds[i] = _prediction_index(model.predict(inst))
+                    predict_latency.add(perf_counter() - t0)
+                for inst in to_train:
+                    if inst is not None:
+                        _train(model, inst, latency)
             
-            if "window_errors" not in state:
-                 state["window_errors"] = deque(maxlen=WINDOW_SIZE)
-            state["window_errors"].append(error)
+            errors = (preds != y_true).astype(np.int8)
+            if race is not None:
+                offset = count % WINDOW_SIZE
+                state["window_correct"][offset:offset + n] = errors == 0
+            # O evaluator do MOA é a única fonte das métricas finais, em qualquer BATCH_SIZE
+            evaluator = state["evaluator"]
+            for label, pred in zip(y_true.tolist(), preds.tolist()):
+                evaluator.update(label, None if pred < 0 else pred)
+            state["window_confusion"].add_batch(y_true, preds)
+            drift_events = state["drift_events"]
             
-            state["drift_ddm"].add_element(error)
-            if state["drift_ddm"].detected_change():
-                state["results_drift_ddm"].append(count)
-                state["drift_ddm"].reset()
-                
-            state["drift_adwin"].add_element(error)
-            if state["drift_adwin"].detected_change():
-                state["results_drift_adwin"].append(count)
-                state["drift_adwin"].reset()
+            for i, error in enumerate(errors.tolist()):
+                t0 = perf_counter()
+                state["drift_ddm"].add_element(error)
+                detected = state["drift_ddm"].detected_change()
+                latency["ddm"].add(perf_counter() - t0)
+                if detected:
+                    drift_events["ddm"].add(count + i)
+                    state["drift_ddm"].reset()
+                    
+                t0 = perf_counter()
+                state["drift_adwin"].add_element(error)
+                detected = state["drift_adwin"].detected_change()
+                latency["adwin"].add(perf_counter() - t0)
+                if detected:
+                    drift_events["adwin"].add(count + i)
+                    state["drift_adwin"].reset()
 
-            state["drift_ABCD"].add_element(instance)
-            if state["drift_ABCD"].detected_change():
-                state["results_drift_ABCD"].append(count)
-                state["drift_ABCD"].reset()
-            
-            instance_to_train = None
-            if DELAY_LENGTH is not None and DELAY_LENGTH > 0:
-                queue = state["prediction_queue"]
-                
-                if random.random() <= LABEL_PROBABILITY:
-                    queue.append(instance) 
-                else:
-                    queue.append(None) 
-                
-                if len(queue) == DELAY_LENGTH:
-                    delayed_item = queue.popleft() 
-                    if delayed_item is not None:
-                        instance_to_train = delayed_item
-            else:
-                if random.random() <= LABEL_PROBABILITY:
-                    instance_to_train = instance
-            
-            if instance_to_train:
-                model.train(instance_to_train)
+            positions, durations = input_results[id(state["drift_ABCD"])]
+            for duration in durations:
+                latency["ABCD"].add(duration)
+            for position in positions:
+                drift_events["ABCD"].add(position)
             
             if is_window_boundary:
-                if state["window_errors"]:
-                    mean_error = np.mean(state["window_errors"])
-                    accuracy_pct = (1.0 - mean_error) 
-                    state["results_accuracy"].append(accuracy_pct)
+                if len(state["window_confusion"]):
+                    accuracy_pct = 1.0 - state["window_confusion"].error_rate()
                 else:
-                    state["results_accuracy"].append(1.0)
+                    accuracy_pct = 1.0
+                state["window_accuracy"].append(accuracy_pct)
+                class_metrics = state["window_confusion"].class_metrics()
+                for metric, values in class_metrics.items():
+                    state["window_class_metrics"][metric].append(values)
                 
+                # Flag = houve detecção em algum ponto desta janela
                 yielded_metrics[model_name] = {
-                    "Acurácia": state["results_accuracy"][-1], 
-                    "Drift (DDM)": 1 if count in state["results_drift_ddm"] else 0,
-                    "Drift (ADWIN)": 1 if count in state["results_drift_adwin"] else 0,
-                    "Drift (ABCD)": 1 if count in state["results_drift_ABCD"] else 0,
+                    "Acurácia": accuracy_pct, 
+                    "Drift (DDM)": drift_events["ddm"].close_window(window_start),
+                    "Drift (ADWIN)": drift_events["adwin"].close_window(window_start),
+                    "Drift (ABCD)": drift_events["ABCD"].close_window(window_start),
+                    **{label: class_metrics[metric] for metric, label in CLASS_METRICS.items()},
+                    **_latency_report(latency, WINDOW_SIZE)
                 }
+                for op, histogram in latency.items():
+                    state["latency"][op].merge(histogram)
+                    histogram.reset()
+        
+        if is_window_boundary and race is not None:
+            dropped = race.update(
+                {m: state["window_correct"] for m, state in active_models.items()},
+                last_idx + 1
+            )
+            for model_name, info in dropped.items():
+                active_models.pop(model_name)["racing_dropped"] = info
+            if dropped:
+                yielded_metrics["racing_dropped"] = dropped
+                input_detectors = {id(state["drift_ABCD"]): state["drift_ABCD"] for state in active_models.values()}
+        
+        if is_window_boundary and jvm_sampler is not None:
+            jvm_sample = jvm_sampler.sample()
+            for model_name, state in models_to_evaluate.items():
+                if model_name in yielded_metrics:
+                    yielded_metrics[model_name]["JVM"] = jvm_sample
+                    for field, value in jvm_sample.items():
+                        state["window_jvm"][field].append(value)
         
         if is_window_boundary:
-            instance_count_history.append(count + 1)
+            now = perf_counter()
+            yielded_metrics["throughput"] = WINDOW_SIZE / (now - window_wall_start)
+            window_wall_start = now
+            instance_count_history.append(last_idx + 1)
             yield yielded_metrics, instance_count_history
             
-        count += 1
+        count += n
+        
+        if CHECKPOINT_DIR and is_window_boundary and count - last_checkpoint_count >= CHECKPOINT_EVERY:
+            _save_evaluation_checkpoint(CHECKPOINT_DIR, models_to_evaluate, count, instance_count_history, transformer, label_buffer, race)
+            last_checkpoint_count = count
+    
+    if CHECKPOINT_DIR and count > last_checkpoint_count:
+        # Permite estender a mesma avaliação depois, com um MAX_INSTANCES maior
+        _save_evaluation_checkpoint(CHECKPOINT_DIR, models_to_evaluate, count, instance_count_history, transformer, label_buffer, race)
     
     def get_metric(metric_func):
         try:
@@ -260,10 +325,22 @@ def run_evaluation_stream(stream, models_to_evaluate, eval_params):
         except Exception:
             return 0.0
 
+    run_elapsed_s = perf_counter() - run_start
     final_report = {}
     for model_name, state in models_to_evaluate.items():
-        evaluator = state["evaluator"]
+        # Última janela incompleta
+        for op, histogram in state["window_latency"].items():
+            state["latency"][op].merge(histogram)
+            histogram.reset()
+        state["results_accuracy"] = state["window_accuracy"].values.copy()
+        for det in DRIFT_DETECTORS:
+            state[f"results_drift_{det}"] = state["drift_events"][det].positions.values.copy()
+        for metric in CLASS_METRICS:
+            state[f"results_class_{metric}"] = state["window_class_metrics"][metric].values.copy()
+        for field in JVM_SAMPLE_FIELDS:
+            state[f"results_jvm_{field}"] = state["window_jvm"][field].values.copy()
         
+        evaluator = state["evaluator"]
         final_report[model_name] = {
             "Acurácia": get_metric(evaluator.accuracy),
             "F1-Score": get_metric(evaluator.f1_score),   
@@ -271,10 +348,24 @@ def run_evaluation_stream(stream, models_to_evaluate, eval_params):
             "Recall": get_metric(evaluator.recall),       
             "Kappa": get_metric(evaluator.kappa)
         }
+        # Modelos descartados na corrida só processaram o stream até o descarte
+        n_processed = state.get("racing_dropped", {}).get("instance", count)
+        final_report[model_name].update(_latency_report(state["latency"], n_processed))
+        if jvm_sampler is not None:
+            final_report[model_name]["JVM"] = jvm_summary(
+                {field: state[f"results_jvm_{field}"] for field in JVM_SAMPLE_FIELDS},
+                jvm_sampler.heap_max_mb,
+                warmup_s
+            )
     
     yield {
         "status": "completed", 
         "final_report": final_report, 
         "models_final_state": models_to_evaluate, 
-        "instance_history": instance_count_history
+        "instance_history": instance_count_history,
+        "throughput": (count - start_count) / run_elapsed_s if run_elapsed_s > 0 else 0.0,
+        "racing": {m: state["racing_dropped"] for m, state in models_to_evaluate.items() if "racing_dropped" in state},
+        # Estado final da transformação online, reutilizado ao servir os modelos
+        "transformer": transformer,
+        "instance_cache": stream.stats() if isinstance(stream, CachedStream) else None
     }
\ No newline at end of file
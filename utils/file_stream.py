@@ -0,0 +1,209 @@
+import os
+import json
+import warnings
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from capymoa.stream import Stream, NumpyStream
+
+try:
+    from capymoa.instance import LabeledInstance
+except ImportError:
+    from capymoa.core import LabeledInstance
+
+X_FILENAME = "X.npy"
+Y_FILENAME = "y.npy"
+META_FILENAME = "meta.json"
+DEFAULT_BATCH_SIZE = 10000
+
+
+# --- Artefato em Disco ---
+def get_stream_artifact_dir(file_path):
+    base, _ = os.path.splitext(file_path)
+    return f"{base}_stream"
+
+
+def save_stream_artifact(artifact_dir, X, y, feature_names, target_name, class_labels, dataset_name):
+    """
+    Grava o dataset final do pré-processamento em disco (X.npy, y.npy e
+    meta.json), no formato lido pelo FileBackedStream.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    np.save(os.path.join(artifact_dir, X_FILENAME), np.ascontiguousarray(X, dtype=np.float64))
+    np.save(os.path.join(artifact_dir, Y_FILENAME), np.ascontiguousarray(y, dtype=np.int64))
+    meta = {
+        "dataset_name": dataset_name,
+        "target_name": target_name,
+        "feature_names": [str(f) for f in feature_names],
+        "class_labels": [str(c) for c in class_labels],
+        "n_instances": int(X.shape[0]),
+        "n_features": int(X.shape[1]),
+    }
+    with open(os.path.join(artifact_dir, META_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return artifact_dir
+
+
+def load_stream_meta(artifact_dir):
+    with open(os.path.join(artifact_dir, META_FILENAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_schema(feature_names, target_name, n_classes, dataset_name):
+    # Mesmo schema do NumpyStream em memória criado pelo pipeline (mesmos nomes
+    # de atributos e alvo categórico) para o dataset completo
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=UserWarning)
+        dummy = NumpyStream(
+            np.zeros((n_classes, len(feature_names))),
+            np.arange(n_classes),
+            dataset_name=dataset_name,
+            feature_names=list(feature_names),
+            target_name=target_name,
+            target_type="categorical"
+        )
+    return dummy.get_schema()
+
+
+def _read_exact(path, offset, buffer):
+    view = memoryview(buffer).cast("B")
+    with open(path, "rb", buffering=0) as f:
+        f.seek(offset)
+        while len(view):
+            n = f.readinto(view)
+            if not n:
+                raise EOFError(f"Fim inesperado do arquivo '{path}'.")
+            view = view[n:]
+
+
+def _npy_data_offset(path):
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(f)
+        else:
+            np.lib.format.read_array_header_2_0(f)
+        return f.tell()
+
+
+# --- Stream ---
+class FileBackedStream(Stream):
+    """
+    Stream com a mesma interface do NumpyStream (schema, next_instance,
+    has_more_instances, restart), mas que lê o dataset processado do disco em
+    lotes. Apenas o lote atual fica em memória; o próximo é lido em segundo
+    plano (read-ahead) enquanto o atual é consumido.
+    """
+
+    def __init__(self, artifact_dir, batch_size=DEFAULT_BATCH_SIZE, read_ahead=True):
+        self.artifact_dir = artifact_dir
+        self.batch_size = int(batch_size)
+        self.read_ahead = read_ahead
+
+        self.meta = load_stream_meta(artifact_dir)
+        self._x_path = os.path.join(artifact_dir, X_FILENAME)
+        self._y_path = os.path.join(artifact_dir, Y_FILENAME)
+        self._len = self.meta["n_instances"]
+        self._n_features = self.meta["n_features"]
+        self._x_offset = _npy_data_offset(self._x_path)
+        self._y_offset = _npy_data_offset(self._y_path)
+        self._x_mmap = None
+        self._y_mmap = None
+
+        self.schema = build_schema(
+            self.meta["feature_names"],
+            self.meta["target_name"],
+            len(self.meta["class_labels"]),
+            self.meta["dataset_name"]
+        )
+
+        self._executor = ThreadPoolExecutor(max_workers=1) if read_ahead else None
+        self._pending = None
+        self.restart()
+
+    # Estado interno não serializável (threads) é recriado ao desserializar
+    def __getstate__(self):
+        return {
+            "artifact_dir": self.artifact_dir,
+            "batch_size": self.batch_size,
+            "read_ahead": self.read_ahead,
+            "position": self._index,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["artifact_dir"], state["batch_size"], state["read_ahead"])
+        self.seek(state["position"])
+
+    def __str__(self):
+        return self.meta["dataset_name"]
+
+    def _read_batch(self, start):
+        # readinto libera o GIL durante a leitura, permitindo o read-ahead real
+        end = min(start + self.batch_size, self._len)
+        n = end - start
+        X = np.empty((n, self._n_features), dtype=np.float64)
+        y = np.empty(n, dtype=np.int64)
+        _read_exact(self._x_path, self._x_offset + start * self._n_features * 8, X)
+        _read_exact(self._y_path, self._y_offset + start * 8, y)
+        return start, X, y
+
+    def _schedule(self, start):
+        if self._executor is None or start >= self._len:
+            self._pending = None
+        else:
+            self._pending = self._executor.submit(self._read_batch, start)
+
+    def _load_batch(self, start):
+        if self._pending is not None:
+            batch = self._pending.result()
+            self._pending = None
+            if batch[0] != start:
+                batch = self._read_batch(start)
+        else:
+            batch = self._read_batch(start)
+        self._batch_start, self._batch_X, self._batch_y = batch
+        self._schedule(self._batch_start + len(self._batch_y))
+
+    def has_more_instances(self):
+        return self._index < self._len
+
+    def next_instance(self):
+        if not self.has_more_instances():
+            raise StopIteration()
+        offset = self._index - self._batch_start
+        if offset >= len(self._batch_y):
+            self._load_batch(self._index)
+            offset = 0
+        x = self._batch_X[offset]
+        y = self._batch_y[offset]
+        self._index += 1
+        return LabeledInstance.from_array(self.schema, x, y)
+
+    def get_schema(self):
+        return self.schema
+
+    def seek(self, position):
+        """Posiciona o stream na instância `position` (usado para retomar avaliações)."""
+        self._index = int(min(max(position, 0), self._len))
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        self._batch_start = self._index
+        self._batch_X = np.empty((0, self._n_features))
+        self._batch_y = np.empty(0, dtype=np.int64)
+        self._schedule(self._index)
+
+    def restart(self):
+        self.seek(0)
+
+    def get_position(self):
+        return self._index
+
+    def get_arrays(self):
+        """Acesso aleatório via memory-map, sem carregar o arquivo em memória."""
+        if self._x_mmap is None:
+            self._x_mmap = np.load(self._x_path, mmap_mode="r")
+            self._y_mmap = np.load(self._y_path, mmap_mode="r")
+        return self._x_mmap, self._y_mmap
+
+    def __len__(self):
+        return self._len
@@ -0,0 +1,251 @@
+import os
+import weakref
+import threading
+from collections import OrderedDict
+
+DEFAULT_INSTANCE_CACHE_MB = 512
+# Vetor de atributos no heap da JVM e cópia numpy no Python, mais os objetos
+# que os embrulham (estimativa; o consumo real depende da JVM)
+INSTANCE_OVERHEAD_BYTES = 512
+# O orçamento é reservado em blocos, para não passar pelo lock a cada instância
+RESERVE_CHUNK = 4096
+
+_MB = 1024 * 1024
+
+
+def estimate_instance_bytes(n_features):
+    return 16 * int(n_features) + INSTANCE_OVERHEAD_BYTES
+
+
+def stream_cache_key(stream):
+    """
+    Identidade do stream para o cache: a pasta do artefato (e a data do
+    meta.json, que muda quando o pré-processamento grava de novo) para
+    FileBackedStream; o próprio objeto para streams em memória.
+    """
+    artifact_dir = getattr(stream, "artifact_dir", None)
+    if artifact_dir is not None:
+        from utils.file_stream import META_FILENAME
+
+        return f"file:{os.path.abspath(artifact_dir)}:{os.path.getmtime(os.path.join(artifact_dir, META_FILENAME))}"
+    return f"object:{id(stream)}"
+
+
+class InstanceCache:
+    """Instâncias já construídas das posições 0..n-1 de um stream."""
+
+    def __init__(self, key, bytes_per_instance, source_ref=None):
+        self.key = key
+        self.bytes_per_instance = bytes_per_instance
+        # Streams em memória: o id pode ser reaproveitado por outro objeto depois
+        self.source_ref = source_ref
+        self.instances = []
+        self.reserved = 0
+        # Tamanho do stream, quando o cache chegou ao fim dele (None = desconhecido)
+        self.source_length = None
+
+    @property
+    def reserved_bytes(self):
+        return self.reserved * self.bytes_per_instance
+
+
+class InstanceCacheRegistry:
+    """
+    Caches de instâncias do processo, por stream, dentro de um orçamento de
+    memória. Quando um cache precisa crescer e o orçamento acabou, os caches
+    usados há mais tempo são descartados (LRU); se ainda assim não houver
+    espaço, ele simplesmente para de crescer.
+    """
+
+    def __init__(self, budget_mb=DEFAULT_INSTANCE_CACHE_MB):
+        self.budget_bytes = int(budget_mb * _MB)
+        self._caches = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def set_budget(self, budget_mb):
+        with self._lock:
+            self.budget_bytes = int(budget_mb * _MB)
+            self._evict_until(self.budget_bytes)
+
+    def get(self, stream):
+        """Cache do stream (criado vazio se não existir), marcado como o mais recente."""
+        key = stream_cache_key(stream)
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is not None and cache.source_ref is not None and cache.source_ref() is not stream:
+                self._drop(key)
+                cache = None
+            if cache is None:
+                source_ref = weakref.ref(stream) if key.startswith("object:") else None
+                n_features = stream.get_schema().get_num_attributes()
+                cache = InstanceCache(key, estimate_instance_bytes(n_features), source_ref)
+                self._caches[key] = cache
+            self._caches.move_to_end(key)
+            return cache
+
+    def reserve(self, cache, n_instances=RESERVE_CHUNK):
+        """Reserva espaço para mais `n_instances` no cache; devolve quantas couberam."""
+        with self._lock:
+            if cache.key not in self._caches:
+                return 0
+            needed = n_instances * cache.bytes_per_instance
+            self._evict_until(self.budget_bytes - needed, keep=cache.key)
+            free = self.budget_bytes - self._used_bytes()
+            granted = max(0, min(n_instances, free // cache.bytes_per_instance))
+            cache.reserved += granted
+            return granted
+
+    def _used_bytes(self):
+        return sum(c.reserved_bytes for c in self._caches.values())
+
+    def _evict_until(self, target_bytes, keep=None):
+        for key in list(self._caches):
+            if self._used_bytes() <= target_bytes:
+                break
+            if key != keep:
+                self._drop(key)
+                self.evictions += 1
+
+    def _drop(self, key):
+        cache = self._caches.pop(key)
+        # Libera as instâncias mesmo que um CachedStream ainda aponte para o cache
+        cache.instances.clear()
+        cache.reserved = 0
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._caches):
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            for key in [k for k, c in self._caches.items() if c.source_ref is not None and c.source_ref() is None]:
+                self._drop(key)
+            return {
+                "caches": len(self._caches),
+                "instances": sum(len(c.instances) for c in self._caches.values()),
+                "memory_mb": self._used_bytes() / _MB,
+                "budget_mb": self.budget_bytes / _MB,
+                "evictions": self.evictions,
+            }
+
+
+_registry = None
+
+
+def get_instance_cache_registry():
+    global _registry
+    if _registry is None:
+        _registry = InstanceCacheRegistry()
+    return _registry
+
+
+class CachedStream:
+    """
+    Stream que devolve as instâncias já construídas do prefixo (até
+    `max_instances`) guardadas no cache, e só converte linhas em instâncias
+    capymoa/Java quando a posição ainda não está lá. O stream termina em
+    `max_instances`, o limite da avaliação que o criou. As instâncias são
+    tratadas como somente leitura, como na avaliação, que já entrega a mesma
+    instância a todos os modelos. Os demais atributos (get_arrays,
+    artifact_dir...) são os do stream original.
+    """
+
+    def __init__(self, source, cache, registry, max_instances):
+        self.source = source
+        self.cache = cache
+        self.registry = registry
+        self.max_instances = int(max_instances)
+        self._pos = 0
+        # Posição do stream original; None = desconhecida (reposicionar antes de ler)
+        self._source_pos = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        # Só é chamado para atributos que o CachedStream não define
+        source = self.__dict__.get("source")
+        if source is None:
+            raise AttributeError(name)
+        return getattr(source, name)
+
+    def get_schema(self):
+        return self.source.get_schema()
+
+    def _align_source(self):
+        if self._source_pos == self._pos:
+            return
+        if hasattr(self.source, "seek"):
+            self.source.seek(self._pos)
+        else:
+            self.source.restart()
+            for _ in range(self._pos):
+                self.source.next_instance()
+        self._source_pos = self._pos
+
+    def has_more_instances(self):
+        # Responde pelo cache sempre que possível: reposicionar um stream sem
+        # seek custa reler todo o prefixo
+        if self._pos >= self.max_instances:
+            return False
+        if self._pos < len(self.cache.instances):
+            return True
+        if self.cache.source_length is not None and self._pos >= self.cache.source_length:
+            return False
+        # A próxima leitura é uma falta de verdade, que reposicionaria de qualquer forma
+        self._align_source()
+        has_more = self.source.has_more_instances()
+        if not has_more and self._pos == len(self.cache.instances):
+            self.cache.source_length = self._pos
+        return has_more
+
+    def next_instance(self):
+        instances = self.cache.instances
+        if self._pos < len(instances):
+            instance = instances[self._pos]
+            self._pos += 1
+            self.hits += 1
+            return instance
+
+        self._align_source()
+        instance = self.source.next_instance()
+        self._source_pos += 1
+        self.misses += 1
+        # Só o prefixo contíguo é guardado
+        if self._pos == len(instances) and self._pos < self.max_instances:
+            if len(instances) < self.cache.reserved or self.registry.reserve(self.cache):
+                instances.append(instance)
+        self._pos += 1
+        return instance
+
+    def seek(self, position):
+        self._pos = max(0, int(position))
+
+    def restart(self):
+        self._pos = 0
+
+    def get_position(self):
+        return self._pos
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "cached_instances": len(self.cache.instances),
+            **self.registry.stats(),
+        }
+
+
+def cached_stream(stream, max_instances, budget_mb=DEFAULT_INSTANCE_CACHE_MB):
+    """Envolve o stream com o cache de instâncias do processo (orçamento em MB)."""
+    registry = get_instance_cache_registry()
+    registry.set_budget(budget_mb)
+    try:
+        cache = registry.get(stream)
+    except TypeError:
+        # Objeto sem suporte a weakref: segue sem cache
+        return stream
+    return CachedStream(stream, cache, registry, max_instances)
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+# Variável lida pelo capymoa ao iniciar a JVM (via jpype), na primeira importação
+JVM_ARGS_ENV = "CAPYMOA_JVM_ARGS"
+JVM_CONFIG_PATH = "jvm_config.json"
+
+# Pilha padrão do capymoa: árvores profundas do MOA estouram a pilha padrão da JVM
+JVM_STACK_ARG = "-Xss10M"
+
+GC_OPTIONS = {
+    "Padrão da JVM": None,
+    "G1": "-XX:+UseG1GC",
+    "Parallel": "-XX:+UseParallelGC",
+    "ZGC": "-XX:+UseZGC",
+}
+
+DEFAULT_JVM_CONFIG = {
+    "heap_max_mb": 8192,
+    "heap_initial_mb": None,
+    "gc": "G1",
+    "max_gc_pause_ms": None,
+    "extra_args": "",
+}
+
+# Aquecimento: instâncias percorridas por cópias descartáveis dos modelos
+# antes da medição, para o JIT compilar os caminhos quentes do MOA
+DEFAULT_WARMUP_INSTANCES = 2000
+# O JIT compila o mesmo código com qualquer número de membros
+WARMUP_MAX_ENSEMBLE_SIZE = 10
+
+# Campos de cada amostra por janela (guardados como results_jvm_<campo>)
+JVM_SAMPLE_FIELDS = ("heap_used_mb", "heap_committed_mb", "gc_count", "gc_time_ms")
+
+_MB = 1024 * 1024
+
+
+# --- Configuração ---
+def jvm_args(config):
+    """Argumentos da JVM (heap, GC e extras) de uma configuração."""
+    config = {**DEFAULT_JVM_CONFIG, **(config or {})}
+    args = [JVM_STACK_ARG]
+    if config["heap_initial_mb"]:
+        args.append(f"-Xms{int(config['heap_initial_mb'])}m")
+    if config["heap_max_mb"]:
+        args.append(f"-Xmx{int(config['heap_max_mb'])}m")
+    gc_flag = GC_OPTIONS.get(config["gc"])
+    if gc_flag:
+        args.append(gc_flag)
+    if config["max_gc_pause_ms"]:
+        args.append(f"-XX:MaxGCPauseMillis={int(config['max_gc_pause_ms'])}")
+    args.extend(str(config["extra_args"] or "").split())
+    return args
+
+
+def load_jvm_config(path=JVM_CONFIG_PATH):
+    """Configuração gravada pela página de Modelos, ou None se não houver."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return {**DEFAULT_JVM_CONFIG, **json.load(f)}
+
+
+def save_jvm_config(config, path=JVM_CONFIG_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**DEFAULT_JVM_CONFIG, **config}, f, indent=2)
+
+
+def is_jvm_started():
+    # Não importa o jpype: se ele ainda não foi importado, a JVM não existe
+    jpype = sys.modules.get("jpype")
+    return jpype is not None and jpype.isJVMStarted()
+
+
+def configure_jvm(config=None):
+    """
+    Define os argumentos da JVM do capymoa (por padrão, os da configuração
+    gravada). Só vale se a JVM deste processo ainda não foi iniciada, ou seja,
+    antes da primeira importação do capymoa; processos filhos (spawn) herdam a
+    variável e iniciam suas JVMs com ela. Devolve True se foi aplicada aqui.
+    """
+    if config is None:
+        config = load_jvm_config()
+        if config is None:
+            return False
+    os.environ[JVM_ARGS_ENV] = " ".join(jvm_args(config))
+    return not is_jvm_started()
+
+
+def jvm_runtime_info():
+    """Argumentos e heap máximo da JVM em execução (None se ela não foi iniciada)."""
+    if not is_jvm_started():
+        return None
+    import jpype
+
+    factory = jpype.JClass("java.lang.management.ManagementFactory")
+    heap_max = int(factory.getMemoryMXBean().getHeapMemoryUsage().getMax())
+    return {
+        "args": [str(a) for a in factory.getRuntimeMXBean().getInputArguments()],
+        "heap_max_mb": heap_max / _MB if heap_max >= 0 else None,
+        "collectors": [str(gc.getName()) for gc in factory.getGarbageCollectorMXBeans()],
+    }
+
+
+# --- Aquecimento ---
+def warm_up_models(stream, models_to_evaluate, n_instances=DEFAULT_WARMUP_INSTANCES):
+    """
+    Percorre as primeiras `n_instances` do stream com cópias descartáveis dos
+    modelos (mesmos hiperparâmetros, ensembles reduzidos) e dos seus
+    detectores, e volta o stream ao início. Os modelos avaliados não são
+    tocados. Devolve o tempo gasto em segundos.
+    """
+    from utils.training import get_models
+    from utils.sizing import ENSEMBLE_MODELS
+
+    start = time.perf_counter()
+    stream.restart()
+    instances = []
+    while len(instances) < n_instances and stream.has_more_instances():
+        instances.append(stream.next_instance())
+    stream.restart()
+    if not instances:
+        return 0.0
+
+    warmup_params = {}
+    for model_name, state in models_to_evaluate.items():
+        params = dict(state.get("params", {}))
+        if model_name in ENSEMBLE_MODELS:
+            params["ensemble_size"] = min(int(params.get("ensemble_size", 100)), WARMUP_MAX_ENSEMBLE_SIZE)
+        warmup_params[model_name] = params
+    models, _ = get_models(stream.get_schema(), {}, list(models_to_evaluate), warmup_params)
+
+    for state in models.values():
+        model = state["model_instance"]
+        for inst in instances:
+            prediction = model.predict(inst)
+            model.train(inst)
+            error = 0 if prediction == inst.y_index else 1
+            state["drift_ddm"].add_element(error)
+            state["drift_ddm"].detected_change()
+            state["drift_adwin"].add_element(error)
+            state["drift_adwin"].detected_change()
+    for detector in {id(s["drift_ABCD"]): s["drift_ABCD"] for s in models.values()}.values():
+        for inst in instances:
+            detector.add_element(inst)
+            detector.detected_change()
+    return time.perf_counter() - start
+
+
+# --- Telemetria ---
+class JvmSampler:
+    """
+    Lê o uso do heap e os contadores de GC da JVM deste processo pelos MXBeans
+    de java.lang.management. Cada amostra traz o heap no momento e as coletas
+    e o tempo de GC desde a amostra anterior.
+    """
+
+    def __init__(self):
+        import jpype
+
+        factory = jpype.JClass("java.lang.management.ManagementFactory")
+        self._memory = factory.getMemoryMXBean()
+        self._collectors = list(factory.getGarbageCollectorMXBeans())
+        self._last_count, self._last_time_ms = self._gc_totals()
+        heap_max = int(self._memory.getHeapMemoryUsage().getMax())
+        self.heap_max_mb = heap_max / _MB if heap_max >= 0 else None
+
+    def _gc_totals(self):
+        count = time_ms = 0
+        for gc in self._collectors:
+            # -1 quando o coletor não informa
+            count += max(int(gc.getCollectionCount()), 0)
+            time_ms += max(int(gc.getCollectionTime()), 0)
+        return count, time_ms
+
+    def sample(self):
+        heap = self._memory.getHeapMemoryUsage()
+        count, time_ms = self._gc_totals()
+        sample = {
+            "heap_used_mb": int(heap.getUsed()) / _MB,
+            "heap_committed_mb": int(heap.getCommitted()) / _MB,
+            "gc_count": count - self._last_count,
+            "gc_time_ms": time_ms - self._last_time_ms,
+        }
+        self._last_count, self._last_time_ms = count, time_ms
+        return sample
+
+
+def create_jvm_sampler():
+    """JvmSampler da JVM em execução, ou None se não houver JVM."""
+    if not is_jvm_started():
+        return None
+    try:
+        return JvmSampler()
+    except Exception:
+        return None
+
+
+def jvm_summary(samples, heap_max_mb=None, warmup_s=0.0):
+    """Resumo das amostras por janela ({campo: array}) para o relatório final."""
+    heap_used = np.asarray(samples.get("heap_used_mb", []), dtype=np.float64)
+    gc_time = np.asarray(samples.get("gc_time_ms", []), dtype=np.float64)
+    return {
+        "heap_peak_mb": float(heap_used.max()) if heap_used.size else None,
+        "heap_max_mb": heap_max_mb,
+        "gc_count": int(np.sum(samples.get("gc_count", []))),
+        "gc_time_ms": float(gc_time.sum()),
+        "gc_max_window_ms": float(gc_time.max()) if gc_time.size else 0.0,
+        "warmup_s": warmup_s,
+    }
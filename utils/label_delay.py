@@ -0,0 +1,47 @@
+import numpy as np
+
+
+def build_label_mask(n_instances, label_probability, seed):
+    """Disponibilidade do rótulo de cada posição do stream, sorteada uma única vez."""
+    if label_probability >= 1.0:
+        return np.ones(n_instances, dtype=bool)
+    rng = np.random.default_rng(seed)
+    return rng.random(n_instances) <= label_probability
+
+
+class DelayedLabelBuffer:
+    """
+    Rótulos atrasados compartilhados por todos os modelos. O rótulo da posição
+    t chega na posição t + delay - 1 (delay = 0 ou 1: imediatamente) e só se a
+    máscara de disponibilidade permitir. Se o stream tem acesso aleatório
+    (`arrays` = (X, y)), apenas índices são usados e a instância é remontada
+    quando o rótulo chega; caso contrário um único buffer circular guarda as
+    últimas `delay` instâncias.
+    """
+
+    def __init__(self, delay, label_mask, schema, arrays=None):
+        self.delay = max(1, int(delay or 0))
+        self.label_mask = label_mask
+        self.schema = schema
+        self.arrays = arrays
+        self.ring = [None] * self.delay if arrays is None and self.delay > 1 else None
+        if arrays is not None:
+            try:
+                from capymoa.instance import LabeledInstance
+            except ImportError:
+                from capymoa.core import LabeledInstance
+            self.labeled_instance = LabeledInstance
+
+    def step(self, index, instance):
+        """Registra a instância da posição `index` e devolve a que pode ser usada no treino agora (ou None)."""
+        if self.ring is not None:
+            self.ring[index % self.delay] = instance
+        released = index - (self.delay - 1)
+        if released < 0 or not self.label_mask[released]:
+            return None
+        if released == index:
+            return instance
+        if self.ring is not None:
+            return self.ring[released % self.delay]
+        X, y = self.arrays
+        return self.labeled_instance.from_array(self.schema, np.asarray(X[released], dtype=np.float64), int(y[released]))
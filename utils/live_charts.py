@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x, y, n_out):
+    """Decimação Largest-Triangle-Three-Buckets: reduz a série a `n_out` pontos preservando sua forma."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return x[selected], y[selected]
+
+
+class LiveChart:
+    """
+    Gráfico ao vivo com custo constante por atualização: os pontos novos são
+    anexados ao gráfico existente (add_rows) e, quando o total exibido passa
+    de `point_budget`, a série exibida é decimada com LTTB para metade do
+    orçamento e o gráfico é redesenhado. Guarda apenas os pontos exibidos.
+    """
+
+    def __init__(self, placeholder, make_chart, x_name, y_name, point_budget=1000):
+        self.placeholder = placeholder
+        self.make_chart = make_chart
+        self.x_name = x_name
+        self.y_name = y_name
+        self.point_budget = point_budget
+        self.element = None
+        self.shown_x = np.empty(0)
+        self.shown_y = np.empty(0)
+        self.pending_x = []
+        self.pending_y = []
+
+    def append(self, x, y):
+        self.pending_x.append(x)
+        self.pending_y.append(y)
+
+    def _frame(self, x, y):
+        return pd.DataFrame({self.x_name: x, self.y_name: y})
+
+    def render(self):
+        if not self.pending_x:
+            return
+        new_x = np.asarray(self.pending_x, dtype=np.float64)
+        new_y = np.asarray(self.pending_y, dtype=np.float64)
+        self.pending_x, self.pending_y = [], []
+
+        if self.element is None or len(self.shown_x) + len(new_x) > self.point_budget:
+            x, y = lttb(
+                np.concatenate([self.shown_x, new_x]),
+                np.concatenate([self.shown_y, new_y]),
+                self.point_budget // 2
+            )
+            self.element = self.placeholder.altair_chart(self.make_chart(self._frame(x, y)), width='stretch')
+            self.shown_x, self.shown_y = x, y
+        else:
+            self.element.add_rows(self._frame(new_x, new_y))
+            self.shown_x = np.concatenate([self.shown_x, new_x])
+            self.shown_y = np.concatenate([self.shown_y, new_y])
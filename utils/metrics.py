@@ -0,0 +1,129 @@
+import numpy as np
+
+
+# --- Estruturas Incrementais da Avaliação ---
+class WindowedConfusion:
+    """
+    Matriz de confusão da janela deslizante. Um buffer circular guarda os pares
+    (real, previsto) e a matriz k×(k+1) é atualizada em O(1) por instância:
+    soma o par que entra e subtrai o que sai. A coluna extra conta as
+    instâncias sem previsão (-1), que são sempre erro, como no acerto janelado.
+    """
+
+    def __init__(self, window_size, n_classes):
+        self.window_size = int(window_size)
+        self.n_classes = int(n_classes)
+        self.true = np.zeros(self.window_size, dtype=np.int64)
+        self.pred = np.zeros(self.window_size, dtype=np.int64)
+        self.matrix = np.zeros((self.n_classes, self.n_classes + 1), dtype=np.int64)
+        self.pos = 0
+        self.filled = 0
+        self.correct = 0
+
+    def add(self, y_true, y_pred):
+        y_pred = self.n_classes if y_pred < 0 else y_pred
+        if self.filled == self.window_size:
+            out_true, out_pred = self.true[self.pos], self.pred[self.pos]
+            self.matrix[out_true, out_pred] -= 1
+            self.correct -= int(out_true == out_pred)
+        self.true[self.pos] = y_true
+        self.pred[self.pos] = y_pred
+        self.matrix[y_true, y_pred] += 1
+        self.correct += int(y_true == y_pred)
+        self.pos = (self.pos + 1) % self.window_size
+        self.filled = min(self.filled + 1, self.window_size)
+
+    def add_batch(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.int64)
+        y_pred = np.where(np.asarray(y_pred) < 0, self.n_classes, y_pred).astype(np.int64)
+        n = len(y_true)
+        if n == 1:
+            self.add(int(y_true[0]), int(y_pred[0]))
+            return
+        if n >= self.window_size:
+            self.true[:] = y_true[-self.window_size:]
+            self.pred[:] = y_pred[-self.window_size:]
+            self.matrix[:] = 0
+            np.add.at(self.matrix, (self.true, self.pred), 1)
+            self.pos = 0
+            self.filled = self.window_size
+            self.correct = int((self.true == self.pred).sum())
+            return
+        idx = (self.pos + np.arange(n)) % self.window_size
+        # Enquanto o buffer não enche, pos == filled: só os índices abaixo de filled já têm par
+        outgoing = idx[idx < self.filled] if self.filled < self.window_size else idx
+        np.subtract.at(self.matrix, (self.true[outgoing], self.pred[outgoing]), 1)
+        self.correct -= int((self.true[outgoing] == self.pred[outgoing]).sum())
+        self.true[idx] = y_true
+        self.pred[idx] = y_pred
+        np.add.at(self.matrix, (y_true, y_pred), 1)
+        self.correct += int((y_true == y_pred).sum())
+        self.pos = (self.pos + n) % self.window_size
+        self.filled = min(self.filled + n, self.window_size)
+
+    def error_rate(self):
+        return 1.0 - self.correct / self.filled if self.filled else 0.0
+
+    def class_metrics(self):
+        """Recall, precision e taxa de falsos positivos de cada classe na janela (NaN se indefinido)."""
+        tp = np.diag(self.matrix[:, :self.n_classes]).astype(np.float64)
+        actual = self.matrix.sum(axis=1)
+        predicted = self.matrix[:, :self.n_classes].sum(axis=0)
+        negatives = self.filled - actual
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "recall": np.where(actual > 0, tp / actual, np.nan),
+                "precision": np.where(predicted > 0, tp / predicted, np.nan),
+                "fpr": np.where(negatives > 0, (predicted - tp) / negatives, np.nan)
+            }
+
+    def __len__(self):
+        return self.filled
+
+
+class GrowableArray:
+    """
+    Array numpy pré-alocado que dobra de capacidade quando enche (append
+    amortizado O(1)). Com `row_shape` cada elemento é uma linha (ex.: um valor
+    por classe).
+    """
+
+    def __init__(self, capacity=64, dtype=np.float64, row_shape=()):
+        self.data = np.empty((max(1, int(capacity)),) + tuple(row_shape), dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, (2 * len(self.data),) + self.data.shape[1:])
+        self.data[self.size] = value
+        self.size += 1
+
+    def last(self):
+        return self.data[self.size - 1]
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+    def __len__(self):
+        return self.size
+
+
+class DriftEventStore:
+    """Posições das detecções (ordenadas por construção) e marcação por janela."""
+
+    def __init__(self, capacity=64):
+        self.positions = GrowableArray(capacity, dtype=np.int64)
+        self.window_flags = GrowableArray(capacity, dtype=np.int8)
+
+    def add(self, position):
+        self.positions.append(position)
+
+    def close_window(self, window_start):
+        """Marca se houve detecção na janela que começa em `window_start` (O(1))."""
+        flag = 1 if len(self.positions) and self.positions.last() >= window_start else 0
+        self.window_flags.append(flag)
+        return flag
+
+    def __len__(self):
+        return len(self.positions)
@@ -0,0 +1,217 @@
+import warnings
+import numpy as np
+
+# Configuração padrão das transformações online (usada pela página 'Modelos')
+DEFAULT_ONLINE_TRANSFORM = {
+    "clamp_inf": True,
+    "impute": True,
+    "impute_quantile": 0.5,
+    "impute_window": 1000,
+    "impute_refresh_every": 100,
+    "scale": False,
+}
+
+
+# --- Operadores ---
+# Todos seguem a mesma regra: cada instância é transformada apenas com as
+# estatísticas das instâncias anteriores e, em seguida, as estatísticas são
+# atualizadas com ela. No modo em lote (transform_batch), o lote inteiro usa as
+# estatísticas de antes do lote; com lotes de tamanho 1 os dois modos coincidem.
+
+class InfClamp:
+    """Substitui +inf/-inf pelo maior/menor valor finito já visto em cada feature."""
+
+    def __init__(self, n_features):
+        self.max_seen = np.full(n_features, np.nan)
+        self.min_seen = np.full(n_features, np.nan)
+
+    def transform_batch(self, X):
+        pos_inf = np.isposinf(X)
+        neg_inf = np.isneginf(X)
+        finite = np.where(np.isfinite(X), X, np.nan)
+
+        if pos_inf.any() or neg_inf.any():
+            X = X.copy()
+            # Sem histórico o valor vira NaN e fica para o imputador
+            X[pos_inf] = np.broadcast_to(self.max_seen, X.shape)[pos_inf]
+            X[neg_inf] = np.broadcast_to(self.min_seen, X.shape)[neg_inf]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            self.max_seen = np.fmax(self.max_seen, np.nanmax(finite, axis=0))
+            self.min_seen = np.fmin(self.min_seen, np.nanmin(finite, axis=0))
+        return X
+
+    def transform_one(self, x):
+        return self.transform_batch(x[np.newaxis, :])[0]
+
+
+class RunningQuantileImputer:
+    """
+    Preenche NaN com um quantil (mediana por padrão) calculado sobre uma janela
+    deslizante dos últimos valores observados de cada feature. Os valores de
+    preenchimento são recalculados a cada `refresh_every` instâncias.
+    """
+
+    def __init__(self, n_features, quantile=0.5, window=1000, refresh_every=100):
+        self.quantile = quantile
+        self.window = window
+        self.refresh_every = refresh_every
+        self.buffer = np.full((window, n_features), np.nan)
+        self.fill_values = np.zeros(n_features)
+        self._pos = 0
+        self._since_refresh = 0
+
+    def _refresh(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            q = np.nanquantile(self.buffer, self.quantile, axis=0)
+        self.fill_values = np.where(np.isnan(q), self.fill_values, q)
+        self._since_refresh = 0
+
+    def _update(self, X):
+        n = X.shape[0]
+        if n >= self.window:
+            self.buffer[:] = X[-self.window:]
+            self._pos = 0
+        else:
+            idx = (self._pos + np.arange(n)) % self.window
+            self.buffer[idx] = X
+            self._pos = (self._pos + n) % self.window
+        self._since_refresh += n
+        if self._since_refresh >= self.refresh_every:
+            self._refresh()
+
+    def transform_batch(self, X):
+        missing = np.isnan(X)
+        observed = np.where(np.isinf(X), np.nan, X)
+        if missing.any():
+            X = np.where(missing, self.fill_values, X)
+        self._update(observed)
+        return X
+
+    def transform_one(self, x):
+        return self.transform_batch(x[np.newaxis, :])[0]
+
+
+class RunningStandardScaler:
+    """Padronização (x - média) / desvio com estatísticas acumuladas (Welford/Chan)."""
+
+    def __init__(self, n_features):
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def _update(self, X):
+        valid = np.isfinite(X)
+        n_b = valid.sum(axis=0).astype(float)
+        has = n_b > 0
+        if not has.any():
+            return
+        X0 = np.where(valid, X, 0.0)
+        mean_b = np.divide(X0.sum(axis=0), n_b, out=np.zeros_like(n_b), where=has)
+        m2_b = np.where(valid, (X0 - mean_b) ** 2, 0.0).sum(axis=0)
+
+        total = self.count + n_b
+        delta = mean_b - self.mean
+        safe_total = np.where(total > 0, total, 1.0)
+        self.mean = self.mean + delta * n_b / safe_total
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_total
+        self.count = total
+
+    def transform_batch(self, X):
+        var = np.divide(self.m2, self.count - 1, out=np.zeros_like(self.m2), where=self.count > 1)
+        std = np.sqrt(var)
+        std[std == 0] = 1.0
+        X_scaled = (X - self.mean) / std
+        self._update(X)
+        return X_scaled
+
+    def transform_one(self, x):
+        return self.transform_batch(x[np.newaxis, :])[0]
+
+
+# --- Pipeline ---
+class OnlineTransformPipeline:
+    """Encadeia os operadores, aplicando-os apenas às colunas numéricas."""
+
+    def __init__(self, operators, columns=None):
+        self.operators = operators
+        self.columns = columns
+
+    def transform_batch(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        X_cols = X if self.columns is None else X[:, self.columns]
+        for op in self.operators:
+            X_cols = op.transform_batch(X_cols)
+        if self.columns is None:
+            return X_cols
+        X_out = X.copy()
+        X_out[:, self.columns] = X_cols
+        return X_out
+
+    def transform_one(self, x):
+        return self.transform_batch(np.asarray(x, dtype=np.float64)[np.newaxis, :])[0]
+
+    def transform_instance(self, instance, schema):
+        return _labeled_instance(schema, self.transform_one(instance.x), instance.y_index)
+
+    def transform_instances(self, instances, schema):
+        if not instances:
+            return instances
+        X = self.transform_batch(np.vstack([inst.x for inst in instances]))
+        return [_labeled_instance(schema, x, inst.y_index) for x, inst in zip(X, instances)]
+
+
+def _labeled_instance(schema, x, y_index):
+    try:
+        from capymoa.instance import LabeledInstance
+    except ImportError:
+        from capymoa.core import LabeledInstance
+    return LabeledInstance.from_array(schema, x, y_index)
+
+
+def get_numeric_columns(schema):
+    """Índices das features numéricas do schema (atributos nominais não são transformados)."""
+    header = schema.get_moa_header()
+    n_features = schema.get_num_attributes()
+    class_index = header.classIndex()
+    columns = []
+    feature_idx = 0
+    for att_idx in range(n_features + 1):
+        if att_idx == class_index:
+            continue
+        if header.attribute(att_idx).isNumeric():
+            columns.append(feature_idx)
+        feature_idx += 1
+    return np.array(columns, dtype=np.int64)
+
+
+def build_online_transform(config, schema):
+    """Cria o pipeline de transformações online a partir da configuração da UI (ou None)."""
+    if not config:
+        return None
+
+    columns = get_numeric_columns(schema)
+    n_features = len(columns)
+    if n_features == 0:
+        return None
+
+    operators = []
+    if config.get("clamp_inf", True):
+        operators.append(InfClamp(n_features))
+    if config.get("impute", True):
+        operators.append(RunningQuantileImputer(
+            n_features,
+            quantile=config.get("impute_quantile", 0.5),
+            window=config.get("impute_window", 1000),
+            refresh_every=config.get("impute_refresh_every", 100)
+        ))
+    if config.get("scale", False):
+        operators.append(RunningStandardScaler(n_features))
+
+    if not operators:
+        return None
+    if n_features == schema.get_num_attributes():
+        columns = None
+    return OnlineTransformPipeline(operators, columns)
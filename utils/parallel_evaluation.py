@@ -0,0 +1,124 @@
+import os
+import time
+import queue
+import traceback
+import multiprocessing as mp
+
+# Campos do estado de cada modelo que voltam do processo filho (objetos Java
+# como modelo, evaluator e detectores não são serializáveis)
+TRANSFERABLE_STATE_PREFIXES = ("results_",)
+TRANSFERABLE_STATE_KEYS = ("latency",)
+
+
+def _transferable_state(state):
+    return {
+        key: value for key, value in state.items()
+        if key.startswith(TRANSFERABLE_STATE_PREFIXES) or key in TRANSFERABLE_STATE_KEYS
+    }
+
+
+def _evaluate_model_worker(model_name, stream_path, model_params, eval_params, result_queue):
+    # Importações feitas no processo filho: cada worker inicia sua própria JVM
+    try:
+        from utils.file_stream import FileBackedStream
+        from utils.training import get_models
+        from utils.evaluation import run_evaluation_stream
+
+        if eval_params.get("CHECKPOINT_DIR"):
+            # Cada processo guarda o checkpoint do seu modelo em uma subpasta própria
+            eval_params = {**eval_params, "CHECKPOINT_DIR": os.path.join(eval_params["CHECKPOINT_DIR"], model_name)}
+        stream = FileBackedStream(stream_path)
+        models, _ = get_models(
+            schema=stream.get_schema(),
+            global_params=eval_params,
+            models_to_run=[model_name],
+            all_model_params={model_name: model_params}
+        )
+        for result in run_evaluation_stream(stream, models, eval_params):
+            if isinstance(result, dict):
+                result_queue.put(("done", model_name, {
+                    "final_report": result["final_report"][model_name],
+                    "state": _transferable_state(result["models_final_state"][model_name])
+                }))
+            else:
+                metrics_update, _ = result
+                result_queue.put(("window", model_name, metrics_update["instance"], metrics_update[model_name]))
+    except Exception:
+        result_queue.put(("error", model_name, traceback.format_exc()))
+
+
+def run_evaluation_parallel(stream_path, models_to_run, all_model_params, eval_params, poll_timeout=1.0):
+    """
+    Executa a avaliação prequencial de cada modelo em um processo próprio,
+    todos lendo o mesmo stream em disco (FileBackedStream). As janelas chegam
+    por uma fila e são reemitidas em ordem, no mesmo formato de
+    run_evaluation_stream, quando todos os modelos ainda ativos as reportam.
+    """
+    from utils.file_stream import load_stream_meta
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    processes = {}
+    for model_name in models_to_run:
+        processes[model_name] = ctx.Process(
+            target=_evaluate_model_worker,
+            args=(model_name, stream_path, all_model_params.get(model_name, {}), eval_params, result_queue),
+            daemon=True
+        )
+        processes[model_name].start()
+
+    pending_windows = {}
+    finished = {}
+    instance_count_history = []
+    run_start = last_window_time = time.perf_counter()
+    last_window_instance = 0
+
+    def ready_windows():
+        active = [m for m in models_to_run if m not in finished]
+        for instance_idx in sorted(pending_windows):
+            window = pending_windows[instance_idx]
+            if any(m not in window for m in active):
+                break
+            yield instance_idx, pending_windows.pop(instance_idx)
+
+    try:
+        while len(finished) < len(models_to_run):
+            try:
+                message = result_queue.get(timeout=poll_timeout)
+            except queue.Empty:
+                dead = [m for m, p in processes.items() if m not in finished and not p.is_alive()]
+                if dead:
+                    yield {"status": "error", "error": f"Processo(s) de avaliação encerrado(s) inesperadamente: {dead}"}
+                    return
+                continue
+
+            kind, model_name = message[0], message[1]
+            if kind == "error":
+                yield {"status": "error", "error": f"Erro ao avaliar '{model_name}':\n{message[2]}"}
+                return
+            if kind == "window":
+                pending_windows.setdefault(message[2], {})[model_name] = message[3]
+            elif kind == "done":
+                finished[model_name] = message[2]
+
+            for instance_idx, window in ready_windows():
+                # Vazão do conjunto: janelas completas (todos os modelos) por tempo de parede
+                now = time.perf_counter()
+                throughput = (instance_idx - last_window_instance) / max(now - last_window_time, 1e-9)
+                last_window_time, last_window_instance = now, instance_idx
+                instance_count_history.append(instance_idx)
+                yield {"instance": instance_idx, "throughput": throughput, **window}, instance_count_history
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    elapsed_s = time.perf_counter() - run_start
+    n_instances = min(eval_params.get("MAX_INSTANCES", 10000), load_stream_meta(stream_path)["n_instances"])
+    yield {
+        "status": "completed",
+        "final_report": {m: finished[m]["final_report"] for m in models_to_run},
+        "models_final_state": {m: finished[m]["state"] for m in models_to_run},
+        "instance_history": instance_count_history,
+        "throughput": n_instances / elapsed_s if elapsed_s > 0 else 0.0
+    }
@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
 import warnings
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_selection import SelectKBest, f_classif, mutual_info_classif
-from sklearn.decomposition import PCA
-from capymoa.stream import NumpyStream
+from utils.profiling import start_stage, finish_stage, save_stage_report
+from utils.aggregates import build_viz_cubes, build_label_segments
+
+# Nulos/infinitos mantidos no stream e tratados pelos operadores de utils/online_transform.py
+ONLINE_IMPUTATION = 'Online (durante o stream)'
+
+# Onde o stream final fica: em memória (NumpyStream) ou lido do disco em lotes (FileBackedStream)
+STREAM_STORAGE_MEMORY = 'Memória'
+STREAM_STORAGE_DISK = 'Disco (baixo uso de memória)'
 
 def create_stream_pipeline(
     file_path, 
@@ -22,16 +26,27 @@ def create_stream_pipeline(
     rf_iterations=1,
     skb_score_func_name='f_classif',
     pca_svd_solver='auto',
-    pca_whiten=False
+    pca_whiten=False,
+    stream_storage=STREAM_STORAGE_MEMORY
 ):
     log_messages = []
+    stage_report = []
+    pipeline_artifacts = {"stage_report": stage_report}
     
     def log(message):
         log_messages.append(message)
 
-    if NumpyStream is None:
+    # sklearn e capymoa (que inicia a JVM) só são importados quando o pipeline roda
+    try:
+        from capymoa.stream import NumpyStream
+        from utils.file_stream import FileBackedStream, save_stream_artifact, get_stream_artifact_dir
+    except ImportError:
         log("❌ ERRO CRÍTICO: A biblioteca 'capymoa' não foi encontrada. Instale-a com 'pip install capymoa'")
-        return None, None, None, None, log_messages, None
+        return None, None, None, None, log_messages, None, pipeline_artifacts
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_selection import SelectKBest, f_classif, mutual_info_classif
+    from sklearn.decomposition import PCA
 
     feature_importance_report = None
 
@@ -40,20 +55,25 @@ def create_stream_pipeline(
         
         # --- Carregar Dados ---
         log("[Passo 1/7] Carregando arquivo CSV completo...")
+        stage = start_stage(1, "Carregar CSV")
         df = pd.read_csv(file_path)
         df_processed = df.copy()
+        finish_stage(stage_report, stage, *df_processed.shape)
         log(f"    - Arquivo carregado. Shape inicial: {df_processed.shape}")
 
         # --- Renomear Colunas ---
         log("[Passo 2/7] Limpando nomes das colunas (removendo espaços)...")
+        stage = start_stage(2, "Limpar nomes das colunas")
         df_processed.columns = df_processed.columns.str.strip()
         target_label_col = target_label_col.strip()
         if timestamp_col:
             timestamp_col = timestamp_col.strip()
+        finish_stage(stage_report, stage, *df_processed.shape)
         log("    - Colunas limpas.")
 
         # --- Ordenar por Timestamp ---
         log("[Passo 3/7] Verificando e ordenando por Timestamp...")
+        stage = start_stage(3, "Ordenar por Timestamp")
         if timestamp_col and timestamp_col in df_processed.columns:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
@@ -69,17 +89,24 @@ def create_stream_pipeline(
         else:
             log(f"    - Aviso: Coluna de Timestamp '{timestamp_col}' não selecionada ou não encontrada. O stream seguirá a ordem do CSV.")
             timestamp_col = None 
+        finish_stage(stage_report, stage, *df_processed.shape)
 
         # --- Tratar Infinitos ---
         log("[Passo 4/7] Convertendo valores Infinitos (inf) para NaN...")
-        df_processed.replace([np.inf, -np.inf], np.nan, inplace=True)
+        stage = start_stage(4, "Converter infinitos")
+        if imputation_method == ONLINE_IMPUTATION:
+            log("    - Imputação online selecionada: valores infinitos mantidos para o tratamento durante o stream.")
+        else:
+            df_processed.replace([np.inf, -np.inf], np.nan, inplace=True)
+        finish_stage(stage_report, stage, *df_processed.shape)
         
         # --- Limpeza e Preparação de X/y ---
         log("[Passo 5/7] Removendo colunas, tratando nulos e codificando rótulos...")
+        stage = start_stage(5, "Limpeza, imputação e rótulos")
         
         if target_label_col not in df_processed.columns:
             log(f"    - ERRO: Coluna de rótulo '{target_label_col}' não encontrada.")
-            return None, None, None, None, log_messages, None
+            return None, None, None, None, log_messages, None, pipeline_artifacts
             
         le = LabelEncoder()
         y_data_series = le.fit_transform(df_processed[target_label_col].astype(str))
@@ -103,7 +130,11 @@ def create_stream_pipeline(
         nan_counts = X_data_df_numeric.isnull().sum().sum()
         y_data_pd = pd.Series(y_data_series, index=X_data_df_numeric.index) 
         
-        if nan_counts > 0:
+        if imputation_method == ONLINE_IMPUTATION:
+            inf_counts = np.isinf(X_data_df_numeric.values).sum()
+            log(f"    - {nan_counts} nulos e {inf_counts} infinitos mantidos. Serão tratados online, instância a instância, durante a avaliação.")
+            X_data_df_cleaned = X_data_df_numeric
+        elif nan_counts > 0:
             log(f"    - Imputando {nan_counts} valores nulos/infinitos com o método: '{imputation_method}'...")
             if imputation_method == 'Mediana':
                 X_data_df_cleaned = X_data_df_numeric.fillna(X_data_df_numeric.median()).fillna(0)
@@ -122,9 +153,28 @@ def create_stream_pipeline(
         X_data_df_cleaned = X_data_df_cleaned.reset_index(drop=True)
         y_data_final = y_data_pd.reset_index(drop=True).values
         
+        # Agregações para os gráficos, calculadas sobre as linhas que seguem no stream
+        timestamps_final = df_processed[timestamp_col].loc[y_data_pd.index] if timestamp_col else None
+        pipeline_artifacts["viz_cubes"] = build_viz_cubes(y_data_final, le.classes_, timestamps_final)
+        log(f"    - Tabelas de visualização calculadas ({len(pipeline_artifacts['viz_cubes']['time_counts'])} resoluções temporais).")
+        pipeline_artifacts["attack_segments"] = build_label_segments(y_data_final, le.classes_)
+        log(f"    - Índice de segmentos de rótulo calculado ({len(pipeline_artifacts['attack_segments'])} trechos contíguos).")
+        finish_stage(stage_report, stage, *X_data_df_cleaned.shape)
+        
         log(f"[Passo 6/7] Executando Método de Seleção de Features: '{feature_selection_method}'...")
+        stage = start_stage(6, "Seleção de features")
         original_features = X_data_df_cleaned.columns.tolist()
         
+        # Com imputação online os dados ainda têm nulos/infinitos; os seletores
+        # automáticos pontuam uma cópia preenchida com 0, mas o stream segue bruto.
+        if imputation_method == ONLINE_IMPUTATION and feature_selection_method != 'Seleção Manual':
+            if feature_selection_method == 'PCA (Extração de Componentes)':
+                log("    - ERRO: PCA não é compatível com a imputação online (os componentes exigem dados completos). Abortando.")
+                return None, None, None, None, log_messages, None, pipeline_artifacts
+            X_fit = X_data_df_cleaned.replace([np.inf, -np.inf], np.nan).fillna(0)
+        else:
+            X_fit = X_data_df_cleaned
+        
         if feature_selection_method == 'Seleção Manual':
             if manual_features_list:
                 log(f"    - Aplicando seleção manual. Mantendo {len(manual_features_list)} colunas.")
@@ -137,7 +187,7 @@ def create_stream_pipeline(
                 
                 if not features_existentes:
                     log("    - ERRO: Nenhuma das features selecionadas foi encontrada no DataFrame. Abortando.")
-                    return None, None, None, None, log_messages, None
+                    return None, None, None, None, log_messages, None, pipeline_artifacts
                     
                 X_data_df_cleaned = X_data_df_cleaned[features_existentes]
             else:
@@ -156,7 +206,7 @@ def create_stream_pipeline(
                     random_state=42 + i, 
                     n_jobs=-1
                 )
-                rf.fit(X_data_df_cleaned, y_data_final)
+                rf.fit(X_fit, y_data_final)
                 all_importances.append(rf.feature_importances_)
             
             avg_importances = pd.Series(np.mean(all_importances, axis=0), index=original_features)
@@ -183,14 +233,14 @@ def create_stream_pipeline(
             k = min(n_features_auto, len(original_features))
             
             selector = SelectKBest(score_func, k=k)
-            X_new = selector.fit_transform(X_data_df_cleaned, y_data_final)
+            selector.fit(X_fit, y_data_final)
             
             scores = pd.Series(selector.scores_, index=original_features)
             feature_importance_report = scores.to_dict()
 
             top_features = selector.get_feature_names_out(original_features).tolist()
             log(f"    - Features selecionadas: {top_features}")
-            X_data_df_cleaned = pd.DataFrame(X_new, columns=top_features)
+            X_data_df_cleaned = X_data_df_cleaned[top_features]
 
         elif feature_selection_method == 'PCA (Extração de Componentes)':
             log(f"    - Aplicando PCA (solver: '{pca_svd_solver}', whiten: {pca_whiten}) para extrair {n_features_auto} componentes...")
@@ -213,27 +263,57 @@ def create_stream_pipeline(
             feature_importance_report = {f"PCA_{i+1}": variance for i, variance in enumerate(explained_variance)}
             log(f"    - Variância explicada total: {sum(explained_variance)*100:.2f}%")
 
+        finish_stage(stage_report, stage, *X_data_df_cleaned.shape)
+
         # --- Criar Stream ---
-        log("[Passo 7/7] Criando objeto NumpyStream...")
+        stage = start_stage(7, "Criar stream")
         X_data = X_data_df_cleaned.values.astype(np.float64)
         y_data = y_data_final
         
-        log(f"    - Dados finais preparados: X_shape={X_data.shape}, y_shape={y_data.shape}.")
-
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", category=UserWarning)
-            stream = NumpyStream(
+        if stream_storage == STREAM_STORAGE_DISK:
+            log("[Passo 7/7] Gravando o dataset final em disco e criando FileBackedStream...")
+            log(f"    - Dados finais preparados: X_shape={X_data.shape}, y_shape={y_data.shape}.")
+            artifact_dir = save_stream_artifact(
+                get_stream_artifact_dir(file_path),
                 X_data,
                 y_data,
-                target_name=target_label_col, 
-                dataset_name=file_path.split('/')[-1] 
+                feature_names=X_data_df_cleaned.columns.tolist(),
+                target_name=target_label_col,
+                class_labels=le.classes_,
+                dataset_name=file_path.split('/')[-1]
             )
+            pipeline_artifacts["stream_path"] = artifact_dir
+            log(f"    - Stream salvo em: {artifact_dir}")
+            stream = FileBackedStream(artifact_dir)
+        else:
+            log("[Passo 7/7] Criando objeto NumpyStream...")
+            log(f"    - Dados finais preparados: X_shape={X_data.shape}, y_shape={y_data.shape}.")
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=UserWarning)
+                # Mesmos nomes de atributos e alvo categórico do schema do
+                # FileBackedStream: modelos e checkpoints servem aos dois armazenamentos
+                stream = NumpyStream(
+                    X_data,
+                    y_data,
+                    target_name=target_label_col, 
+                    dataset_name=file_path.split('/')[-1],
+                    feature_names=X_data_df_cleaned.columns.tolist(),
+                    target_type="categorical"
+                )
             
         stream.restart() 
+        finish_stage(stage_report, stage, *X_data.shape)
         log("✅ Stream criado com sucesso e pronto para uso.")
+
+        try:
+            pipeline_artifacts["stage_report_path"] = save_stage_report(stage_report, file_path)
+            log(f"    - Relatório de desempenho salvo em: {pipeline_artifacts['stage_report_path']}")
+        except OSError as e:
+            log(f"    - Aviso: Não foi possível salvar o relatório de desempenho: {e}")
         
-        return stream, le, X_data_df_cleaned, df_processed, log_messages, feature_importance_report
+        return stream, le, X_data_df_cleaned, df_processed, log_messages, feature_importance_report, pipeline_artifacts
         
     except Exception as e:
         log(f"❌ ERRO INESPERADO NO PIPELINE: {e}")
-        return None, None, None, None, log_messages, None
\ No newline at end of file
+        return None, None, None, None, log_messages, None, pipeline_artifacts
\ No newline at end of file
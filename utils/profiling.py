@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import math
+import time
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# --- Memória do Processo ---
+def get_peak_rss_mb():
+    """Pico de memória residente (RSS) do processo em MB, ou None se indisponível."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta em KB, macOS em bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize / (1024 * 1024)
+        except Exception:
+            return None
+    return None
+
+
+# --- Instrumentação por Etapa ---
+def start_stage(step, name):
+    """Abre o registro de uma etapa do pipeline, guardando os marcadores iniciais."""
+    return {
+        "step": step,
+        "stage": name,
+        "_wall_start": time.perf_counter(),
+        "_cpu_start": time.process_time(),
+        "_rss_start": get_peak_rss_mb(),
+    }
+
+
+def finish_stage(stage_report, record, rows=None, cols=None):
+    """Fecha o registro da etapa e o adiciona ao relatório."""
+    rss_end = get_peak_rss_mb()
+    rss_start = record.pop("_rss_start")
+    record["wall_time_s"] = round(time.perf_counter() - record.pop("_wall_start"), 4)
+    record["cpu_time_s"] = round(time.process_time() - record.pop("_cpu_start"), 4)
+    record["peak_rss_delta_mb"] = (
+        round(rss_end - rss_start, 2) if rss_end is not None and rss_start is not None else None
+    )
+    record["peak_rss_mb"] = round(rss_end, 2) if rss_end is not None else None
+    record["rows"] = int(rows) if rows is not None else None
+    record["cols"] = int(cols) if cols is not None else None
+    stage_report.append(record)
+    return record
+
+
+def get_stage_report_path(file_path):
+    base, _ = os.path.splitext(file_path)
+    return f"{base}.pipeline_report.json"
+
+
+def save_stage_report(stage_report, file_path, extra=None):
+    """Salva o relatório de etapas em JSON ao lado do dataset."""
+    report_path = get_stage_report_path(file_path)
+    payload = {
+        "dataset": file_path,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "total_wall_time_s": round(sum(r["wall_time_s"] for r in stage_report), 4),
+        "total_cpu_time_s": round(sum(r["cpu_time_s"] for r in stage_report), 4),
+        "stages": stage_report,
+    }
+    if extra:
+        payload.update(extra)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return report_path
+
+
+# --- Inicialização das Páginas ---
+# Bibliotecas que custam segundos para importar (o capymoa inicia a JVM via jpype)
+HEAVY_MODULES = ("capymoa", "jpype", "sklearn", "torch")
+MAX_PAGE_STARTUP_RECORDS = 500
+
+# Registro do processo do Streamlit: sobrevive às reexecuções e trocas de página
+_page_startup_records = []
+
+
+class PageStartup:
+    """
+    Mede a inicialização de uma página (importações e configuração) e quais
+    bibliotecas pesadas foram carregadas nela. Criado logo após o import do
+    streamlit e fechado com finish() depois do set_page_config.
+    """
+
+    def __init__(self, page_name):
+        self.page_name = page_name
+        self.start = time.perf_counter()
+        self.loaded_before = {m for m in HEAVY_MODULES if m in sys.modules}
+
+    def finish(self):
+        cold = not any(r["page"] == self.page_name for r in _page_startup_records)
+        record = {
+            "page": self.page_name,
+            "startup_ms": (time.perf_counter() - self.start) * 1000,
+            "heavy_imports": [m for m in HEAVY_MODULES if m in sys.modules and m not in self.loaded_before],
+            "first_load": cold,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        _page_startup_records.append(record)
+        del _page_startup_records[:-MAX_PAGE_STARTUP_RECORDS]
+        return record
+
+
+def page_startup_report():
+    """Por página: primeira carga no processo, última, média das demais e bibliotecas pesadas importadas."""
+    report = {}
+    for record in _page_startup_records:
+        entry = report.setdefault(record["page"], {"first_ms": None, "warm_ms": [], "heavy_imports": set()})
+        if record["first_load"]:
+            entry["first_ms"] = record["startup_ms"]
+        else:
+            entry["warm_ms"].append(record["startup_ms"])
+        entry["last_ms"] = record["startup_ms"]
+        entry["heavy_imports"].update(record["heavy_imports"])
+    return [
+        {
+            "page": page,
+            "first_ms": entry["first_ms"],
+            "last_ms": entry["last_ms"],
+            "warm_mean_ms": sum(entry["warm_ms"]) / len(entry["warm_ms"]) if entry["warm_ms"] else None,
+            "loads": len(entry["warm_ms"]) + (entry["first_ms"] is not None),
+            "heavy_imports": sorted(entry["heavy_imports"]),
+        }
+        for page, entry in report.items()
+    ]
+
+
+# --- Latência por Operação ---
+class LatencyHistogram:
+    """
+    Histograma de latências com faixas logarítmicas (resolução relativa
+    constante e memória fixa). Percentis são estimados pelo ponto médio
+    geométrico da faixa que contém o posto pedido.
+    """
+
+    def __init__(self, min_s=1e-7, max_s=10.0, bins_per_decade=20):
+        self.min_s = min_s
+        self.bins_per_decade = bins_per_decade
+        n_bins = int(math.ceil(math.log10(max_s / min_s) * bins_per_decade))
+        # Faixa 0 = abaixo de min_s; última faixa = acima de max_s
+        self.counts = np.zeros(n_bins + 2, dtype=np.int64)
+        self.count = 0
+        self.total_s = 0.0
+
+    def add(self, seconds):
+        if seconds <= self.min_s:
+            b = 0
+        else:
+            b = min(int(math.log10(seconds / self.min_s) * self.bins_per_decade) + 1, len(self.counts) - 1)
+        self.counts[b] += 1
+        self.count += 1
+        self.total_s += seconds
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.count += other.count
+        self.total_s += other.total_s
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total_s = 0.0
+
+    def percentile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        b = int(np.searchsorted(np.cumsum(self.counts), rank))
+        if b == 0:
+            return self.min_s
+        lower = self.min_s * 10 ** ((b - 1) / self.bins_per_decade)
+        if b == len(self.counts) - 1:
+            return lower
+        return math.sqrt(lower * self.min_s * 10 ** (b / self.bins_per_decade))
+
+    def summary(self):
+        """Resumo em microssegundos."""
+        return {
+            "count": int(self.count),
+            "mean_us": float(self.total_s / self.count * 1e6) if self.count else 0.0,
+            "p50_us": self.percentile(50) * 1e6,
+            "p95_us": self.percentile(95) * 1e6,
+            "p99_us": self.percentile(99) * 1e6,
+        }
@@ -0,0 +1,100 @@
+import math
+import numpy as np
+
+DEFAULT_RACING = {"enabled": False, "delta": 0.05, "min_windows": 10}
+
+
+def empirical_bernstein_bound(variance, value_range, delta, n):
+    """
+    Limite de Bernstein empírico (Maurer e Pontil, 2009) para a média de `n`
+    amostras num intervalo de largura `value_range`, com variância amostral
+    `variance`: adapta-se à variância observada em vez de só ao intervalo.
+    """
+    log_term = math.log(2.0 / delta)
+    return math.sqrt(2.0 * variance * log_term / n) + 7.0 * value_range * log_term / (3.0 * (n - 1))
+
+
+def spent_delta(delta, t):
+    """δ do t-ésimo teste (t ≥ 1): as parcelas δ·6/(π²t²) somam δ, então o teste vale em qualquer parada."""
+    return delta * 6.0 / (math.pi ** 2 * t ** 2)
+
+
+class HoeffdingRace:
+    """
+    Corrida entre modelos avaliados no mesmo stream. Em cada fronteira de
+    janela entram os acertos de cada instância da janela, acumulados por
+    modelo e por par de modelos (diferenças pareadas d = acerto de a - acerto
+    de b, em [-1, 1]). Um modelo é descartado quando a diferença média para o
+    líder supera o limite de Bernstein empírico dessas diferenças. O δ é
+    gasto ao longo dos testes (δ·6/(π²t²) no t-ésimo) e dividido entre as
+    comparações com os demais modelos, de modo que o melhor modelo só é
+    descartado com probabilidade de no máximo δ, mesmo testando a cada janela.
+    """
+
+    def __init__(self, delta=0.05, min_windows=10):
+        self.delta = delta
+        self.min_windows = max(1, int(min_windows))
+        self.n_models = None
+        self.correct = {}
+        # (a, b) -> [soma de d, soma de d²]
+        self.pairs = {}
+        self.n_instances = 0
+        self.n_windows = 0
+        self.n_tests = 0
+
+    def _pair_sums(self, a, b):
+        if (a, b) in self.pairs:
+            return self.pairs[(a, b)]
+        total, squares = self.pairs[(b, a)]
+        return -total, squares
+
+    def update(self, window_correct, instance):
+        """Recebe {modelo: acertos (bool) de cada instância da janela} dos ativos e devolve {modelo: motivo} dos descartados."""
+        models = list(window_correct)
+        if self.n_models is None:
+            self.n_models = len(models)
+        correct = {m: np.asarray(c, dtype=np.int8) for m, c in window_correct.items()}
+        for i, a in enumerate(models):
+            self.correct[a] = self.correct.get(a, 0) + int(correct[a].sum())
+            for b in models[i + 1:]:
+                d = correct[a] - correct[b]
+                sums = self.pairs.setdefault((a, b), [0, 0])
+                sums[0] += int(d.sum())
+                sums[1] += int(np.count_nonzero(d))
+        self.n_instances += len(correct[models[0]]) if models else 0
+        self.n_windows += 1
+        n = self.n_instances
+        if len(models) < 2 or self.n_windows < self.min_windows or n < 2:
+            return {}
+
+        self.n_tests += 1
+        delta = spent_delta(self.delta, self.n_tests) / max(1, self.n_models - 1)
+        means = {m: self.correct[m] / n for m in models}
+        leader = max(means, key=means.get)
+
+        dropped = {}
+        for model_name in models:
+            if model_name == leader:
+                continue
+            total, squares = self._pair_sums(leader, model_name)
+            gap = total / n
+            variance = max(0.0, (squares / n - gap ** 2) * n / (n - 1))
+            epsilon = empirical_bernstein_bound(variance, 2.0, delta, n)
+            if gap > epsilon:
+                dropped[model_name] = {
+                    "instance": instance,
+                    "windows": self.n_windows,
+                    "leader": leader,
+                    "gap": float(gap),
+                    "epsilon": float(epsilon),
+                    "reason": (
+                        f"Acurácia média {means[model_name]:.4f} abaixo da de {leader} ({means[leader]:.4f}): "
+                        f"diferença {gap:.4f} > ε {epsilon:.4f} após {self.n_windows} janelas "
+                        f"(Bernstein empírico, δ={self.delta})"
+                    ),
+                }
+        for model_name in dropped:
+            del self.correct[model_name]
+            for pair in [p for p in self.pairs if model_name in p]:
+                del self.pairs[pair]
+        return dropped
@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import numpy as np
+import pandas as pd
+from utils.checkpoint import RESULT_IGNORED_PARAMS
+
+DEFAULT_DB_PATH = os.path.join("results", "results.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    config_hash TEXT NOT NULL,
+    dataset_hash TEXT NOT NULL,
+    dataset_name TEXT,
+    model TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    n_instances INTEGER,
+    window_size INTEGER,
+    accuracy REAL,
+    f1 REAL,
+    kappa REAL,
+    instances_per_s REAL,
+    throughput REAL,
+    elapsed_s REAL,
+    dataset_json TEXT,
+    params_json TEXT,
+    eval_params_json TEXT,
+    final_report_json TEXT
+);
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS windows (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    instance INTEGER NOT NULL,
+    accuracy REAL,
+    class_metrics_json TEXT
+);
+CREATE TABLE IF NOT EXISTS drift_events (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    detector TEXT NOT NULL,
+    instance INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs(dataset_hash, model);
+CREATE INDEX IF NOT EXISTS idx_runs_config ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS idx_run_params ON run_params(name, value);
+CREATE INDEX IF NOT EXISTS idx_windows_run ON windows(run_id, instance);
+CREATE INDEX IF NOT EXISTS idx_drift_events_run ON drift_events(run_id, detector);
+"""
+
+
+def _hash(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def dataset_hash(dataset_id):
+    """Impressão digital do dataset (arquivo, features e número de linhas)."""
+    return _hash(dataset_id)
+
+
+def run_config_hash(dataset_id, model_name, params, eval_params):
+    """Mesmo hash = mesma execução (dados, modelo, hiperparâmetros e parâmetros da avaliação)."""
+    return _hash({
+        "dataset": dataset_id,
+        "model": model_name,
+        "params": params,
+        "eval_params": {k: v for k, v in eval_params.items() if k not in RESULT_IGNORED_PARAMS},
+    })
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _float_or_none(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+
+class ResultsStore:
+    """
+    Banco SQLite local com o histórico das avaliações: uma linha em `runs` por
+    modelo avaliado (hash da configuração, impressão digital do dataset,
+    métricas finais e tempos), com as séries por janela, as detecções de drift
+    e os hiperparâmetros (um por linha, para consultas por parâmetro) em
+    tabelas indexadas por run_id.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # O Streamlit pode reexecutar a página em outra thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Gravação ---
+    def record_evaluation(self, results, dataset_id, all_model_params, eval_params, source="streamlit", elapsed_s=None):
+        """Grava o resultado final de run_evaluation_stream/parallel; devolve {modelo: run_id}."""
+        created_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        ds_hash = dataset_hash(dataset_id)
+        instance_history = [int(i) for i in results["instance_history"]]
+        if elapsed_s is None and results.get("throughput"):
+            elapsed_s = instance_history[-1] / results["throughput"] if instance_history else None
+
+        run_ids = {}
+        with self.conn:
+            for model_name, state in results["models_final_state"].items():
+                params = {k: v for k, v in all_model_params.get(model_name, {}).items() if k != "sizing"}
+                report = results["final_report"].get(model_name, {})
+                cursor = self.conn.execute(
+                    """INSERT INTO runs (config_hash, dataset_hash, dataset_name, model, created_at, source,
+                       n_instances, window_size, accuracy, f1, kappa, instances_per_s, throughput, elapsed_s,
+                       dataset_json, params_json, eval_params_json, final_report_json)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        run_config_hash(dataset_id, model_name, params, eval_params),
+                        ds_hash,
+                        dataset_id.get("file"),
+                        model_name,
+                        created_at,
+                        source,
+                        instance_history[-1] if instance_history else 0,
+                        eval_params.get("WINDOW_SIZE"),
+                        _float_or_none(report.get("Acurácia")),
+                        _float_or_none(report.get("F1-Score")),
+                        _float_or_none(report.get("Kappa")),
+                        _float_or_none(report.get("Instâncias/s")),
+                        _float_or_none(results.get("throughput")),
+                        _float_or_none(elapsed_s),
+                        _json(dataset_id),
+                        _json(params),
+                        _json({k: v for k, v in eval_params.items() if k not in RESULT_IGNORED_PARAMS}),
+                        _json(report),
+                    )
+                )
+                run_id = cursor.lastrowid
+                run_ids[model_name] = run_id
+
+                self.conn.executemany(
+                    "INSERT INTO run_params (run_id, name, value) VALUES (?, ?, ?)",
+                    [(run_id, name, _json(value)) for name, value in params.items()]
+                )
+
+                class_series = {
+                    key[len("results_class_"):]: np.asarray(values)
+                    for key, values in state.items() if key.startswith("results_class_")
+                }
+                window_rows = []
+                for i, (instance, accuracy) in enumerate(zip(instance_history, state["results_accuracy"])):
+                    class_metrics = {
+                        metric: [_float_or_none(v) for v in values[i]]
+                        for metric, values in class_series.items() if i < len(values)
+                    }
+                    window_rows.append((run_id, instance, float(accuracy), _json(class_metrics) if class_metrics else None))
+                self.conn.executemany(
+                    "INSERT INTO windows (run_id, instance, accuracy, class_metrics_json) VALUES (?, ?, ?, ?)",
+                    window_rows
+                )
+
+                self.conn.executemany(
+                    "INSERT INTO drift_events (run_id, detector, instance) VALUES (?, ?, ?)",
+                    [
+                        (run_id, key[len("results_drift_"):], int(position))
+                        for key, positions in state.items() if key.startswith("results_drift_")
+                        for position in positions
+                    ]
+                )
+        return run_ids
+
+    # --- Consultas ---
+    def list_runs(self, model=None, dataset_id=None, params=None, config_hash=None):
+        """
+        Execuções gravadas, da mais recente para a mais antiga. `params`
+        ({nome: valor}) filtra por hiperparâmetro exato, usando o índice de run_params.
+        """
+        query = ["SELECT * FROM runs WHERE 1 = 1"]
+        args = []
+        if model is not None:
+            models = [model] if isinstance(model, str) else list(model)
+            query.append(f"AND model IN ({', '.join('?' * len(models))})")
+            args.extend(models)
+        if dataset_id is not None:
+            query.append("AND dataset_hash = ?")
+            args.append(dataset_hash(dataset_id))
+        if config_hash is not None:
+            query.append("AND config_hash = ?")
+            args.append(config_hash)
+        for name, value in (params or {}).items():
+            query.append("AND run_id IN (SELECT run_id FROM run_params WHERE name = ? AND value = ?)")
+            args.extend([name, _json(value)])
+        query.append("ORDER BY run_id DESC")
+        return pd.read_sql_query(" ".join(query), self.conn, params=args)
+
+    def load_windows(self, run_ids):
+        """Séries por janela das execuções pedidas (acurácia e, quando gravadas, métricas por classe)."""
+        run_ids = [int(r) for r in run_ids]
+        if not run_ids:
+            return pd.DataFrame(columns=["run_id", "instance", "accuracy", "class_metrics_json"])
+        return pd.read_sql_query(
+            f"SELECT * FROM windows WHERE run_id IN ({', '.join('?' * len(run_ids))}) ORDER BY run_id, instance",
+            self.conn,
+            params=run_ids
+        )
+
+    def load_drift_events(self, run_ids):
+        run_ids = [int(r) for r in run_ids]
+        if not run_ids:
+            return pd.DataFrame(columns=["run_id", "detector", "instance"])
+        return pd.read_sql_query(
+            f"SELECT * FROM drift_events WHERE run_id IN ({', '.join('?' * len(run_ids))}) ORDER BY run_id, instance",
+            self.conn,
+            params=run_ids
+        )
+
+    def delete_runs(self, run_ids):
+        run_ids = [int(r) for r in run_ids]
+        if run_ids:
+            with self.conn:
+                self.conn.execute(f"DELETE FROM runs WHERE run_id IN ({', '.join('?' * len(run_ids))})", run_ids)
@@ -0,0 +1,244 @@
+"""
+Execução da avaliação sem interface (sem Streamlit/navegador).
+
+Uso, a partir da raiz do repositório:
+
+    python -m utils.runner experimento.json [--output-dir resultados/exp1]
+
+Exemplo de spec:
+
+    {
+        "name": "dia1-ht-vs-arf",
+        "data_file": "data/dia1_processado.csv",
+        "pipeline": {
+            "target_label_col": "Label",
+            "timestamp_col": "Timestamp",
+            "cols_para_remover": [],
+            "feature_selection_method": "Seleção Manual",
+            "manual_features_list": ["Flow Duration", "Total Fwd Packets"],
+            "stream_storage": "Disco (baixo uso de memória)"
+        },
+        "models": {
+            "HoeffdingTree": {"grace_period": 200},
+            "AdaptiveRandomForest": {"ensemble_size": 30}
+        },
+        "evaluation": {
+            "MAX_INSTANCES": 1000000,
+            "WINDOW_SIZE": 1000,
+            "DELAY_LENGTH": null,
+            "LABEL_PROBABILITY": 1.0
+        },
+        "parallel": false,
+        "output_dir": "results/dia1-ht-vs-arf"
+    }
+
+Uma seção opcional "ingest" ({"day", "dataset_path", "output_filename",
+"downsample_factors"}) gera antes o arquivo de dados a partir dos CSVs
+brutos, como a página Base de Dados. Em LeveragingBagging e
+AdaptiveRandomForest, "target_instances_per_s" no lugar de "ensemble_size"
+calibra o tamanho do ensemble (e o max_features do ARF) para essa vazão
+antes da avaliação (ver utils.sizing). Saídas em output_dir: windows.parquet,
+drift_events.parquet, final_report.json e pipeline_log.txt. Cada execução
+também é gravada no banco de resultados (utils.results_store) indicado em
+"results_db" (padrão: results/results.db; null desativa), o mesmo que a
+página de Avaliação usa para sobrepor execuções anteriores. Uma seção
+opcional "jvm" ({"heap_max_mb", "heap_initial_mb", "gc", "max_gc_pause_ms",
+"extra_args"}) define os argumentos da JVM do capymoa (sem ela vale a
+configuração gravada pela página de Modelos, ver utils.jvm), e
+"JVM_WARMUP_INSTANCES" em "evaluation" aquece a JVM antes da medição.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+
+DEFAULT_OUTPUT_ROOT = "results"
+
+
+class ConsoleStatus:
+    """Substitui o placeholder do Streamlit usado na ingestão, escrevendo no terminal."""
+
+    def empty(self):
+        return self
+
+    def info(self, message):
+        print(f"[info] {message}", flush=True)
+
+    def warning(self, message):
+        print(f"[aviso] {message}", flush=True)
+
+    def error(self, message):
+        print(f"[erro] {message}", file=sys.stderr, flush=True)
+
+
+def load_spec(spec_path):
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    if "models" not in spec or not spec["models"]:
+        raise ValueError("A spec precisa de uma seção 'models' com ao menos um modelo.")
+    if "data_file" not in spec and "ingest" not in spec:
+        raise ValueError("A spec precisa de 'data_file' ou de uma seção 'ingest'.")
+    return spec
+
+
+def run_ingest(ingest):
+    from utils.data_loader import process_and_save, DOWNSAMPLE_FACTORS
+
+    factors = {**DOWNSAMPLE_FACTORS, **ingest.get("downsample_factors", {})}
+    total, output_filepath, status = process_and_save(
+        ingest["day"],
+        ingest["dataset_path"],
+        factors,
+        ingest["output_filename"],
+        ConsoleStatus(),
+        lambda: True
+    )
+    if status != "Success" or total == 0:
+        raise RuntimeError(f"Ingestão falhou ({status}, {total} amostras).")
+    return output_filepath
+
+
+def _window_rows(metrics_update, models, class_labels):
+    """Uma linha por modelo e janela, com as métricas por classe e a latência achatadas em colunas."""
+    from utils.evaluation import CLASS_METRICS
+
+    rows = []
+    for model_name in models:
+        metrics = metrics_update.get(model_name)
+        if metrics is None:
+            continue
+        row = {
+            "instance": metrics_update["instance"],
+            "model": model_name,
+            "accuracy": metrics["Acurácia"],
+            "drift_ddm": metrics["Drift (DDM)"],
+            "drift_adwin": metrics["Drift (ADWIN)"],
+            "drift_abcd": metrics["Drift (ABCD)"],
+            "model_instances_per_s": metrics.get("Instâncias/s"),
+            "throughput": metrics_update.get("throughput"),
+        }
+        for metric, label in CLASS_METRICS.items():
+            for class_label, value in zip(class_labels, metrics.get(label, [])):
+                row[f"{metric}_{class_label}"] = float(value)
+        for op, summary in metrics.get("Latência", {}).items():
+            for stat in ("p50_us", "p95_us", "p99_us"):
+                row[f"latency_{op}_{stat}"] = summary[stat]
+        for field, value in metrics.get("JVM", {}).items():
+            row[f"jvm_{field}"] = value
+        rows.append(row)
+    return rows
+
+
+def run_spec(spec, output_dir=None):
+    """Executa pipeline, construção dos modelos e avaliação de uma spec e grava os resultados."""
+    from utils.jvm import configure_jvm
+
+    # Antes de qualquer importação do capymoa: a JVM é iniciada uma única vez
+    configure_jvm(spec.get("jvm"))
+    from utils.preprocessing import create_stream_pipeline
+    from utils.training import get_models
+    from utils.evaluation import run_evaluation_stream, DRIFT_DETECTORS
+    from utils.parallel_evaluation import run_evaluation_parallel
+    from utils.file_stream import FileBackedStream
+    from utils.sizing import calibrate_ensemble, apply_sizing
+    from utils.results_store import ResultsStore, DEFAULT_DB_PATH
+
+    name = spec.get("name") or os.path.splitext(os.path.basename(spec.get("data_file", "run")))[0]
+    output_dir = output_dir or spec.get("output_dir") or os.path.join(DEFAULT_OUTPUT_ROOT, name)
+    os.makedirs(output_dir, exist_ok=True)
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    run_start = time.perf_counter()
+
+    data_file = run_ingest(spec["ingest"]) if "ingest" in spec else spec["data_file"]
+
+    print(f"Pré-processando '{data_file}'...", flush=True)
+    stream, le, X_final_df, df_processed, log_messages, feature_report, pipeline_artifacts = create_stream_pipeline(
+        data_file, **spec.get("pipeline", {})
+    )
+    with open(os.path.join(output_dir, "pipeline_log.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(log_messages))
+    if stream is None:
+        raise RuntimeError("O pipeline de pré-processamento falhou; veja pipeline_log.txt.")
+
+    models_to_run = list(spec["models"])
+    all_model_params = dict(spec["models"])
+    for model_name, params in all_model_params.items():
+        if "target_instances_per_s" in params:
+            print(f"Calibrando o ensemble de {model_name} para {params['target_instances_per_s']:,} instâncias/s...", flush=True)
+            base_params = {k: v for k, v in params.items() if k != "target_instances_per_s"}
+            sizing = calibrate_ensemble(model_name, stream, params["target_instances_per_s"], base_params)
+            all_model_params[model_name] = apply_sizing(base_params, sizing)
+    eval_params = dict(spec.get("evaluation", {}))
+    eval_params.setdefault("MAX_INSTANCES", len(stream) if hasattr(stream, "__len__") else 10000)
+
+    if spec.get("parallel") and isinstance(stream, FileBackedStream) and len(models_to_run) > 1:
+        evaluation = run_evaluation_parallel(stream.artifact_dir, models_to_run, all_model_params, eval_params)
+    else:
+        models_to_evaluate, _ = get_models(stream.get_schema(), eval_params, models_to_run, all_model_params)
+        evaluation = run_evaluation_stream(stream, models_to_evaluate, eval_params)
+
+    class_labels = [str(c) for c in le.classes_]
+    window_rows = []
+    total_instances = eval_params["MAX_INSTANCES"]
+    final = None
+    for result in evaluation:
+        if isinstance(result, dict):
+            if result.get("status") != "completed":
+                raise RuntimeError(result.get("error", "Erro desconhecido na avaliação."))
+            final = result
+            break
+        metrics_update, _ = result
+        window_rows.extend(_window_rows(metrics_update, models_to_run, class_labels))
+        print(f"{metrics_update['instance']:,}/{total_instances:,} instâncias", flush=True)
+
+    pd.DataFrame(window_rows).to_parquet(os.path.join(output_dir, "windows.parquet"), index=False)
+    drift_rows = [
+        {"model": model_name, "detector": det, "instance": int(position)}
+        for model_name, state in final["models_final_state"].items()
+        for det in DRIFT_DETECTORS
+        for position in state.get(f"results_drift_{det}", [])
+    ]
+    pd.DataFrame(drift_rows, columns=["model", "detector", "instance"]).to_parquet(
+        os.path.join(output_dir, "drift_events.parquet"), index=False
+    )
+
+    report = {
+        "name": name,
+        "started_at": started_at,
+        "elapsed_s": round(time.perf_counter() - run_start, 3),
+        "data_file": data_file,
+        "class_labels": class_labels,
+        "throughput": final.get("throughput"),
+        "final_report": final["final_report"],
+        "sizing": {m: p["sizing"] for m, p in all_model_params.items() if "sizing" in p},
+        "instance_cache": final.get("instance_cache"),
+        "feature_report": feature_report,
+        "stage_report": pipeline_artifacts.get("stage_report"),
+        "spec": spec,
+    }
+    with open(os.path.join(output_dir, "final_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+
+    results_db = spec.get("results_db", DEFAULT_DB_PATH)
+    if results_db:
+        # Mesma impressão digital do dataset usada pela página de Avaliação
+        dataset_id = {"file": data_file, "features": list(X_final_df.columns), "rows": len(df_processed)}
+        with ResultsStore(results_db) as store:
+            run_ids = store.record_evaluation(final, dataset_id, all_model_params, eval_params, source=f"runner:{name}", elapsed_s=report["elapsed_s"])
+        print(f"Execuções gravadas em '{results_db}': {run_ids}", flush=True)
+    print(f"Resultados gravados em '{output_dir}'.", flush=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avaliação prequencial sem interface a partir de uma spec JSON.")
+    parser.add_argument("spec", help="Caminho do arquivo JSON com a spec do experimento.")
+    parser.add_argument("--output-dir", default=None, help="Pasta de saída (padrão: output_dir da spec ou results/<name>).")
+    args = parser.parse_args(argv)
+    run_spec(load_spec(args.spec), args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Varreduras de hiperparâmetros e de sementes em paralelo, sem interface.
+
+Uso, a partir da raiz do repositório:
+
+    python -m utils.scheduler varredura.json [--workers 8]
+
+Exemplo de spec:
+
+    {
+        "name": "ht-grid",
+        "stream_dir": "data/dia1_processado_stream",
+        "evaluation": {"MAX_INSTANCES": 500000, "WINDOW_SIZE": 1000},
+        "runs": [
+            {
+                "model": "HoeffdingTree",
+                "grid": {"grace_period": [100, 200, 400], "confidence": [0.01, 0.05]},
+                "seeds": [1, 2, 3]
+            },
+            {"model": "AdaptiveRandomForest", "params": {"ensemble_size": 30}, "seeds": [1, 2]}
+        ]
+    }
+
+Em vez de "stream_dir" (artefato gerado com armazenamento em Disco), a spec
+pode trazer "data_file" e "pipeline", como a do utils.runner: o stream é
+preparado uma única vez e compartilhado por todos os processos. Cada
+execução é identificada pelo hash da sua configuração; execuções cujo
+resultado já existe em <output_dir>/runs/ são puladas. A tabela consolidada
+fica em <output_dir>/results.parquet. Uma seção opcional "jvm", como a do
+utils.runner, define os argumentos da JVM de cada processo (sem ela vale a
+configuração gravada pela página de Modelos, ver utils.jvm).
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import traceback
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from utils.jvm import configure_jvm
+from utils.checkpoint import RESULT_IGNORED_PARAMS
+
+DEFAULT_OUTPUT_ROOT = "results"
+
+
+# --- Expansão da Varredura ---
+def expand_runs(run_specs):
+    """Produto cartesiano do grid de cada entrada, repetido para cada semente."""
+    runs = []
+    for entry in run_specs:
+        grid = entry.get("grid", {})
+        keys = list(grid)
+        seeds = entry.get("seeds") or [None]
+        for values in itertools.product(*(grid[k] for k in keys)):
+            for seed in seeds:
+                params = {**entry.get("params", {}), **dict(zip(keys, values))}
+                if seed is not None:
+                    params["random_seed"] = seed
+                runs.append({"model": entry["model"], "params": params})
+    return runs
+
+
+def dataset_fingerprint(stream_dir):
+    from utils.file_stream import load_stream_meta
+
+    meta = load_stream_meta(stream_dir)
+    return {k: meta[k] for k in ("dataset_name", "n_instances", "n_features", "feature_names", "class_labels")}
+
+
+def config_hash(fingerprint, run, eval_params):
+    # Mesmos parâmetros ignorados do checkpoint e do banco de resultados
+    eval_params = {k: v for k, v in eval_params.items() if k not in RESULT_IGNORED_PARAMS}
+    config = {"dataset": fingerprint, "model": run["model"], "params": run["params"], "eval_params": eval_params}
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+# --- Execução ---
+def _run_worker(stream_dir, run, eval_params):
+    # Executado no processo do pool: a JVM de cada processo é reaproveitada entre execuções
+    from utils.file_stream import FileBackedStream
+    from utils.training import get_models
+    from utils.evaluation import run_evaluation_stream
+
+    start = time.perf_counter()
+    stream = FileBackedStream(stream_dir)
+    models, _ = get_models(stream.get_schema(), eval_params, [run["model"]], {run["model"]: run["params"]})
+    final = None
+    for result in run_evaluation_stream(stream, models, eval_params):
+        if isinstance(result, dict):
+            final = result
+    state = final["models_final_state"][run["model"]]
+    return {
+        "final_report": final["final_report"][run["model"]],
+        "throughput": final.get("throughput"),
+        "elapsed_s": time.perf_counter() - start,
+        "window_accuracy": [float(a) for a in state["results_accuracy"]],
+        "instance_history": final["instance_history"],
+    }
+
+
+def _result_row(config_id, record):
+    run, result = record["run"], record["result"]
+    row = {"config_hash": config_id, "model": run["model"]}
+    row.update({f"param_{k}": v for k, v in run["params"].items()})
+    report = result["final_report"]
+    # Entradas aninhadas (Latência, JVM) viram colunas escalares, como no utils.runner
+    row.update({k: v for k, v in report.items() if not isinstance(v, dict)})
+    for op, summary in report.get("Latência", {}).items():
+        for stat in ("p50_us", "p95_us", "p99_us"):
+            row[f"latency_{op}_{stat}"] = summary[stat]
+    for field, value in report.get("JVM", {}).items():
+        row[f"jvm_{field}"] = value
+    row["throughput"] = result["throughput"]
+    row["elapsed_s"] = result["elapsed_s"]
+    return row
+
+
+def gather_results(output_dir):
+    """Junta todas as execuções concluídas da pasta em uma única tabela."""
+    runs_dir = os.path.join(output_dir, "runs")
+    rows = []
+    if os.path.isdir(runs_dir):
+        for filename in sorted(os.listdir(runs_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(runs_dir, filename), encoding="utf-8") as f:
+                    rows.append(_result_row(filename[:-5], json.load(f)))
+    return pd.DataFrame(rows)
+
+
+def prepare_stream(spec):
+    """Caminho do artefato do stream: o da spec ou um gerado agora pelo pipeline."""
+    if spec.get("stream_dir"):
+        return spec["stream_dir"]
+    from utils.preprocessing import create_stream_pipeline, STREAM_STORAGE_DISK
+
+    pipeline_params = {**spec.get("pipeline", {}), "stream_storage": STREAM_STORAGE_DISK}
+    stream, _, _, _, log_messages, _, pipeline_artifacts = create_stream_pipeline(spec["data_file"], **pipeline_params)
+    if stream is None:
+        raise RuntimeError("O pipeline de pré-processamento falhou:\n" + "\n".join(log_messages))
+    return pipeline_artifacts["stream_path"]
+
+
+def run_sweep(spec, output_dir=None, workers=None):
+    name = spec.get("name", "sweep")
+    output_dir = output_dir or spec.get("output_dir") or os.path.join(DEFAULT_OUTPUT_ROOT, name)
+    runs_dir = os.path.join(output_dir, "runs")
+    os.makedirs(runs_dir, exist_ok=True)
+
+    # Antes do pipeline, que pode importar o capymoa (e iniciar a JVM) neste processo
+    configure_jvm(spec.get("jvm"))
+    stream_dir = prepare_stream(spec)
+    eval_params = spec.get("evaluation", {})
+    fingerprint = dataset_fingerprint(stream_dir)
+
+    pending = {}
+    runs = expand_runs(spec["runs"])
+    for run in runs:
+        config_id = config_hash(fingerprint, run, eval_params)
+        if not os.path.exists(os.path.join(runs_dir, f"{config_id}.json")):
+            pending[config_id] = run
+    print(f"{len(runs)} execuções na varredura, {len(runs) - len(pending)} já concluídas.", flush=True)
+
+    failures = {}
+    if pending:
+        workers = workers or spec.get("workers") or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=mp.get_context("spawn"),
+            # Cada processo do pool inicia sua JVM com os mesmos argumentos
+            initializer=configure_jvm,
+            initargs=(spec.get("jvm"),)
+        ) as pool:
+            futures = {
+                pool.submit(_run_worker, stream_dir, run, eval_params): config_id
+                for config_id, run in pending.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                config_id = futures[future]
+                run = pending[config_id]
+                try:
+                    result = future.result()
+                except Exception:
+                    failures[config_id] = traceback.format_exc()
+                    print(f"[{done}/{len(pending)}] {config_id} {run['model']} falhou:\n{failures[config_id]}", flush=True)
+                    continue
+                _write_json_atomic(os.path.join(runs_dir, f"{config_id}.json"), {
+                    "run": run,
+                    "eval_params": eval_params,
+                    "dataset": fingerprint,
+                    "result": result,
+                })
+                print(f"[{done}/{len(pending)}] {config_id} {run['model']} {run['params']} ok ({result['elapsed_s']:.1f}s)", flush=True)
+
+    table = gather_results(output_dir)
+    if not table.empty:
+        table.to_parquet(os.path.join(output_dir, "results.parquet"), index=False)
+    return table, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varredura de hiperparâmetros/sementes em paralelo.")
+    parser.add_argument("spec", help="Caminho do arquivo JSON com a spec da varredura.")
+    parser.add_argument("--output-dir", default=None, help="Pasta de saída (padrão: output_dir da spec ou results/<name>).")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: workers da spec ou núcleos da máquina).")
+    args = parser.parse_args(argv)
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+    table, failures = run_sweep(spec, args.output_dir, args.workers)
+    if not table.empty:
+        print(table.to_string(index=False))
+    if failures:
+        raise SystemExit(f"{len(failures)} execução(ões) falharam.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import json
+import time
+import queue
+import threading
+import copy
+import numpy as np
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from utils.profiling import LatencyHistogram
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class _Job:
+    __slots__ = ("kind", "X", "y", "enqueued", "done", "result", "error")
+
+    def __init__(self, kind, X, y=None):
+        self.kind = kind
+        self.X = X
+        self.y = y
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# --- Serviço ---
+class ScoringService:
+    """
+    Serve um modelo treinado na avaliação. As requisições entram em uma fila e
+    uma única thread as agrupa em micro-lotes (até `max_batch` instâncias ou
+    `max_wait_ms` desde a primeira da fila), aplica a transformação online (se
+    houver), prevê e, com `allow_updates`, treina com o feedback rotulado. Só
+    essa thread toca no modelo, então previsões e atualizações nunca se cruzam.
+    O serviço trabalha sobre cópias do modelo e da transformação: uma nova
+    avaliação com os objetos originais não interfere nele.
+    """
+
+    def __init__(self, model, schema, feature_names, class_labels, transformer=None,
+                 max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS, allow_updates=True):
+        from utils.checkpoint import copy_with_java_objects
+
+        self.model = copy_with_java_objects(model)
+        self.schema = schema
+        self.feature_names = [str(f) for f in feature_names]
+        self.class_labels = [str(c) for c in class_labels]
+        self._class_index = {c: i for i, c in enumerate(self.class_labels)}
+        self.transformer = copy.deepcopy(transformer)
+        self.max_batch = int(max_batch)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.allow_updates = allow_updates
+        try:
+            from capymoa.instance import Instance, LabeledInstance
+        except ImportError:
+            from capymoa.core import Instance, LabeledInstance
+        self._instance = Instance
+        self._labeled_instance = LabeledInstance
+
+        self._queue = queue.Queue()
+        self._running = False
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._started_at = None
+        self._scored = 0
+        self._trained = 0
+        self._batches = 0
+        self._batched_instances = 0
+
+    # Conversão dos registros recebidos (dicionários feature -> valor)
+    def records_to_array(self, records):
+        missing = [f for f in self.feature_names if f not in records[0]]
+        if missing:
+            raise ValueError(f"Features ausentes no registro: {missing}")
+        X = np.array([[r.get(f, np.nan) for f in self.feature_names] for r in records], dtype=np.float64)
+        if self.transformer is None and not np.isfinite(X).all():
+            raise ValueError("Valores nulos ou infinitos só são aceitos com transformação online ativa na avaliação.")
+        return X
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._worker, name="scoring-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def submit(self, kind, X, y=None, timeout=30.0):
+        job = _Job(kind, X, y)
+        self._queue.put(job)
+        if not job.done.wait(timeout):
+            raise TimeoutError("Tempo esgotado aguardando o micro-lote.")
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def score(self, records):
+        X = self.records_to_array(records)
+        return [self.class_labels[p] if p >= 0 else None for p in self.submit("score", X)]
+
+    def feedback(self, records, labels):
+        if not self.allow_updates:
+            raise PermissionError("Atualização online desabilitada neste serviço.")
+        if len(records) != len(labels):
+            raise ValueError("Quantidade de registros e de rótulos diferente.")
+        unknown = sorted({str(l) for l in labels} - set(self._class_index))
+        if unknown:
+            raise ValueError(f"Rótulos desconhecidos: {unknown}")
+        y = np.array([self._class_index[str(l)] for l in labels], dtype=np.int64)
+        return self.submit("feedback", self.records_to_array(records), y)
+
+    # Laço da thread do modelo
+    def _next_batch(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        size = len(first.X)
+        deadline = first.enqueued + self.max_wait_s
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(job)
+            size += len(job.X)
+        return batch
+
+    def _worker(self):
+        while self._running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            batch_size = sum(len(job.X) for job in batch)
+            try:
+                X = np.vstack([job.X for job in batch])
+                if self.transformer is not None:
+                    X = self.transformer.transform_batch(X)
+                offset = 0
+                for job in batch:
+                    rows = X[offset:offset + len(job.X)]
+                    offset += len(job.X)
+                    if job.kind == "score":
+                        job.result = [self._predict(x) for x in rows]
+                    else:
+                        for x, y in zip(rows, job.y):
+                            self.model.train(self._labeled_instance.from_array(self.schema, x, int(y)))
+                        job.result = {"trained": len(rows)}
+            except Exception as e:
+                for job in batch:
+                    job.error = e
+
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self._batches += 1
+                self._batched_instances += batch_size
+                for job in batch:
+                    if job.error is None:
+                        self._latency.add(finished - job.enqueued)
+                        if job.kind == "score":
+                            self._scored += len(job.X)
+                        else:
+                            self._trained += len(job.X)
+            for job in batch:
+                job.done.set()
+
+    def _predict(self, x):
+        prediction = self.model.predict(self._instance.from_array(self.schema, x))
+        try:
+            prediction = prediction[0]
+        except (IndexError, TypeError):
+            pass
+        return -1 if prediction is None else int(prediction)
+
+    def stats(self):
+        with self._stats_lock:
+            elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+            summary = self._latency.summary()
+            return {
+                "scored": self._scored,
+                "trained": self._trained,
+                "batches": self._batches,
+                "mean_batch_size": self._batched_instances / self._batches if self._batches else 0.0,
+                "throughput": self._scored / elapsed if elapsed > 0 else 0.0,
+                "latency_p50_ms": summary["p50_us"] / 1000,
+                "latency_p95_ms": summary["p95_us"] / 1000,
+                "latency_p99_ms": summary["p99_us"] / 1000,
+                "uptime_s": elapsed,
+            }
+
+
+# --- HTTP ---
+def _make_handler(service):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, service.stats())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok", "features": service.feature_names, "classes": service.class_labels})
+            else:
+                self._send(404, {"error": "Rota inexistente."})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                records = payload.get("records") or []
+                if not records:
+                    raise ValueError("Envie ao menos um registro em 'records'.")
+                if self.path == "/score":
+                    self._send(200, {"predictions": service.score(records)})
+                elif self.path == "/feedback":
+                    self._send(200, service.feedback(records, payload.get("labels") or []))
+                else:
+                    self._send(404, {"error": "Rota inexistente."})
+            except (ValueError, PermissionError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Inicia o serviço e o servidor HTTP em threads de fundo; devolve o servidor."""
+    service.start()
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, name="scoring-http", daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+    server.service.stop()
@@ -0,0 +1,112 @@
+import math
+import time
+import numpy as np
+from utils.training import get_models
+
+# Modelos cujo custo cresce com o tamanho do ensemble
+ENSEMBLE_MODELS = ("LeveragingBagging", "AdaptiveRandomForest")
+DEFAULT_CALIBRATION_SIZES = (2, 5, 10)
+DEFAULT_MAX_FEATURES_OPTIONS = (0.2, 0.4, 0.6)
+DEFAULT_CALIBRATION_INSTANCES = 2000
+# Fração do orçamento de tempo usada no dimensionamento: os membros ficam mais
+# caros à medida que as árvores crescem, e a calibração é curta
+DEFAULT_HEADROOM = 0.8
+MAX_ENSEMBLE_SIZE = 500
+
+
+def _seconds_per_instance(model, instances):
+    start = time.perf_counter()
+    for inst in instances:
+        model.predict(inst)
+        model.train(inst)
+    return (time.perf_counter() - start) / len(instances)
+
+
+def _read_calibration_instances(stream, n_instances):
+    stream.restart()
+    instances = []
+    while len(instances) < n_instances and stream.has_more_instances():
+        instances.append(stream.next_instance())
+    stream.restart()
+    return instances
+
+
+def calibrate_ensemble(model_name, stream, target_instances_per_s, base_params=None,
+                       sizes=DEFAULT_CALIBRATION_SIZES, max_features_options=None,
+                       n_instances=DEFAULT_CALIBRATION_INSTANCES, headroom=DEFAULT_HEADROOM,
+                       min_ensemble_size=10):
+    """
+    Mede o custo de teste-e-treino por instância com alguns tamanhos de
+    ensemble, ajusta custo = fixo + por_membro * tamanho e escolhe o maior
+    tamanho que cabe no orçamento (headroom / alvo). No ARF cada max_features
+    candidato tem seu próprio ajuste; fica o maior max_features que ainda
+    permite ao menos `min_ensemble_size` membros (ou, se nenhum permitir, o
+    que permite o maior ensemble).
+    """
+    if model_name not in ENSEMBLE_MODELS:
+        raise ValueError(f"'{model_name}' não é um ensemble dimensionável.")
+    base_params = dict(base_params or {})
+    base_params.pop("sizing", None)
+    if model_name == "AdaptiveRandomForest":
+        max_features_options = list(max_features_options or DEFAULT_MAX_FEATURES_OPTIONS)
+    else:
+        max_features_options = [None]
+
+    instances = _read_calibration_instances(stream, n_instances)
+    if not instances:
+        raise ValueError("O stream não tem instâncias para a calibração.")
+    schema = stream.get_schema()
+    budget_s = headroom / target_instances_per_s
+
+    measurements = []
+    candidates = []
+    for max_features in max_features_options:
+        costs = []
+        for size in sizes:
+            params = {**base_params, "ensemble_size": int(size)}
+            if max_features is not None:
+                params["max_features"] = max_features
+            models, _ = get_models(schema, {}, [model_name], {model_name: params})
+            cost = _seconds_per_instance(models[model_name]["model_instance"], instances)
+            costs.append(cost)
+            measurements.append({"ensemble_size": int(size), "max_features": max_features, "seconds_per_instance": cost})
+
+        per_member_s, fixed_s = np.polyfit(np.asarray(sizes, dtype=np.float64), np.asarray(costs), 1)
+        per_member_s = max(per_member_s, 1e-12)
+        fixed_s = max(fixed_s, 0.0)
+        best_size = int(math.floor((budget_s - fixed_s) / per_member_s)) if budget_s > fixed_s else 0
+        candidates.append({
+            "max_features": max_features,
+            "ensemble_size": min(max(best_size, 1), MAX_ENSEMBLE_SIZE),
+            "fits_target": best_size >= 1,
+            "fixed_s": float(fixed_s),
+            "per_member_s": float(per_member_s),
+        })
+
+    viable = [c for c in candidates if c["ensemble_size"] >= min_ensemble_size and c["fits_target"]]
+    if viable:
+        chosen = max(viable, key=lambda c: (c["max_features"] or 0, c["ensemble_size"]))
+    else:
+        chosen = max(candidates, key=lambda c: c["ensemble_size"])
+    predicted_cost = chosen["fixed_s"] + chosen["per_member_s"] * chosen["ensemble_size"]
+
+    return {
+        "model": model_name,
+        "target_instances_per_s": float(target_instances_per_s),
+        "headroom": headroom,
+        "ensemble_size": chosen["ensemble_size"],
+        "max_features": chosen["max_features"],
+        "fits_target": chosen["fits_target"],
+        "predicted_instances_per_s": 1.0 / predicted_cost if predicted_cost > 0 else None,
+        "calibration_instances": len(instances),
+        "candidates": candidates,
+        "measurements": measurements,
+    }
+
+
+def apply_sizing(params, sizing):
+    """Hiperparâmetros com o tamanho (e max_features) escolhidos e o registro da calibração."""
+    params = {**params, "ensemble_size": sizing["ensemble_size"], "sizing": sizing}
+    if sizing.get("max_features") is not None:
+        params["max_features"] = sizing["max_features"]
+    return params
@@ -3,4 +3,11 @@ import streamlit as st
 def load_custom_css(css_file_path):
     with open(css_file_path) as f:
         css = f.read()
-    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
\ No newline at end of file
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
+
+def show_page_startup(page_startup):
+    """Fecha a medição de inicialização da página e a mostra na barra lateral."""
+    record = page_startup.finish()
+    heavy = f" · importou {', '.join(record['heavy_imports'])}" if record["heavy_imports"] else ""
+    st.sidebar.caption(f"⏱️ Página iniciada em {record['startup_ms']:,.0f} ms{heavy}")
+    return record
@@ -0,0 +1,162 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+SYNTHETIC_CACHE_ROOT = os.path.join("data", "synthetic")
+
+FAMILY_RANDOM_TREE = "RandomTreeGenerator (Árvores)"
+FAMILY_RANDOM_RBF = "RandomRBF (Centróides)"
+GENERATOR_FAMILIES = (FAMILY_RANDOM_TREE, FAMILY_RANDOM_RBF)
+
+_executor = None
+
+
+# --- Construção do Cenário ---
+def _make_generator(gen_family, base_params, seed):
+    from capymoa.stream.generator import RandomTreeGenerator, RandomRBFGenerator
+
+    if gen_family == FAMILY_RANDOM_TREE:
+        return RandomTreeGenerator(
+            tree_random_seed=seed,
+            num_classes=base_params['num_classes'],
+            num_nominals=base_params['num_nominals'],
+            num_numerics=base_params['num_numerics']
+        )
+    return RandomRBFGenerator(
+        model_random_seed=seed,
+        number_of_classes=base_params['num_classes'],
+        number_of_attributes=base_params['num_attributes'],
+        number_of_centroids=base_params['num_centroids']
+    )
+
+
+def build_drift_stream(gen_family, base_params, drifts):
+    """
+    DriftStream do cenário: um gerador inicial e, a cada drift da linha do
+    tempo ({"position", "type", "width"}, ordenada), um novo conceito com a
+    semente seguinte.
+    """
+    from capymoa.stream.drift import DriftStream, AbruptDrift, GradualDrift
+
+    seed_key = 'tree_seed_start' if gen_family == FAMILY_RANDOM_TREE else 'model_seed_start'
+    current_seed = base_params[seed_key]
+    stream_components = [_make_generator(gen_family, base_params, current_seed)]
+
+    last_pos = 0
+    for drift in drifts:
+        pos = int(drift["position"])
+        if pos <= last_pos:
+            raise ValueError(f"A posição {pos} deve ser maior que a anterior {last_pos}.")
+        if drift["type"] == "Abrupto":
+            stream_components.append(AbruptDrift(position=pos))
+        else:
+            stream_components.append(GradualDrift(position=pos, width=int(drift["width"])))
+        current_seed += 1
+        stream_components.append(_make_generator(gen_family, base_params, current_seed))
+        last_pos = pos
+
+    return DriftStream(stream=stream_components)
+
+
+def scenario_key(gen_family, base_params, drifts, total_size):
+    """Hash do cenário (família, parâmetros e sementes, linha do tempo e tamanho)."""
+    scenario = {
+        "family": gen_family,
+        "params": {k: int(v) for k, v in base_params.items()},
+        "drifts": [
+            {"position": int(d["position"]), "type": d["type"], "width": int(d["width"])} for d in drifts
+        ],
+        "total_size": int(total_size),
+    }
+    payload = json.dumps(scenario, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def can_materialize(gen_family, base_params):
+    """
+    O artefato em disco só guarda atributos numéricos: com atributos nominais
+    (RandomTreeGenerator) o stream recarregado seria outro problema, então o
+    cenário é usado direto do gerador.
+    """
+    return not (gen_family == FAMILY_RANDOM_TREE and int(base_params.get('num_nominals', 0)) > 0)
+
+
+def get_scenario_dir(key, root=SYNTHETIC_CACHE_ROOT):
+    return os.path.join(root, key)
+
+
+def is_materialized(key, root=SYNTHETIC_CACHE_ROOT):
+    from utils.file_stream import META_FILENAME
+
+    return os.path.exists(os.path.join(get_scenario_dir(key, root), META_FILENAME))
+
+
+# --- Materialização ---
+def materialize_synthetic_stream(gen_family, base_params, drifts, total_size, root=SYNTHETIC_CACHE_ROOT):
+    """
+    Gera o cenário uma única vez e grava X/y no mesmo formato do artefato do
+    pré-processamento (X.npy, y.npy, meta.json). Só vale para cenários sem
+    atributos nominais (ver can_materialize). Devolve a pasta do artefato; se
+    ele já existe, nada é gerado.
+    """
+    from utils.file_stream import save_stream_artifact
+
+    if not can_materialize(gen_family, base_params):
+        raise ValueError("Cenários com atributos nominais não podem ser gravados em disco; use o gerador diretamente.")
+    key = scenario_key(gen_family, base_params, drifts, total_size)
+    artifact_dir = get_scenario_dir(key, root)
+    if is_materialized(key, root):
+        return artifact_dir
+
+    stream = build_drift_stream(gen_family, base_params, drifts)
+    schema = stream.get_schema()
+    n_features = schema.get_num_attributes()
+    X = np.empty((int(total_size), n_features), dtype=np.float64)
+    y = np.empty(int(total_size), dtype=np.int64)
+    n = 0
+    while n < total_size and stream.has_more_instances():
+        instance = stream.next_instance()
+        X[n] = instance.x
+        y[n] = instance.y_index
+        n += 1
+
+    try:
+        class_labels = list(schema.get_label_values())
+    except AttributeError:
+        class_labels = [str(c) for c in range(schema.get_num_classes())]
+
+    # Grava em uma pasta temporária e renomeia: um artefato pela metade nunca é reaproveitado
+    tmp_dir = f"{artifact_dir}.tmp{os.getpid()}"
+    save_stream_artifact(
+        tmp_dir,
+        X[:n],
+        y[:n],
+        feature_names=[f"att_{i}" for i in range(n_features)],
+        target_name="class",
+        class_labels=class_labels,
+        dataset_name=f"{gen_family.split(' ')[0]}-{key}"
+    )
+    try:
+        os.replace(tmp_dir, artifact_dir)
+    except OSError:
+        # Outro processo gravou o mesmo cenário primeiro
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return artifact_dir
+
+
+def load_synthetic_stream(artifact_dir):
+    from utils.file_stream import FileBackedStream
+
+    return FileBackedStream(artifact_dir)
+
+
+def start_background_materialization(gen_family, base_params, drifts, total_size, root=SYNTHETIC_CACHE_ROOT):
+    """Gera o cenário em um processo separado (com JVM própria); devolve o Future com a pasta do artefato."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+    return _executor.submit(materialize_synthetic_stream, gen_family, dict(base_params), list(drifts), int(total_size), root)
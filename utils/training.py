@@ -1,15 +1,6 @@
 import pandas as pd
 import numpy as np
 import warnings
-from collections import deque
-from capymoa.classifier import (
-    LeveragingBagging,
-    HoeffdingTree,
-    HoeffdingAdaptiveTree,
-    AdaptiveRandomForestClassifier,
-)
-from capymoa.evaluation import ClassificationEvaluator
-from capymoa.drift.detectors import DDM, ADWIN, ABCD
 
 def get_models(schema, global_params, models_to_run, all_model_params):
     """
@@ -22,11 +13,32 @@ def get_models(schema, global_params, models_to_run, all_model_params):
         models_to_run: Uma lista de strings com os nomes dos modelos (ex: ["LeveragingBagging"]).
         all_model_params: Um dicionário aninhado (ex: {"LeveragingBagging": {"ensemble_size": 50}}).
     """
+    # Importado aqui: o capymoa inicia a JVM, e as páginas que só importam este
+    # módulo não devem pagar esse custo
+    from capymoa.classifier import (
+        LeveragingBagging,
+        HoeffdingTree,
+        HoeffdingAdaptiveTree,
+        AdaptiveRandomForestClassifier,
+    )
+    from capymoa.evaluation import ClassificationEvaluator
+    from capymoa.drift.detectors import DDM, ADWIN, ABCD
     
     window_size = global_params.get("WINDOW_SIZE", 500)
     delay_length = global_params.get("DELAY_LENGTH") 
     models_to_test = {}
     
+    # O ABCD observa a distribuição das entradas, não os erros do modelo: modelos
+    # com os mesmos parâmetros do ABCD compartilham a mesma instância do detector,
+    # que a avaliação atualiza uma única vez por posição do stream
+    input_detectors = {}
+    
+    def get_input_detector(params):
+        key = (params.get("abcd_delta_drift", 0.002), params.get("abcd_delta_warn", 0.01))
+        if key not in input_detectors:
+            input_detectors[key] = ABCD(delta_drift=key[0], delta_warn=key[1])
+        return input_detectors[key]
+    
     if "LeveragingBagging" in models_to_run:
         params = all_model_params.get("LeveragingBagging", {})
         models_to_test["LeveragingBagging"] = {
@@ -37,17 +49,15 @@ def get_models(schema, global_params, models_to_run, all_model_params):
                 # Outros parâmetros podem ser adicionados aqui
             ),
             "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
+            # Hiperparâmetros usados, para recriar o modelo (ex.: cópias do aquecimento da JVM)
+            "params": dict(params),
             "drift_ddm": DDM(
                 min_n_instances=params.get("ddm_min_instances", 30),
                 warning_level=params.get("ddm_warning_level", 2.0),
                 out_control_level=params.get("ddm_out_control_level", 3.0)
             ),
             "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-                # Outros parâmetros do ABCD podem ser adicionados aqui
-            ),
+            "drift_ABCD": get_input_detector(params),
             "results_accuracy": [],
             "results_drift_ddm": [],
             "results_drift_adwin": [],
@@ -67,16 +77,14 @@ def get_models(schema, global_params, models_to_run, all_model_params):
                 nb_threshold=params.get("nb_threshold", 0)
             ),
             "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
+            "params": dict(params),
             "drift_ddm": DDM(
                 min_n_instances=params.get("ddm_min_instances", 30),
                 warning_level=params.get("ddm_warning_level", 2.0),
                 out_control_level=params.get("ddm_out_control_level", 3.0)
             ),
             "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
+            "drift_ABCD": get_input_detector(params),
             "results_accuracy": [],
             "results_drift_ddm": [],
             "results_drift_adwin": [],
@@ -95,16 +103,14 @@ def get_models(schema, global_params, models_to_run, all_model_params):
                 disable_drift_detection=params.get("disable_drift_detection", False)
             ),
             "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
+            "params": dict(params),
             "drift_ddm": DDM(
                 min_n_instances=params.get("ddm_min_instances", 30),
                 warning_level=params.get("ddm_warning_level", 2.0),
                 out_control_level=params.get("ddm_out_control_level", 3.0)
             ),
             "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
+            "drift_ABCD": get_input_detector(params),
             "results_accuracy": [],
             "results_drift_ddm": [],
             "results_drift_adwin": [],
@@ -124,27 +130,23 @@ def get_models(schema, global_params, models_to_run, all_model_params):
                 nb_threshold=params.get("nb_threshold", 0)
             ),
             "evaluator": ClassificationEvaluator(schema=schema, window_size=window_size),
+            "params": dict(params),
             "drift_ddm": DDM(
                 min_n_instances=params.get("ddm_min_instances", 30),
                 warning_level=params.get("ddm_warning_level", 2.0),
                 out_control_level=params.get("ddm_out_control_level", 3.0)
             ),
             "drift_adwin": ADWIN(delta=params.get("adwin_delta", 0.002)),
-            "drift_ABCD": ABCD(
-                delta_drift=params.get("abcd_delta_drift", 0.002),
-                delta_warn=params.get("abcd_delta_warn", 0.01)
-            ),
+            "drift_ABCD": get_input_detector(params),
             "results_accuracy": [],
             "results_drift_ddm": [],
             "results_drift_adwin": [],
             "results_drift_ABCD": []
         }
         
-    # Adiciona a fila de delay se necessário
+    # O atraso de rótulos é aplicado pela avaliação, com um buffer único para todos os modelos
     if delay_length is not None and delay_length > 0:
         log_msg = f"Aplicando um delay de {delay_length} instâncias."
-        for model_name in models_to_test:
-            models_to_test[model_name]["prediction_queue"] = deque(maxlen=delay_length)
     else:
         log_msg = "Nenhum delay aplicado."
 